@@ -1,10 +1,136 @@
+import os
+import time
+import threading
+
 try:
     from calculator import *
 except ImportError:
     from app.calculator import *
 
+# 점수 계산식이나 메모에 저장하는 점수 dict 형태가 바뀌면 올릴 것 (저장된 스냅샷 점수 중 버전이 다른 것은 재사용하지 않음)
+SCORING_VERSION = 2
+
+
+def _option_items(option):
+    return tuple(option.items()) if option else None
+
+
+def item_score_key(item: dict) -> tuple:
+    """점수 계산에 쓰이는 필드만 모은 아이템 내용 키 (내용이 같으면 프리셋/요청이 달라도 같은 키)"""
+    return (
+        item.get("item_equipment_slot", ""), item.get("item_equipment_part", ""), item.get("item_name", ""),
+        item.get("starforce", 0),
+        _option_items(item.get("item_base_option")), _option_items(item.get("item_add_option")),
+        _option_items(item.get("item_etc_option")), _option_items(item.get("item_starforce_option")),
+        item.get("potential_option_1"), item.get("potential_option_2"), item.get("potential_option_3"),
+        item.get("additional_potential_option_1"), item.get("additional_potential_option_2"),
+        item.get("additional_potential_option_3"),
+    )
+
+
+class ItemScoreMemo:
+    """아이템 내용 키 → 부위별 점수 메모
+
+    프리셋 선택(get_best_preset)과 최종 평가(evaluate_equipment)가 같은 점수를 다시 계산하지 않도록 공유합니다.
+    요청마다 새로 만들면 요청 단위, 서버에 하나만 두면 요청 간에도 재사용됩니다.
+    """
+
+    def __init__(self, maxsize: int = 20000):
+        self.maxsize = maxsize
+        # 조회 비용을 줄이기 위해 LRU 대신 입력 순서(FIFO)로 축출 (키 해시 1회)
+        self._data = {}
+        # 스레드 실행기에서 여러 분석이 같은 메모를 쓰므로 등록 / 축출은 잠금 안에서 (조회는 잠금 없이)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(item: dict, profile: ClassProfile, char_level: int) -> tuple:
+        return profile.class_name, profile.main_stat, char_level, item_score_key(item)
+
+    def scores(self, item: dict, profile: ClassProfile, char_level: int) -> dict:
+        return self.scores_for_key(self.key(item, profile, char_level))
+
+    def get(self, key: tuple):
+        """등록된 점수 dict (없으면 None, 새로 등록하지 않음)"""
+        scores = self._data.get(key)
+        if scores is not None:
+            self.hits += 1
+        return scores
+
+    def scores_for_key(self, key: tuple) -> dict:
+        """키의 점수 dict (없으면 빈 dict 를 만들어 등록)"""
+        scores = self._data.get(key)
+        if scores is not None:
+            self.hits += 1
+            return scores
+
+        with self._lock:
+            # 잠금을 기다리는 동안 다른 스레드가 먼저 등록했으면 그 dict 를 공유
+            scores = self._data.get(key)
+            if scores is not None:
+                self.hits += 1
+                return scores
+            self.misses += 1
+            scores = self._data[key] = {}
+            if len(self._data) > self.maxsize:
+                self._data.pop(next(iter(self._data)), None)
+        return scores
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
 
-def get_best_preset(item_data: dict, class_name: str, char_level: int) -> int:
+class SnapshotMemo:
+    """이전 스냅샷의 점수를 이어받는 요청 단위 메모 (ItemScoreMemo 와 같은 scores() 인터페이스)
+
+    - base 메모에 없는 아이템은 previous(직전 스냅샷의 {키: 점수})로 채워서 다시 계산하지 않음
+      이어받은 점수는 이 요청의 used 에만 넣고 서버 공용 base 메모에는 넣지 않음
+    - 이번 분석에서 쓴 아이템 점수를 used 에 모아 다음 스냅샷으로 저장
+    """
+
+    def __init__(self, previous: dict, base: ItemScoreMemo = None):
+        self.previous = previous
+        self.base = base or ItemScoreMemo()
+        self.used = {}
+        self.reused = 0
+
+    def scores(self, item: dict, profile: ClassProfile, char_level: int) -> dict:
+        key = ItemScoreMemo.key(item, profile, char_level)
+        scores = self.used.get(key)
+        if scores is None:
+            scores = self.base.get(key)
+            if scores is None:
+                seed = self.previous.get(key)
+                if seed is not None:
+                    scores = dict(seed)
+                    self.reused += 1
+                else:
+                    scores = self.base.scores_for_key(key)
+            self.used[key] = scores
+        return scores
+
+
+def _potential_scores(item, profile, char_level, scores):
+    """윗잠재 / 에디셔널 점수 (메모가 있으면 재사용)
+
+    공유 메모를 다른 스레드가 동시에 읽을 수 있으므로 두 값을 다 계산한 뒤 튜플 하나로 한 번에 기록합니다.
+    """
+    pot_eddy = scores.get("pot_eddy")
+    if pot_eddy is None:
+        pot_eddy = scores["pot_eddy"] = (
+            calculate_potential_score(item, "potential", profile, char_level),
+            calculate_potential_score(item, "additional_potential", profile, char_level),
+        )
+    return pot_eddy
+
+
+def get_best_preset(item_data: dict, class_name: str, char_level: int, memo: ItemScoreMemo = None) -> int:
+    profile = get_class_profile(class_name)
     preset_scores = {1: 0.0, 2: 0.0, 3: 0.0}
 
     for i in range(1, 4):
@@ -14,8 +140,8 @@ def get_best_preset(item_data: dict, class_name: str, char_level: int) -> int:
 
         total_score = 0.0
         for item in preset_items:
-            score = calculate_potential_score(item, "potential", class_name, char_level)
-            add_score = calculate_potential_score(item, "additional_potential", class_name, char_level)
+            scores = memo.scores(item, profile, char_level) if memo is not None else {}
+            score, add_score = _potential_scores(item, profile, char_level, scores)
 
             if score > 0: total_score += score
             if add_score > 0: total_score += add_score
@@ -165,110 +291,123 @@ def get_dynamic_guide(scores, star_val, part_name, total_score, item_name, item_
         return "🚨 [교체 시급] 현재 세팅에서 가장 효율이 떨어지는 부위입니다. 상위 아이템으로 교체를 추천합니다."
 
 
-def evaluate_equipment(items, char_class, char_level):
+def evaluate_equipment(items, char_class, char_level, memo=None):
+    profile = get_class_profile(char_class)
     evaluate_list = []
-    special_rings = ["리스트레인트", "컨티뉴어스", "웨폰퍼프"]
 
     for item in items:
-        add_score, pot_score, eddy_score, adv_star_score = 0.0, 0.0, 0.0, 0.0
-        is_noljang = False
-
-        slot = item.get("item_equipment_slot", "")
-        part = item.get("item_equipment_part", "")
-        name = item.get("item_name", "")
-        icon = item.get("item_icon", "")
-        star = int(item.get("starforce", 0))
-        item_req_level = int(item.get("item_base_option", {}).get("base_equipment_level", 0))
-
-        is_weapon = any(k in slot for k in ["무기", "보조무기", "엠블렘"])
-        is_special = any(k in part for k in ["훈장", "뱃지", "포켓 아이템", "칭호"])
-
-        raw_options_dict = {
-            "base": item.get("item_base_option"),
-            "add": item.get("item_add_option"),
-            "etc": item.get("item_etc_option"),
-            "starforce": item.get("item_starforce_option"),
-            "potential_grade": item.get("potential_option_grade"),
-            "potential_options": [item.get("potential_option_1"), item.get("potential_option_2"), item.get("potential_option_3")],
-            "additional_grade": item.get("additional_potential_option_grade"),
-            "additional_options": [item.get("additional_potential_option_1"), item.get("additional_potential_option_2"), item.get("additional_potential_option_3")],
-            "exceptional": item.get("item_exceptional_option")
-        }
-
-        if is_special:
-            actual_add_급수 = calculate_item_score(item.get("item_add_option", {}), char_class)
-            if "포켓" in part:
-                total_item_score = actual_add_급수
-                if char_class == "데몬어벤져" and total_item_score > 0:
-                    total_item_score = total_item_score / 11
-            elif any(k in name for k in ["창세"]): total_item_score = 280.0
-            elif any(k in name for k in ["칠요"]): total_item_score = 250.0
-            elif any(k in name for k in ["불멸"]): total_item_score = 320.0
-            else: total_item_score = 180.0
-
-            evaluate_list.append({
-                "is_wse": True, "is_special": True, "is_noljang": False, "slot": slot, "part": part, "name": name, "icon": icon, "star": 0,
-                "total_score": round(total_item_score, 2),
-                "guide": get_special_part_guide(total_item_score, part, name),
-                "detail": {"add": round(total_item_score, 1), "star": 0, "pot": 0, "pot_additional": 0},
-                "raw_options": raw_options_dict
-            })
+        scores = memo.scores(item, profile, char_level) if memo is not None else {}
+        if "eval" not in scores:
+            scores["eval"] = _evaluate_item(item, profile, char_level, scores)
+        result = scores["eval"]
+        if result is None:
             continue
 
-        etc_ops = item.get("item_etc_option") or {}
-        star_ops = item.get("item_starforce_option") or {}
+        evaluate_list.append({**result, "icon": item.get("item_icon", ""), "raw_options": _raw_options(item)})
 
-        def safe_int(val):
-            try: return int(val) if val is not None else 0
-            except: return 0
+    return evaluate_list
 
-        etc_stats_max = max(safe_int(etc_ops.get(s)) for s in ["str", "dex", "int", "luk"])
-        etc_atk_max = max(safe_int(etc_ops.get("attack_power")), safe_int(etc_ops.get("magic_power")))
-        star_stats_max = max(safe_int(star_ops.get(s)) for s in ["str", "dex", "int", "luk"])
 
-        is_superior = "타일런트" in name
+def _raw_options(item):
+    return {
+        "base": item.get("item_base_option"),
+        "add": item.get("item_add_option"),
+        "etc": item.get("item_etc_option"),
+        "starforce": item.get("item_starforce_option"),
+        "potential_grade": item.get("potential_option_grade"),
+        "potential_options": [item.get("potential_option_1"), item.get("potential_option_2"), item.get("potential_option_3")],
+        "additional_grade": item.get("additional_potential_option_grade"),
+        "additional_options": [item.get("additional_potential_option_1"), item.get("additional_potential_option_2"), item.get("additional_potential_option_3")],
+        "exceptional": item.get("item_exceptional_option")
+    }
 
-        if 8 <= star <= 15 and not is_superior and item_req_level <= 150:
-            if etc_stats_max > 50 and etc_atk_max > 10:
-                is_noljang = True
-            elif star_stats_max == 0 and (etc_stats_max > 30 or etc_atk_max > 15):
-                is_noljang = True
 
-        if is_noljang: adv_star_score = get_starforce_score(22, item_req_level)
-        elif is_superior: adv_star_score = get_starforce_score(star, item_req_level) * 3.0
-        else: adv_star_score = get_starforce_score(star, item_req_level)
+def _evaluate_item(item, profile, char_level, scores):
+    """아이템 하나의 점수/가이드를 계산합니다. (아이콘·원본 옵션 제외, 평가 대상이 아니면 None)"""
+    special_rings = ["리스트레인트", "컨티뉴어스", "웨폰퍼프"]
+    add_score, pot_score, eddy_score, adv_star_score = 0.0, 0.0, 0.0, 0.0
+    is_noljang = False
+
+    slot = item.get("item_equipment_slot", "")
+    part = item.get("item_equipment_part", "")
+    name = item.get("item_name", "")
+    star = int(item.get("starforce", 0))
+    item_req_level = int(item.get("item_base_option", {}).get("base_equipment_level", 0))
+
+    is_weapon = any(k in slot for k in ["무기", "보조무기", "엠블렘"])
+    is_special = any(k in part for k in ["훈장", "뱃지", "포켓 아이템", "칭호"])
+
+    if is_special:
+        actual_add_급수 = calculate_item_score(item.get("item_add_option", {}), profile)
+        if "포켓" in part:
+            total_item_score = actual_add_급수
+            if profile.class_name == "데몬어벤져" and total_item_score > 0:
+                total_item_score = total_item_score / 11
+        elif any(k in name for k in ["창세"]): total_item_score = 280.0
+        elif any(k in name for k in ["칠요"]): total_item_score = 250.0
+        elif any(k in name for k in ["불멸"]): total_item_score = 320.0
+        else: total_item_score = 180.0
+
+        return {
+            "is_wse": True, "is_special": True, "is_noljang": False, "slot": slot, "part": part, "name": name, "star": 0,
+            "total_score": round(total_item_score, 2),
+            "guide": get_special_part_guide(total_item_score, part, name),
+            "detail": {"add": round(total_item_score, 1), "star": 0, "pot": 0, "pot_additional": 0}
+        }
 
-        if is_weapon:
-            if any(k in slot for k in ["보조무기", "엠블렘"]):
-                add_score = 100.0
-                adv_star_score = 100.0
-            else:
-                add_score = calculate_weapon_add_option_score(item, char_class) * 2.0
-            pot_val = calculate_weapon_potential_score(item, "potential", char_class)
-            pot_score = (pot_val * 3.3) if pot_val > 0 else 0
-            eddy_val = calculate_weapon_potential_score(item, "additional_potential", char_class)
-            eddy_score = (eddy_val * 2.5) if eddy_val > 0 else 0
-        else:
-            actual_add_급수 = calculate_item_score(item.get("item_add_option", {}), char_class)
-            add_score = get_advanced_add_score(actual_add_급수, item_req_level, part, char_class)
-            pot_val = calculate_potential_score(item, "potential", char_class, char_level)
-            pot_score = (pot_val * 3.3) if pot_val > 0 else 0
-            eddy_val = calculate_potential_score(item, "additional_potential", char_class, char_level)
-            eddy_score = (eddy_val * 2.5) if eddy_val > 0 else 0
-
-        total_item_score = add_score + pot_score + eddy_score + adv_star_score
-
-        if pot_val != -1 and not any(k in name for k in special_rings):
-            guide_text = get_dynamic_guide([add_score, pot_score, eddy_score, adv_star_score], star, part, total_item_score, name, item_req_level, is_noljang)
-            evaluate_list.append({
-                "is_wse": is_weapon, "is_special": False, "is_noljang": is_noljang, "slot": slot, "part": part, "name": name, "icon": icon, "star": star,
-                "total_score": round(total_item_score, 2),
-                "guide": guide_text,
-                "detail": {"add": round(add_score, 1), "star": round(adv_star_score, 1), "pot": round(pot_score, 1), "pot_additional": round(eddy_score, 1)},
-                "raw_options": raw_options_dict
-            })
+    etc_ops = item.get("item_etc_option") or {}
+    star_ops = item.get("item_starforce_option") or {}
 
-    return evaluate_list
+    def safe_int(val):
+        try: return int(val) if val is not None else 0
+        except: return 0
+
+    etc_stats_max = max(safe_int(etc_ops.get(s)) for s in ["str", "dex", "int", "luk"])
+    etc_atk_max = max(safe_int(etc_ops.get("attack_power")), safe_int(etc_ops.get("magic_power")))
+    star_stats_max = max(safe_int(star_ops.get(s)) for s in ["str", "dex", "int", "luk"])
+
+    is_superior = "타일런트" in name
+
+    if 8 <= star <= 15 and not is_superior and item_req_level <= 150:
+        if etc_stats_max > 50 and etc_atk_max > 10:
+            is_noljang = True
+        elif star_stats_max == 0 and (etc_stats_max > 30 or etc_atk_max > 15):
+            is_noljang = True
+
+    if is_noljang: adv_star_score = get_starforce_score(22, item_req_level)
+    elif is_superior: adv_star_score = get_starforce_score(star, item_req_level) * 3.0
+    else: adv_star_score = get_starforce_score(star, item_req_level)
+
+    if is_weapon:
+        if any(k in slot for k in ["보조무기", "엠블렘"]):
+            add_score = 100.0
+            adv_star_score = 100.0
+        else:
+            add_score = calculate_weapon_add_option_score(item, profile) * 2.0
+        pot_val = calculate_weapon_potential_score(item, "potential", profile)
+        pot_score = (pot_val * 3.3) if pot_val > 0 else 0
+        eddy_val = calculate_weapon_potential_score(item, "additional_potential", profile)
+        eddy_score = (eddy_val * 2.5) if eddy_val > 0 else 0
+    else:
+        actual_add_급수 = calculate_item_score(item.get("item_add_option", {}), profile)
+        add_score = get_advanced_add_score(actual_add_급수, item_req_level, part, profile)
+        # 프리셋 선택 단계에서 계산한 잠재 점수 재사용
+        pot_val, eddy_val = _potential_scores(item, profile, char_level, scores)
+        pot_score = (pot_val * 3.3) if pot_val > 0 else 0
+        eddy_score = (eddy_val * 2.5) if eddy_val > 0 else 0
+
+    total_item_score = add_score + pot_score + eddy_score + adv_star_score
+
+    if pot_val == -1 or any(k in name for k in special_rings):
+        return None
+
+    guide_text = get_dynamic_guide([add_score, pot_score, eddy_score, adv_star_score], star, part, total_item_score, name, item_req_level, is_noljang)
+    return {
+        "is_wse": is_weapon, "is_special": False, "is_noljang": is_noljang, "slot": slot, "part": part, "name": name, "star": star,
+        "total_score": round(total_item_score, 2),
+        "guide": guide_text,
+        "detail": {"add": round(add_score, 1), "star": round(adv_star_score, 1), "pot": round(pot_score, 1), "pot_additional": round(eddy_score, 1)}
+    }
 
 
 def generate_overall_review(evaluate_list):
@@ -304,4 +443,71 @@ def generate_overall_review(evaluate_list):
         "next_step": f"'{worst_item['name']}' 부위의 보완이 가장 시급합니다." if worst_item else ""
     }
 
-    return overall_review, all_sorted_results
\ No newline at end of file
+    return overall_review, all_sorted_results
+
+def analyze_character(item_data: dict, char_class: str, char_level: int, memo: ItemScoreMemo = None, timings: dict = None):
+    """프리셋 선택 → 장비 평가 → 종합 리뷰를 한 번에 수행합니다. (실행기에 작업 하나로 넘기기 위해 묶음)
+
+    timings 에 dict 를 넘기면 단계별 소요 시간(초)을 채웁니다. (best_preset / evaluate / review)
+    반환값: (best_preset, overall_review, sorted_results)
+    """
+    memo = memo or ItemScoreMemo()
+    started = time.perf_counter()
+    best_preset_idx = get_best_preset(item_data, char_class, char_level, memo=memo)
+    items = item_data.get(f"item_equipment_preset_{best_preset_idx}")
+    if not items:
+        items = item_data.get("item_equipment", [])
+
+    selected = time.perf_counter()
+    evaluate_list = evaluate_equipment(items, char_class, char_level, memo=memo)
+    evaluated = time.perf_counter()
+    overall_review, all_sorted_results = generate_overall_review(evaluate_list)
+    if timings is not None:
+        timings["best_preset"] = selected - started
+        timings["evaluate"] = evaluated - selected
+        timings["review"] = time.perf_counter() - evaluated
+    return best_preset_idx, overall_review, all_sorted_results
+
+
+def analyze_snapshot(item_data: dict, char_class: str, char_level: int, previous: dict, memo: ItemScoreMemo = None,
+                     timings: dict = None):
+    """이전 스냅샷의 아이템 점수를 이어받아 analyze_character 를 수행합니다.
+
+    previous: {ItemScoreMemo 키: 점수} - 내용(및 직업·레벨)이 바뀌지 않은 아이템은 다시 계산하지 않음
+    반환값: (best_preset, overall_review, sorted_results, item_scores, reused, rescored)
+    """
+    snapshot_memo = SnapshotMemo(previous, memo)
+    best_preset_idx, overall_review, all_sorted_results = analyze_character(
+        item_data, char_class, char_level, memo=snapshot_memo, timings=timings
+    )
+    used = snapshot_memo.used
+    return best_preset_idx, overall_review, all_sorted_results, used, snapshot_memo.reused, len(used) - snapshot_memo.reused
+
+
+# 프로세스 풀 워커마다 하나씩 두는 아이템 점수 메모 (메인 프로세스의 메모는 공유할 수 없음)
+_worker_memo = None
+
+
+def _get_worker_memo():
+    global _worker_memo
+    size = int(os.getenv("ITEM_SCORE_MEMO_SIZE", "20000"))
+    if size <= 0:
+        return None
+    if _worker_memo is None:
+        _worker_memo = ItemScoreMemo(size)
+    return _worker_memo
+
+
+def analyze_character_in_worker(item_data: dict, char_class: str, char_level: int):
+    """프로세스 풀 워커용 analyze_character (워커 프로세스의 메모를 재사용)
+
+    반환값: (analyze_character 결과, 단계별 소요 시간) - 워커에서 잰 시간은 메인 프로세스에서 지표로 기록
+    """
+    timings = {}
+    return analyze_character(item_data, char_class, char_level, memo=_get_worker_memo(), timings=timings), timings
+
+
+def analyze_snapshot_in_worker(item_data: dict, char_class: str, char_level: int, previous: dict):
+    """프로세스 풀 워커용 analyze_snapshot (반환값은 analyze_character_in_worker 와 같은 형태)"""
+    timings = {}
+    return analyze_snapshot(item_data, char_class, char_level, previous, memo=_get_worker_memo(), timings=timings), timings
@@ -0,0 +1,450 @@
+"""길드 / 서버 단위 리더보드용 대량 점수 계산 엔진
+
+evaluate_equipment 와 같은 점수를 계산하되, 아이템 옵션을 한 번에 열(column) 배열로 펼친 뒤
+스타포스 / 추가옵션 / 잠재 / 무기 점수를 NumPy 배열 연산으로 계산합니다.
+부동소수 연산 순서와 반올림(round)을 evaluate_equipment 와 동일하게 맞춰 같은 숫자가 나옵니다.
+(가이드 문구는 계산하지 않습니다.)
+
+NumPy 는 선택 의존성입니다: pip install numpy
+아직 어떤 라우트에도 연결되어 있지 않습니다. (리더보드 배치 작업용, 결과 동등성은 tests/test_bulk.py 로 확인)
+"""
+import math
+from functools import lru_cache
+from typing import NamedTuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from calculator import (
+        get_class_profile, ADD_OVER_SCORES, ADD_OVER_MULTS, ADD_UNDER_SCORES, ADD_UNDER_MULTS,
+        ADD_CHUNK, _extend_add_tables
+    )
+    from options import parse_option
+except ImportError:
+    from app.calculator import (
+        get_class_profile, ADD_OVER_SCORES, ADD_OVER_MULTS, ADD_UNDER_SCORES, ADD_UNDER_MULTS,
+        ADD_CHUNK, _extend_add_tables
+    )
+    from app.options import parse_option
+
+# OptionLine 의 stats 는 비트 마스크로, kind 는 정수 코드로 변환
+STAT_BITS = {"ALL": 1, "STR": 2, "DEX": 4, "INT": 8, "LUK": 16, "HP": 32, "ATK": 64, "MATK": 128}
+KIND_CODES = {"other": 0, "stat": 1, "per_level": 2, "crit_damage": 3, "cooldown": 4, "damage": 5, "ignore_def": 6, "recovery": 7}
+XENON_BITS = STAT_BITS["STR"] | STAT_BITS["DEX"] | STAT_BITS["LUK"]
+ATTACK_BITS = STAT_BITS["ATK"] | STAT_BITS["MATK"]
+ADD_TARGET_CODES = {"default": 0, "xenon": 1, "demon_avenger": 2}
+
+ADD_KEYS = ("str", "dex", "int", "luk", "hp", "max_hp", "all_stat", "attack_power", "magic_power", "boss_damage", "damage")
+NO_ADD_SLOTS = ["반지", "어깨장식", "기계 심장", "훈장", "뱃지", "포켓 아이템", "엠블렘", "보조무기", "무기"]
+SPECIAL_RINGS = ["리스트레인트", "컨티뉴어스", "웨폰퍼프"]
+POTENTIAL_TYPES = ("potential", "additional_potential")
+
+
+class BulkScores(NamedTuple):
+    """아이템 1개 = 1행. included 가 True 인 행이 evaluate_equipment 결과에 포함되는 아이템입니다."""
+    set_index: "np.ndarray"       # 몇 번째 장비 세트의 아이템인지
+    item_index: "np.ndarray"      # 세트 안에서의 아이템 순서
+    included: "np.ndarray"
+    is_special: "np.ndarray"
+    total_score: "np.ndarray"     # round(.., 2)
+    add: "np.ndarray"             # detail 값들 (round(.., 1))
+    star: "np.ndarray"
+    pot: "np.ndarray"
+    pot_additional: "np.ndarray"
+
+    def averages(self, set_count: int) -> "np.ndarray":
+        """세트별 평균 점수 (generate_overall_review 의 avg_score 와 같은 기준, 반올림 전)"""
+        mask = self.included & ~self.is_special
+        sums = np.bincount(self.set_index[mask], weights=self.total_score[mask], minlength=set_count)
+        counts = np.bincount(self.set_index[mask], minlength=set_count)
+        return np.divide(sums, counts, out=np.zeros(set_count), where=counts > 0)
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("대량 점수 계산에는 numpy 가 필요합니다. (pip install numpy)")
+
+
+def _safe_int(val):
+    try: return int(val) if val is not None else 0
+    except: return 0
+
+
+def _py_round(values, ndigits: int):
+    # numpy.round 는 x * 10^n 후 반올림하므로 경계값에서 파이썬 round 와 결과가 달라질 수 있어 파이썬 round 로 통일
+    return np.fromiter((round(v, ndigits) for v in values.tolist()), dtype=np.float64, count=len(values))
+
+
+# 아이템 1개를 정수 1행으로 펼칠 때의 열 순서
+FLAG_COLUMNS = (
+    "is_special", "is_weapon", "is_sub_weapon", "weapon_pot", "pot_excluded", "no_add", "is_superior",
+    "excluded_ring", "is_pocket", "has_add_base",
+)
+LINE_FIELDS = ("stats", "value", "has_value", "pct", "kind")
+ITEM_COLUMNS = (
+    FLAG_COLUMNS + ("special_fixed", "star", "req_level", "etc_stats_max", "etc_atk_max", "star_stats_max",
+                    "base_attack_power", "base_magic_power")
+    + tuple(f"add_{key}" for key in ADD_KEYS)
+    + tuple(f"{ptype}_{i}_{field}" for ptype in POTENTIAL_TYPES for i in range(3) for field in LINE_FIELDS)
+)
+ADD_START = ITEM_COLUMNS.index("add_str")
+EMPTY_LINE = (0, 0, 0, 0, -1)
+
+
+@lru_cache(maxsize=1024)
+def _part_flags(slot: str, part: str, name: str) -> tuple:
+    """부위 / 이름으로 정해지는 분류 플래그 (_evaluate_item 과 같은 키워드 판정)"""
+    if "창세" in name: fixed = 280
+    elif "칠요" in name: fixed = 250
+    elif "불멸" in name: fixed = 320
+    else: fixed = 180
+    return (
+        any(k in part for k in ["훈장", "뱃지", "포켓 아이템", "칭호"]),
+        any(k in slot for k in ["무기", "보조무기", "엠블렘"]),
+        any(k in slot for k in ["보조무기", "엠블렘"]),
+        any(k in slot for k in ["무기", "보조무기"]) or "엠블렘" in part,
+        any(k in slot for k in ["무기", "보조무기", "엠블렘"]) or any(k in part for k in ["무기", "보조무기", "엠블렘"]),
+        any(k in part for k in NO_ADD_SLOTS),
+        "타일런트" in name,
+        any(k in name for k in SPECIAL_RINGS),
+        "포켓" in part,
+    ), fixed
+
+
+@lru_cache(maxsize=4096)
+def _line_codes(raw: str) -> tuple:
+    line = parse_option(raw)
+    has_value = line.value is not None
+    return sum(STAT_BITS[stat] for stat in line.stats), line.value if has_value else 0, has_value, line.is_percent, KIND_CODES[line.kind]
+
+
+POTENTIAL_KEYS = tuple(f"{ptype}_option_{i}" for ptype in POTENTIAL_TYPES for i in (1, 2, 3))
+MAIN_STAT_KEYS = ("str", "dex", "int", "luk")
+EMPTY_ADD = [0] * len(ADD_KEYS)
+
+
+def _item_row(item: dict) -> list:
+    flags, fixed = _part_flags(item.get("item_equipment_slot", ""), item.get("item_equipment_part", ""), item.get("item_name", ""))
+    base_option = item.get("item_base_option", {})
+    add_option = item.get("item_add_option", {})
+    etc_ops = item.get("item_etc_option") or {}
+    star_ops = item.get("item_starforce_option") or {}
+
+    row = [
+        *flags, bool(add_option) and bool(base_option), fixed,
+        int(item.get("starforce", 0)),
+        int(base_option.get("base_equipment_level", 0)),
+        max([_safe_int(etc_ops.get(s)) for s in MAIN_STAT_KEYS]),
+        max(_safe_int(etc_ops.get("attack_power")), _safe_int(etc_ops.get("magic_power"))),
+        max([_safe_int(star_ops.get(s)) for s in MAIN_STAT_KEYS]),
+        int(base_option.get("attack_power", 0)) if base_option else 0,
+        int(base_option.get("magic_power", 0)) if base_option else 0,
+    ]
+    row += [int(add_option.get(key, 0)) for key in ADD_KEYS] if add_option else EMPTY_ADD
+    for key in POTENTIAL_KEYS:
+        raw = item.get(key)
+        row += _line_codes(raw) if raw else EMPTY_LINE
+    return row
+
+
+def _flatten(items: list) -> dict:
+    """아이템 목록을 열 이름 → 배열로 펼칩니다."""
+    matrix = np.array([_item_row(item) for item in items], dtype=np.int64).reshape(len(items), len(ITEM_COLUMNS))
+    cols = {name: matrix[:, i] for i, name in enumerate(ITEM_COLUMNS)}
+    for name in FLAG_COLUMNS + tuple(f"{ptype}_{i}_{field}" for ptype in POTENTIAL_TYPES for i in range(3) for field in ("has_value", "pct")):
+        cols[name] = cols[name].astype(bool)
+    cols["add_matrix"] = matrix[:, ADD_START:ADD_START + len(ADD_KEYS)]
+    return cols
+
+
+def _profile_columns(profiles: list, counts: list) -> dict:
+    """세트(캐릭터)별 프로필을 아이템 행 수만큼 늘려 배열로 만듭니다."""
+    table = {}
+    index = [table.setdefault(p, len(table)) for p in profiles]
+    unique = list(table)
+    rows = np.repeat(np.array(index, dtype=np.int64), counts)
+
+    def column(values, dtype=None):
+        return np.array(values, dtype=dtype)[rows]
+
+    return {
+        "main_bit": column([STAT_BITS.get(p.pot_stat, 0) for p in unique]),
+        "is_xenon": column([p.pot_stat == "ALL_STAT" for p in unique]),
+        "atk_bit": column([STAT_BITS[p.atk_code] for p in unique]),
+        "is_int": column([p.atk_key == "magic_power" for p in unique]),
+        "all_stat_weight": column([p.pot_all_stat_weight for p in unique]),
+        "stat_multiplier": column([p.pot_stat_multiplier for p in unique]),
+        "additional_multiplier": column([p.additional_multiplier for p in unique]),
+        "add_target": column([ADD_TARGET_CODES[p.add_target] for p in unique]),
+        "is_demon_avenger": column([p.class_name == "데몬어벤져" for p in unique]),
+        "main_stat_index": column([ADD_KEYS.index(p.main_stat) for p in unique]),
+        "add_stat_mask": column([[key in p.add_stat_keys for key in ADD_KEYS] for p in unique], np.int64),
+        "add_all_stat_weight": column([p.add_all_stat_weight for p in unique]),
+        "add_atk_weight": column([p.add_atk_weight for p in unique]),
+    }
+
+
+def potential_scores(cols: dict, prof: dict, potential_type: str) -> "np.ndarray":
+    """calculate_potential_score 의 배열 버전 (제외 부위는 -1)"""
+    n = len(cols["star"])
+    stat_total = np.zeros(n)
+    special_total = np.zeros(n)
+    crit_count = np.zeros(n, dtype=np.int64)
+    crit_sum = np.zeros(n, dtype=np.int64)
+    main = prof["main_bit"]
+    xenon = prof["is_xenon"]
+    xenon_stat_lines = []
+
+    for i in range(3):
+        prefix = f"{potential_type}_{i}_"
+        stats, kind, pct = cols[prefix + "stats"], cols[prefix + "kind"], cols[prefix + "pct"]
+        has_value = cols[prefix + "has_value"]
+        val = cols[prefix + "value"].astype(np.float64)
+
+        is_crit = (kind == KIND_CODES["crit_damage"]) & has_value
+        crit_count += is_crit
+        crit_sum += np.where(is_crit, cols[prefix + "value"], 0)
+
+        is_cooldown = (kind == KIND_CODES["cooldown"]) & has_value
+        special_total += np.where(is_cooldown, val * 7.25, 0.0)
+
+        scored = has_value & (kind != KIND_CODES["crit_damage"]) & (kind != KIND_CODES["cooldown"])
+        is_all = (stats & STAT_BITS["ALL"]) != 0
+        per_level = kind == KIND_CODES["per_level"]
+        recovery = kind == KIND_CODES["recovery"]
+        is_xenon_stat = (stats & XENON_BITS) != 0
+        is_atk = (stats & ATTACK_BITS) != 0
+        is_main = (stats & main) != 0
+
+        xenon_contrib = np.select(
+            [is_all & pct, per_level, is_xenon_stat & pct, ((stats & STAT_BITS["ATK"]) != 0) & ~pct, is_xenon_stat & ~pct],
+            [val, np.where(is_xenon_stat, val / 3.0, 0.0), val / 3.0, val * 0.3, (val / 3.0) * 0.09],
+            default=0.0
+        )
+        normal_contrib = np.select(
+            [is_all & pct, per_level & is_main, is_main & pct & ~recovery, is_atk & ~pct, is_main & ~pct & ~recovery],
+            [val * prof["all_stat_weight"], val * 3.5, val, np.where((stats & prof["atk_bit"]) != 0, val * 0.3, 0.0),
+             val * 0.09],
+            default=0.0
+        )
+        stat_total += np.where(scored, np.where(xenon, xenon_contrib, normal_contrib), 0.0)
+        xenon_stat_lines.append(is_xenon_stat)
+
+    if potential_type == "potential":
+        cd_points = np.where(crit_count == 1, crit_sum * 1.125, np.where(crit_count >= 2, crit_sum * 1.875, 0.0))
+    else:
+        cd_points = crit_sum * 4.0
+    special_total += cd_points
+
+    stat_total *= prof["stat_multiplier"]
+    if potential_type == "additional_potential":
+        stat_total *= prof["additional_multiplier"]
+
+    scores = _py_round(stat_total + special_total, 2)
+    return np.where(cols["pot_excluded"], -1.0, scores)
+
+
+def weapon_potential_scores(cols: dict, prof: dict, potential_type: str) -> "np.ndarray":
+    """calculate_weapon_potential_score 의 배열 버전"""
+    n = len(cols["star"])
+    stat_total = np.zeros(n)
+    special_total = np.zeros(n)
+    target_stat = prof["main_bit"]
+
+    for i in range(3):
+        prefix = f"{potential_type}_{i}_"
+        stats, kind, pct = cols[prefix + "stats"], cols[prefix + "kind"], cols[prefix + "pct"]
+        val = cols[prefix + "value"].astype(np.float64)
+        scored = cols[prefix + "has_value"] & pct & (kind != KIND_CODES["cooldown"])
+
+        is_damage = (kind == KIND_CODES["damage"]) | (kind == KIND_CODES["crit_damage"])
+        is_ignore = kind == KIND_CODES["ignore_def"]
+        special_total += np.where(scored, np.select([is_damage, is_ignore], [val * 0.275, val * 0.1875], default=0.0), 0.0)
+
+        stat_contrib = np.select(
+            [is_damage | is_ignore, (stats & prof["atk_bit"]) != 0, (stats & STAT_BITS["ALL"]) != 0,
+             ((stats & target_stat) != 0) & (kind != KIND_CODES["recovery"])],
+            [0.0, val, val * 0.2475, val * 0.225],
+            default=0.0
+        )
+        stat_total += np.where(scored, stat_contrib, 0.0)
+
+    scores = _py_round(stat_total + special_total, 2)
+    return np.where(cols["weapon_pot"], scores, 0.0)
+
+
+def weapon_add_scores(cols: dict, prof: dict) -> "np.ndarray":
+    """calculate_weapon_add_option_score 의 배열 버전"""
+    is_int = prof["is_int"]
+    base_atk = np.where(is_int, cols["base_magic_power"], cols["base_attack_power"]).astype(np.float64)
+    add_atk = np.where(is_int, cols["add_magic_power"], cols["add_attack_power"]).astype(np.float64)
+    target_stat = cols["add_matrix"][np.arange(len(base_atk)), prof["main_stat_index"]]
+
+    valid = cols["has_add_base"] & (base_atk != 0)
+    atk_score = (add_atk / np.where(valid, base_atk, 1.0)) * 100
+    total = (atk_score + cols["add_boss_damage"] * 0.275 + cols["add_damage"] * 0.275
+             + cols["add_all_stat"] * 0.2475 + target_stat * 0.05)
+    return np.where(valid, _py_round(total, 2), 0.0)
+
+
+def add_option_values(cols: dict, prof: dict) -> "np.ndarray":
+    """calculate_item_score (추가옵션 급수) 의 배열 버전"""
+    stat_val = (cols["add_matrix"] * prof["add_stat_mask"]).sum(axis=1)
+    atk_val = np.where(prof["is_int"], cols["add_magic_power"], cols["add_attack_power"])
+    return stat_val + cols["add_all_stat"] * prof["add_all_stat_weight"] + atk_val * prof["add_atk_weight"]
+
+
+def _add_targets(levels: "np.ndarray", branch: "np.ndarray") -> "np.ndarray":
+    """get_advanced_add_score 의 목표 급수 (목표가 없으면 NaN)"""
+    target_maps = {
+        0: ({250: 186, 200: 162, 160: 144, 150: 132, 140: 126, 135: 123, 130: 120}, lambda lv: (lv * 0.6) + 42),
+        1: ({250: 300, 200: 265, 160: 240, 150: 220}, lambda lv: (lv * 1.2) + 40),
+        2: ({250: 4200, 200: 3600, 160: 2880, 150: 2700}, lambda lv: lv * 18),
+    }
+    targets = np.full(len(levels), np.nan)
+    for code, (target_map, formula) in target_maps.items():
+        for level in np.unique(levels[branch == code]).tolist():
+            target = target_map.get(level)
+            if target is None:
+                target = formula(level) if level >= 100 else math.nan
+            targets[(branch == code) & (levels == level)] = target
+    return targets
+
+
+def advanced_add_scores(actual: "np.ndarray", levels: "np.ndarray", no_add: "np.ndarray", branch: "np.ndarray") -> "np.ndarray":
+    """get_advanced_add_score 의 배열 버전 (구간 누적 점수 테이블 조회)"""
+    target = _add_targets(levels, branch)
+    has_target = ~np.isnan(target) & ~no_add
+    safe_target = np.where(has_target, target, 1.0)
+
+    diff_percent = ((actual - safe_target) / safe_target) * 100.0
+    over = diff_percent > 0
+    rem = np.abs(diff_percent)
+    chunks = np.floor_divide(rem, ADD_CHUNK)
+    partial = rem - ADD_CHUNK * chunks
+    chunks = np.where(has_target, chunks, 0).astype(np.int64)
+
+    # 초과 / 미달 테이블을 각각 필요한 구간까지만 늘림
+    _extend_add_tables(int(chunks[over].max(initial=0)), True)
+    _extend_add_tables(int(chunks[~over].max(initial=0)), False)
+    over_scores, over_mults = np.array(ADD_OVER_SCORES), np.array(ADD_OVER_MULTS)
+    under_scores, under_mults = np.array(ADD_UNDER_SCORES), np.array(ADD_UNDER_MULTS)
+
+    # 초과 테이블은 배율이 0 이 되면 더 늘어나지 않으므로 마지막 값으로 고정
+    over_idx = np.minimum(chunks, len(over_scores) - 1)
+    over_value = np.where(partial > 0, over_scores[over_idx] + partial * over_mults[over_idx], over_scores[over_idx])
+    under_idx = np.minimum(chunks, len(under_scores) - 1)
+    under_value = np.where(partial > 0, under_scores[under_idx] - partial * under_mults[under_idx], under_scores[under_idx])
+
+    score = np.where(over, over_value, under_value)
+    return np.where(has_target, _py_round(np.maximum(0, score), 2), 100.0)
+
+
+def starforce_scores(stars: "np.ndarray", levels: "np.ndarray") -> "np.ndarray":
+    """get_starforce_score 의 배열 버전"""
+    weight = 1.0 + (levels - 200) / 600.0
+    base22 = 100.0 * ((np.minimum(stars, 22) / 22.0) ** 2) * weight
+    # log 는 구현마다 마지막 자리가 다를 수 있어 math.log 로 만든 테이블을 사용
+    bonus_table = np.array([3.0 * math.log(s - 21) if s > 22 else 0.0 for s in range(max(int(stars.max(initial=0)), 22) + 1)])
+    score = np.where(stars <= 22, base22, base22 + bonus_table[np.clip(stars, 0, None)])
+    return np.where(levels <= 0, 0.0, score)
+
+
+def bulk_evaluate(equipment_sets: list) -> BulkScores:
+    """[(items, char_class, char_level), ...] 를 한 번에 채점합니다."""
+    _require_numpy()
+
+    # 잠재 점수는 캐릭터 레벨과 무관하므로 char_level 은 evaluate_equipment 와 인자 형태를 맞추기 위해서만 받음
+    rows, profiles, counts = [], [], []
+    for items, char_class, _char_level in equipment_sets:
+        rows.extend(items)
+        profiles.append(get_class_profile(char_class))
+        counts.append(len(items))
+
+    set_index = np.repeat(np.arange(len(equipment_sets), dtype=np.int64), counts)
+    item_index = np.arange(len(rows), dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+    cols = _flatten(rows)
+    prof = _profile_columns(profiles, counts)
+    star, req_level = cols["star"], cols["req_level"]
+
+    # 스타포스 (놀장 / 슈페리얼 보정)
+    is_noljang = (
+        (star >= 8) & (star <= 15) & ~cols["is_superior"] & (req_level <= 150)
+        & (((cols["etc_stats_max"] > 50) & (cols["etc_atk_max"] > 10))
+           | ((cols["star_stats_max"] == 0) & ((cols["etc_stats_max"] > 30) | (cols["etc_atk_max"] > 15))))
+    )
+    star_score = starforce_scores(np.where(is_noljang, 22, star), req_level)
+    star_score = np.where(cols["is_superior"] & ~is_noljang, star_score * 3.0, star_score)
+
+    # 방어구 / 장신구
+    add_values = add_option_values(cols, prof)
+    armor_add = advanced_add_scores(add_values, req_level, cols["no_add"], prof["add_target"])
+    armor_pot = potential_scores(cols, prof, "potential")
+    armor_eddy = potential_scores(cols, prof, "additional_potential")
+
+    # 무기 / 보조무기 / 엠블렘
+    weapon_add = np.where(cols["is_sub_weapon"], 100.0, weapon_add_scores(cols, prof) * 2.0)
+    weapon_pot = weapon_potential_scores(cols, prof, "potential")
+    weapon_eddy = weapon_potential_scores(cols, prof, "additional_potential")
+    star_score = np.where(cols["is_weapon"] & cols["is_sub_weapon"], 100.0, star_score)
+
+    is_weapon = cols["is_weapon"]
+    add_score = np.where(is_weapon, weapon_add, armor_add)
+    pot_val = np.where(is_weapon, weapon_pot, armor_pot)
+    eddy_val = np.where(is_weapon, weapon_eddy, armor_eddy)
+    pot_score = np.where(pot_val > 0, pot_val * 3.3, 0.0)
+    eddy_score = np.where(eddy_val > 0, eddy_val * 2.5, 0.0)
+    total = add_score + pot_score + eddy_score + star_score
+
+    # 특수 부위 (훈장 / 뱃지 / 포켓 / 칭호)
+    is_special = cols["is_special"]
+    pocket = np.where(prof["is_demon_avenger"] & (add_values > 0), add_values / 11, add_values)
+    special_total = np.where(cols["is_pocket"], pocket, cols["special_fixed"])
+
+    included = is_special | ((pot_val != -1) & ~cols["excluded_ring"])
+    zeros = np.zeros(len(rows))
+    return BulkScores(
+        set_index=set_index,
+        item_index=item_index,
+        included=included,
+        is_special=is_special,
+        total_score=_py_round(np.where(is_special, special_total, total), 2),
+        add=_py_round(np.where(is_special, special_total, add_score), 1),
+        star=np.where(is_special, zeros, _py_round(star_score, 1)),
+        pot=np.where(is_special, zeros, _py_round(pot_score, 1)),
+        pot_additional=np.where(is_special, zeros, _py_round(eddy_score, 1)),
+    )
+
+
+def bulk_best_presets(characters: list) -> "np.ndarray":
+    """[(item_data, char_class, char_level), ...] 각각의 get_best_preset 결과 (1~3)"""
+    _require_numpy()
+
+    rows, profiles, counts = [], [], []
+    for item_data, char_class, _char_level in characters:
+        profile = get_class_profile(char_class)
+        for preset in range(1, 4):
+            items = item_data.get(f"item_equipment_preset_{preset}", []) or []
+            rows.extend(items)
+            profiles.append(profile)
+            counts.append(len(items))
+
+    if not rows:
+        return np.ones(len(characters), dtype=np.int64)
+
+    # 캐릭터 c 의 프리셋 p 는 c * 3 + (p - 1) 번째 칸에 합산
+    slots = np.repeat(np.arange(len(counts), dtype=np.int64), counts)
+    cols = _flatten(rows)
+    prof = _profile_columns(profiles, counts)
+    pot = potential_scores(cols, prof, "potential")
+    eddy = potential_scores(cols, prof, "additional_potential")
+
+    # 프리셋 합계는 아이템 순서대로(윗잠 → 에디) 더해야 같은 값이 나오므로 순차 누적하는 bincount 사용
+    weights = np.empty(len(rows) * 2)
+    weights[0::2] = np.where(pot > 0, pot, 0.0)
+    weights[1::2] = np.where(eddy > 0, eddy, 0.0)
+    totals = np.bincount(np.repeat(slots, 2), weights=weights, minlength=len(characters) * 3)
+    return totals.reshape(len(characters), 3).argmax(axis=1) + 1
@@ -0,0 +1,232 @@
+import os
+import time
+import asyncio
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# 캐시에 값이 없음을 나타내는 표식 (None 자체도 캐시 값이 될 수 있으므로 별도 객체 사용)
+MISSING = object()
+
+
+def normalize_name(character_name: str) -> str:
+    """캐릭터명 → 비교 / 캐시 키 (ocid 캐시, 스냅샷 저장소, 재생 픽스처가 모두 이 규칙을 공유)"""
+    return character_name.strip().lower()
+
+
+class TTLCache:
+    """크기 제한(LRU 축출)과 항목별 만료 시간(TTL)을 지원하는 인메모리 캐시"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=MISSING):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data), "maxsize": self.maxsize,
+            "hits": self.hits, "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+
+class OcidCache:
+    """캐릭터명 → ocid 캐시
+
+    - 찾은 ocid 는 긴 TTL, "캐릭터 없음" 결과는 짧은 TTL 로 캐싱 (negative caching)
+    - db_path 를 지정하면 sqlite 에도 기록하여 워커 재시작 후에도 캐시를 이어서 사용
+      이벤트 루프를 막지 않도록 디스크 조회는 스레드에서, 기록은 백그라운드(write-behind)로 처리
+    """
+
+    NOT_FOUND = ""  # sqlite 에도 그대로 저장할 수 있는 "캐릭터 없음" 표식
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 86400.0, negative_ttl: float = 60.0, db_path: str = None):
+        self.memory = TTLCache(maxsize, ttl)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.db = None
+        self.lock = threading.Lock()  # 스레드에서 연결 하나를 같이 쓰므로 잠금으로 보호
+        self.pending = set()  # 진행 중인 디스크 기록 태스크 (참조 유지 / 종료 시 flush)
+        if db_path:
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS ocid_cache ("
+                "name TEXT PRIMARY KEY, ocid TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self.db.commit()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            maxsize=int(os.getenv("OCID_CACHE_SIZE", "10000")),
+            ttl=float(os.getenv("OCID_CACHE_TTL", "86400")),
+            negative_ttl=float(os.getenv("OCID_NEGATIVE_TTL", "60")),
+            db_path=os.getenv("OCID_CACHE_DB") or None,
+        )
+
+    async def get(self, character_name: str):
+        """캐시된 ocid, 캐릭터 없음(NOT_FOUND), 또는 MISSING 을 반환합니다."""
+        key = normalize_name(character_name)
+        value = self.memory.get(key)
+        if value is not MISSING or self.db is None:
+            return value
+
+        # 메모리 미스 → 디스크 캐시 조회 (wall-clock 기준 만료 시각 저장)
+        row = await asyncio.to_thread(self._load, key)
+        if row is None:
+            return MISSING
+        ocid, expires_at = row
+        remaining = expires_at - time.time()
+        if remaining <= 0:
+            return MISSING
+
+        # 디스크에서 찾은 값은 미스 대신 히트로 집계
+        self.memory.misses -= 1
+        self.memory.hits += 1
+        self.memory.set(key, ocid, ttl=remaining)
+        return ocid
+
+    def set(self, character_name: str, ocid: str):
+        self._store(normalize_name(character_name), ocid, self.ttl)
+
+    def set_not_found(self, character_name: str):
+        self._store(normalize_name(character_name), self.NOT_FOUND, self.negative_ttl)
+
+    def _store(self, key: str, ocid: str, ttl: float):
+        self.memory.set(key, ocid, ttl=ttl)
+        if self.db is None:
+            return
+        expires_at = time.time() + ttl
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # 이벤트 루프 밖(스크립트 등)에서는 바로 기록
+            self._write(key, ocid, expires_at)
+            return
+        task = asyncio.create_task(self._write_behind(key, ocid, expires_at))
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+
+    async def _write_behind(self, key: str, ocid: str, expires_at: float):
+        try:
+            await asyncio.to_thread(self._write, key, ocid, expires_at)
+        except Exception as e:
+            print(f"ocid 캐시 저장 실패 ({key}): {e}")
+
+    def _load(self, key: str):
+        with self.lock:
+            return self.db.execute("SELECT ocid, expires_at FROM ocid_cache WHERE name = ?", (key,)).fetchone()
+
+    def _write(self, key: str, ocid: str, expires_at: float):
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO ocid_cache (name, ocid, expires_at) VALUES (?, ?, ?)",
+                (key, ocid, expires_at)
+            )
+            self.db.commit()
+
+    async def flush(self):
+        """아직 끝나지 않은 디스크 기록을 기다립니다. (서버 종료 시)"""
+        if self.pending:
+            await asyncio.gather(*self.pending, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {**self.memory.stats(), "persistent": self.db is not None, "pending_writes": len(self.pending)}
+
+
+class ReportCache:
+    """ocid → 완성된 진단 리포트 캐시 (stale-while-revalidate)
+
+    - fresh_ttl 이내: 그대로 응답 (fresh)
+    - fresh_ttl ~ fresh_ttl + stale_ttl: 기존 리포트로 즉시 응답하고 백그라운드에서 갱신 (stale)
+    - 그 이후: 만료되어 새로 조회
+    """
+
+    def __init__(self, maxsize: int = 2000, fresh_ttl: float = 300.0, stale_ttl: float = 3600.0):
+        self.entries = TTLCache(maxsize, fresh_ttl + stale_ttl)
+        self.fresh_ttl = fresh_ttl
+        self.refreshing = set()  # 백그라운드 갱신 중인 ocid (중복 갱신 방지)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            maxsize=int(os.getenv("REPORT_CACHE_SIZE", "2000")),
+            fresh_ttl=float(os.getenv("REPORT_CACHE_FRESH", "300")),
+            stale_ttl=float(os.getenv("REPORT_CACHE_STALE", "3600")),
+        )
+
+    def get(self, ocid: str):
+        """(report, is_fresh) 또는 MISSING 을 반환합니다."""
+        entry = self.entries.get(ocid)
+        if entry is MISSING:
+            return MISSING
+        report, created_at = entry
+        return report, (time.monotonic() - created_at) < self.fresh_ttl
+
+    def set(self, ocid: str, report: dict):
+        self.entries.set(ocid, (report, time.monotonic()))
+
+    def stats(self) -> dict:
+        return {**self.entries.stats(), "refreshing": len(self.refreshing)}
+
+
+class SingleFlight:
+    """동일한 키로 동시에 들어온 작업을 하나로 합칩니다 (request coalescing).
+
+    먼저 들어온 요청(leader)의 작업 결과를 뒤따라온 요청(follower)들이 함께 받아갑니다.
+    한 클라이언트가 연결을 끊어도 공유 작업은 취소되지 않도록 shield 로 감쌉니다.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key, func):
+        task = self._inflight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.followers += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {"inflight": len(self._inflight), "leaders": self.leaders, "followers": self.followers}
@@ -1,70 +1,127 @@
-import re
 import math
-
-def get_main_stat(class_name: str, stat_data: dict = None) -> str:
-    """직업명을 받아 주스탯 키워드를 반환합니다."""
-    stat_map = {
-        "str": ["히어로", "팔라딘", "다크나이트", "소울마스터", "미하일", "데몬슬레이어", "아란", "카이저", "제로", "블래스터", "렌", "아델", "바이퍼",
-                "스트라이커", "은월", "캐논마스터", "아크"],
-        "dex": ["보우마스터", "신궁", "패스파인더", "윈드브레이커", "와일드헌터", "메르세데스", "카인", "캡틴", "메카닉", "엔젤릭버스터"],
-        "int": ["아크메이지(불,독)", "아크메이지(썬,콜)", "비숍", "플레임위자드", "에반", "루미너스", "배틀메이지", "일리움", "라라", "키네시스"],
-        "luk": ["나이트로드", "섀도어", "듀얼블레이더", "나이트워커", "팬텀", "카데나", "칼리", "호영"]
-    }
-
+from typing import NamedTuple, Optional
+
+try:
+    from options import parse_potential
+except ImportError:
+    from app.options import parse_potential
+
+# 제논이 주스탯으로 인정받는 스탯
+XENON_STATS = frozenset(("STR", "DEX", "LUK"))
+# 잠재 옵션의 공격력 / 마력
+ATTACK_STATS = frozenset(("ATK", "MATK"))
+
+# 직업별 주스탯 분류
+STAT_MAP = {
+    "str": ["히어로", "팔라딘", "다크나이트", "소울마스터", "미하일", "데몬슬레이어", "아란", "카이저", "제로", "블래스터", "렌", "아델", "바이퍼",
+            "스트라이커", "은월", "캐논마스터", "아크"],
+    "dex": ["보우마스터", "신궁", "패스파인더", "윈드브레이커", "와일드헌터", "메르세데스", "카인", "캡틴", "메카닉", "엔젤릭버스터"],
+    "int": ["아크메이지(불,독)", "아크메이지(썬,콜)", "비숍", "플레임위자드", "에반", "루미너스", "배틀메이지", "일리움", "라라", "키네시스"],
+    "luk": ["나이트로드", "섀도어", "듀얼블레이더", "나이트워커", "팬텀", "카데나", "칼리", "호영"]
+}
+
+# [추가 기능] 주스탯 전환 가능 직업군: (전환 스탯, 기본 스탯)
+# 바이퍼, 캐논마스터는 기본 STR이나 DEX가 높으면 DEX로 전환
+# 캡틴은 기본 DEX이나 STR이 높으면 STR로 전환
+STAT_SWITCH = {"바이퍼": ("dex", "str"), "캐논마스터": ("dex", "str"), "캡틴": ("str", "dex")}
+
+# 올스탯% 잠재 가중치가 높은 직업
+HIGH_ALL_STAT_CLASSES = ["섀도어", "카데나", "듀얼블레이더"]
+
+
+class ClassProfile(NamedTuple):
+    """직업별 점수 계산 설정 (임포트 시 한 번만 만들어 재사용)"""
+    class_name: str
+    main_stat: str                 # str / dex / int / luk / hp(데몬어벤져) / all_stat(제논)
+    pot_stat: str                  # 잠재 옵션 비교용 대문자 스탯 (STR, HP, ALL_STAT ...)
+    atk_key: str                   # attack_power / magic_power
+    atk_code: str                  # 잠재 옵션 비교용 공/마 코드 (ATK / MATK)
+    add_stat_keys: tuple           # 추가옵션 급수에 합산할 스탯 키
+    add_all_stat_weight: int       # 추가옵션 올스탯% 가중치
+    add_atk_weight: int            # 추가옵션 공/마 가중치
+    pot_all_stat_weight: float     # 잠재 올스탯% 가중치
+    pot_stat_multiplier: float     # 잠재 스탯 점수 배율 (제논 1.35)
+    additional_multiplier: float   # 에디셔널 스탯 점수 배율 (데몬어벤져 0.9)
+    add_target: str                # 추가옵션 목표 급수 테이블 (default / xenon / demon_avenger)
+    stat_switch: Optional[tuple]   # 주스탯 전환 규칙 (전환 스탯, 기본 스탯)
+
+
+def _build_profile(class_name: str, main_stat: str) -> ClassProfile:
+    if main_stat == "hp":
+        add_stat_keys, add_all_stat_weight, add_atk_weight = ("max_hp",), 0, 15
+    elif main_stat == "all_stat":
+        add_stat_keys, add_all_stat_weight, add_atk_weight = ("str", "dex", "luk"), 20, 5
+    elif main_stat == "int":
+        add_stat_keys, add_all_stat_weight, add_atk_weight = ("int",), 10, 3
+    else:
+        add_stat_keys, add_all_stat_weight, add_atk_weight = (main_stat,), 10, 4
+
+    return ClassProfile(
+        class_name=class_name,
+        main_stat=main_stat,
+        pot_stat=main_stat.upper(),
+        atk_key="magic_power" if main_stat == "int" else "attack_power",
+        atk_code="MATK" if main_stat == "int" else "ATK",
+        add_stat_keys=add_stat_keys,
+        add_all_stat_weight=add_all_stat_weight,
+        add_atk_weight=add_atk_weight,
+        pot_all_stat_weight=1.2 if class_name in HIGH_ALL_STAT_CLASSES else 1.1,
+        pot_stat_multiplier=1.35 if main_stat == "all_stat" else 1.0,
+        additional_multiplier=0.9 if class_name == "데몬어벤져" else 1.0,
+        add_target={"제논": "xenon", "데몬어벤져": "demon_avenger"}.get(class_name, "default"),
+        stat_switch=STAT_SWITCH.get(class_name),
+    )
+
+
+def _build_profiles() -> dict:
+    profiles = {"데몬어벤져": _build_profile("데몬어벤져", "hp"), "제논": _build_profile("제논", "all_stat")}
+    for stat, classes in STAT_MAP.items():
+        for class_name in classes:
+            profiles[class_name] = _build_profile(class_name, stat)
+    return profiles
+
+
+CLASS_PROFILES = _build_profiles()
+# 주스탯 전환 시 사용할 프로필: (직업명, 전환된 주스탯) → ClassProfile
+SWITCHED_PROFILES = {
+    (class_name, stat): _build_profile(class_name, stat)
+    for class_name, switch in STAT_SWITCH.items() for stat in switch
+}
+# 목록에 없는 직업은 STR 직업으로 취급 (직업명에 따라 달라지는 설정이 없으므로 프로필 하나를 공유)
+DEFAULT_PROFILE = _build_profile("", "str")
+
+
+def get_class_profile(class_name: str, stat_data: dict = None) -> ClassProfile:
+    """직업명(및 선택적으로 캐릭터 스탯)으로 미리 계산된 ClassProfile 을 반환합니다."""
     target_class = class_name.replace(" ", "")
+    profile = CLASS_PROFILES.get(target_class, DEFAULT_PROFILE)
 
-    if target_class == "데몬어벤져": return "hp"
-    if target_class == "제논": return "all_stat"
-
-    # [추가 기능] 주스탯 전환 가능 직업군 판별 로직
-    # 바이퍼, 캐논마스터는 기본 STR이나 DEX가 높으면 DEX로 전환
-    # 캡틴은 기본 DEX이나 STR이 높으면 STR로 전환
-    if target_class in ["바이퍼", "캐논마스터", "캡틴"] and stat_data and "final_stat" in stat_data:
+    if profile.stat_switch and stat_data and "final_stat" in stat_data:
         final_stats = {s['stat_name']: int(s['stat_value']) for s in stat_data.get('final_stat', [])}
-        char_str = final_stats.get('STR', 0)
-        char_dex = final_stats.get('DEX', 0)
-
-        if target_class in ["바이퍼", "캐논마스터"]:
-            return "dex" if char_dex > char_str else "str"
-        if target_class == "캡틴":
-            return "str" if char_str > char_dex else "dex"
+        switch_stat, base_stat = profile.stat_switch
+        if final_stats.get(switch_stat.upper(), 0) > final_stats.get(base_stat.upper(), 0):
+            return SWITCHED_PROFILES[(target_class, switch_stat)]
+        return SWITCHED_PROFILES[(target_class, base_stat)]
 
-    for stat, classes in stat_map.items():
-        if target_class in classes:
-            return stat
+    return profile
 
-    return "str"
 
-def calculate_item_score(add_option: dict, class_name: str) -> int:
-    main_stat = get_main_stat(class_name)
+def get_main_stat(class_name: str, stat_data: dict = None) -> str:
+    """직업명을 받아 주스탯 키워드를 반환합니다."""
+    return get_class_profile(class_name, stat_data).main_stat
 
+def calculate_item_score(add_option: dict, profile: ClassProfile) -> int:
+    stat_val = sum(int(add_option.get(key, 0)) for key in profile.add_stat_keys)
     all_stat_pct = int(add_option.get("all_stat", 0))
-    attack_pwr = int(add_option.get("attack_power", 0))
-    magic_pwr = int(add_option.get("magic_power", 0))
-
-    if main_stat == "hp":
-        hp_val = int(add_option.get("max_hp", 0))
-        return hp_val + (attack_pwr * 15)
+    atk_val = int(add_option.get(profile.atk_key, 0))
+    return stat_val + (all_stat_pct * profile.add_all_stat_weight) + (atk_val * profile.add_atk_weight)
 
-    if main_stat == "all_stat":
-        s_val = int(add_option.get("str", 0))
-        d_val = int(add_option.get("dex", 0))
-        l_val = int(add_option.get("luk", 0))
-        return s_val + d_val + l_val + (all_stat_pct * 20) + (attack_pwr * 5)
-
-    if main_stat == "int":
-        int_val = int(add_option.get("int", 0))
-        return int_val + (all_stat_pct * 10) + (magic_pwr * 3)
-
-    stat_val = int(add_option.get(main_stat, 0))
-    return stat_val + (all_stat_pct * 10) + (attack_pwr * 4)
-
-def get_advanced_add_score(actual_급수, level, part_name, char_name_class):
+def get_advanced_add_score(actual_급수, level, part_name, profile: ClassProfile):
     no_add_slots = ["반지", "어깨장식", "기계 심장", "훈장", "뱃지", "포켓 아이템", "엠블렘", "보조무기", "무기"]
     if any(k in part_name for k in no_add_slots):
         return 100.0
 
-    if char_name_class == "제논":
+    if profile.add_target == "xenon":
         target_map = {250: 300, 200: 265, 160: 240, 150: 220}
         target = target_map.get(level)
         if target is None:
@@ -72,7 +129,7 @@ def get_advanced_add_score(actual_급수, level, part_name, char_name_class):
                 target = (level * 1.2) + 40
             else:
                 return 100.0
-    elif char_name_class == "데몬어벤져":
+    elif profile.add_target == "demon_avenger":
         target_map = {250: 4200, 200: 3600, 160: 2880, 150: 2700}
         target = target_map.get(level)
         if target is None:
@@ -90,29 +147,47 @@ def get_advanced_add_score(actual_급수, level, part_name, char_name_class):
                 return 100.0
 
     diff_percent = ((actual_급수 - target) / target) * 100.0
-    score = 100.0
+    return round(max(0, add_diff_score(diff_percent)), 2)
+
+# 추가옵션 목표 대비 차이(%)를 5% 구간으로 나눠 구간마다 배율을 줄이거나(초과) 늘려(미달) 점수를 가감합니다.
+# 구간 n 개를 지난 뒤의 누적 점수와 다음 구간 배율을 테이블로 미리 쌓아두고,
+# 남은 구간(5% 미만)만 곱해 더하는 방식으로 반복문 없이 계산합니다. (부동소수 연산 순서도 반복문과 동일)
+ADD_CHUNK = 5.0
+ADD_OVER_SCORES, ADD_OVER_MULTS = [100.0], [0.5]     # 목표 초과: 배율 0.5 에서 0.9 배씩 감소
+ADD_UNDER_SCORES, ADD_UNDER_MULTS = [100.0], [1.2]   # 목표 미달: 배율 1.2 에서 1.05 배씩 증가 (최대 3.0)
+
+
+def _extend_add_tables(n: int, over: bool):
+    scores, mults = (ADD_OVER_SCORES, ADD_OVER_MULTS) if over else (ADD_UNDER_SCORES, ADD_UNDER_MULTS)
+    while len(scores) <= n:
+        score, mult = scores[-1], mults[-1]
+        if over:
+            if mult == 0.0:  # 배율이 0 으로 수렴하면 더 이상 점수가 변하지 않음
+                break
+            scores.append(score + ADD_CHUNK * mult)
+            mults.append(mult * 0.9)
+        else:
+            scores.append(score - ADD_CHUNK * mult)
+            mults.append(min(mult * 1.05, 3.0))
+    return scores, mults
+
+
+def add_diff_score(diff_percent: float) -> float:
+    """목표 대비 차이(%)에 대한 추가옵션 점수 (반올림/0 하한 적용 전)"""
+    over = diff_percent > 0
     rem = abs(diff_percent)
+    n = int(rem // ADD_CHUNK)
+    partial = rem - ADD_CHUNK * n
 
-    if diff_percent > 0:
-        mult = 0.5
-        decay = 0.9
-    else:
-        mult = 1.2
-        decay = 1.05
-
-    while rem > 0:
-        chunk = min(5.0, rem)
-        if diff_percent > 0:
-            score += (chunk * mult)
-            mult *= decay
-        else:
-            score -= (chunk * mult)
-            mult = min(mult * decay, 3.0)
-        rem -= chunk
+    scores, mults = _extend_add_tables(n, over)
+    if n >= len(scores):
+        return scores[-1]
 
-    return round(max(0, score), 2)
+    if partial > 0:
+        return scores[n] + partial * mults[n] if over else scores[n] - partial * mults[n]
+    return scores[n]
 
-def calculate_potential_score(item_data: dict, potential_type: str, class_name: str, char_level: int) -> float:
+def calculate_potential_score(item_data: dict, potential_type: str, profile: ClassProfile, char_level: int) -> float:
     slot = item_data.get("item_equipment_slot", "")
     part = item_data.get("item_equipment_part", "")
 
@@ -122,13 +197,7 @@ def calculate_potential_score(item_data: dict, potential_type: str, class_name:
     if is_excluded:
         return -1
 
-    main_stat = get_main_stat(class_name).upper()
-
-    options = [
-        item_data.get(f"{potential_type}_option_1"),
-        item_data.get(f"{potential_type}_option_2"),
-        item_data.get(f"{potential_type}_option_3")
-    ]
+    main_stat = profile.pot_stat
 
     total_stat_score = 0.0
     total_special_score = 0.0
@@ -136,71 +205,45 @@ def calculate_potential_score(item_data: dict, potential_type: str, class_name:
     crit_count = 0
     crit_val_sum = 0
 
-    for opt in options:
-        if not opt: continue
-
-        if "크리티컬 데미지" in opt:
-            val_match = re.search(r'\+(\d+)%', opt)
-            if val_match:
+    for line in parse_potential(item_data, potential_type):
+        if line.kind == "crit_damage":
+            if line.value is not None:
                 crit_count += 1
-                crit_val_sum += int(val_match.group(1))
+                crit_val_sum += line.value
             continue
 
-        if "스킬 재사용 대기시간" in opt:
-            val_match = re.search(r'(\d+)초', opt)
-            if val_match:
-                total_special_score += int(val_match.group(1)) * 7.25
+        if line.kind == "cooldown":
+            if line.value is not None:
+                total_special_score += line.value * 7.25
             continue
 
+        if line.value is None: continue
+        val = line.value
+
         if main_stat == "ALL_STAT":
-            if "올스탯" in opt and "%" in opt:
-                val_match = re.search(r'\+(\d+)%', opt)
-                if val_match:
-                    total_stat_score += int(val_match.group(1))
-            elif "레벨" in opt:
-                val_match = re.search(r'\+(\d+)', opt)
-                if val_match:
-                    val = int(val_match.group(1))
-                    if any(stat in opt for stat in ["STR", "DEX", "LUK"]):
-                        total_stat_score += val / 3.0
-            elif any(stat in opt for stat in ["STR", "DEX", "LUK"]) and "%" in opt:
-                val_match = re.search(r'\+(\d+)%', opt)
-                if val_match:
-                    total_stat_score += int(val_match.group(1)) / 3.0
-            elif "공격력" in opt and "%" not in opt:
-                val_match = re.search(r'\+(\d+)', opt)
-                if val_match:
-                    total_stat_score += int(val_match.group(1)) * 0.3
-            elif any(stat in opt for stat in ["STR", "DEX", "LUK"]) and "%" not in opt:
-                val_match = re.search(r'\+(\d+)', opt)
-                if val_match:
-                    total_stat_score += (int(val_match.group(1)) / 3.0) * 0.09
+            if "ALL" in line.stats and line.is_percent:
+                total_stat_score += val
+            elif line.kind == "per_level":
+                if line.stats & XENON_STATS:
+                    total_stat_score += val / 3.0
+            elif line.stats & XENON_STATS and line.is_percent:
+                total_stat_score += val / 3.0
+            elif "ATK" in line.stats and not line.is_percent:
+                total_stat_score += val * 0.3
+            elif line.stats & XENON_STATS and not line.is_percent:
+                total_stat_score += (val / 3.0) * 0.09
         else:
-            if "올스탯" in opt and "%" in opt:
-                val_match = re.search(r'\+(\d+)%', opt)
-                if val_match:
-                    val = int(val_match.group(1))
-                    weight = 1.2 if class_name in ["섀도어", "카데나", "듀얼블레이더"] else 1.1
-                    total_stat_score += val * weight
-            elif "레벨" in opt and main_stat in opt:
-                val_match = re.search(r'\+(\d+)', opt)
-                if val_match:
-                    val = int(val_match.group(1))
-                    total_stat_score += val * 3.5
-            elif main_stat in opt and "%" in opt and "회복" not in opt:
-                val_match = re.search(r'\+(\d+)%', opt)
-                if val_match:
-                    total_stat_score += int(val_match.group(1))
-            elif ("공격력" in opt or "마력" in opt) and "%" not in opt:
-                atk_key = "마력" if main_stat == "INT" else "공격력"
-                if atk_key in opt:
-                    val_match = re.search(r'\+(\d+)', opt)
-                    if val_match:
-                        total_stat_score += int(val_match.group(1)) * 0.3
-            elif main_stat in opt and "%" not in opt and "회복" not in opt:
-                val_match = re.search(r'\+(\d+)', opt)
-                if val_match:
-                    total_stat_score += int(val_match.group(1)) * 0.09
+            if "ALL" in line.stats and line.is_percent:
+                total_stat_score += val * profile.pot_all_stat_weight
+            elif line.kind == "per_level" and main_stat in line.stats:
+                total_stat_score += val * 3.5
+            elif main_stat in line.stats and line.is_percent and line.kind != "recovery":
+                total_stat_score += val
+            elif line.stats & ATTACK_STATS and not line.is_percent:
+                if profile.atk_code in line.stats:
+                    total_stat_score += val * 0.3
+            elif main_stat in line.stats and not line.is_percent and line.kind != "recovery":
+                total_stat_score += val * 0.09
 
     cd_points = 0
     if potential_type == "potential":
@@ -213,23 +256,22 @@ def calculate_potential_score(item_data: dict, potential_type: str, class_name:
 
     total_special_score += cd_points
 
-    if main_stat == "ALL_STAT":
-        total_stat_score *= 1.35
+    total_stat_score *= profile.pot_stat_multiplier
 
-    if class_name == "데몬어벤져" and potential_type == "additional_potential":
-        total_stat_score *= 0.9
+    if potential_type == "additional_potential":
+        total_stat_score *= profile.additional_multiplier
 
     return round(total_stat_score + total_special_score, 2)
 
-def calculate_weapon_add_option_score(item_data: dict, class_name: str) -> float:
+def calculate_weapon_add_option_score(item_data: dict, profile: ClassProfile) -> float:
     add_option = item_data.get("item_add_option", {})
     base_option = item_data.get("item_base_option", {})
 
     if not add_option or not base_option:
         return 0.0
 
-    main_stat = get_main_stat(class_name)
-    target_atk_key = "magic_power" if main_stat == "int" else "attack_power"
+    main_stat = profile.main_stat
+    target_atk_key = profile.atk_key
 
     base_atk = int(base_option.get(target_atk_key, 0))
     add_atk = int(add_option.get(target_atk_key, 0))
@@ -246,41 +288,33 @@ def calculate_weapon_add_option_score(item_data: dict, class_name: str) -> float
     total_score = atk_score + boss_dmg_score + dmg_score + all_stat_score + target_stat_score
     return round(total_score, 2)
 
-def calculate_weapon_potential_score(item_data: dict, potential_type: str, class_name: str) -> float:
+def calculate_weapon_potential_score(item_data: dict, potential_type: str, profile: ClassProfile) -> float:
     slot = item_data.get("item_equipment_slot", "")
     part = item_data.get("item_equipment_part", "")
     is_wse = any(k in slot for k in ["무기", "보조무기"]) or "엠블렘" in part
     if not is_wse:
         return 0.0
 
-    main_stat = get_main_stat(class_name)
-    target_atk = "마력" if main_stat == "int" else "공격력"
-    target_stat = main_stat.upper()
-
-    options = [
-        item_data.get(f"{potential_type}_option_1"),
-        item_data.get(f"{potential_type}_option_2"),
-        item_data.get(f"{potential_type}_option_3")
-    ]
+    target_atk = profile.atk_code
+    target_stat = profile.pot_stat
 
     total_stat_score = 0.0
     total_special_score = 0.0
 
-    for opt in options:
-        if not opt: continue
-        val_match = re.search(r'\+(\d+)%', opt)
-        if not val_match: continue
-        val = int(val_match.group(1))
+    for line in parse_potential(item_data, potential_type):
+        # 무기류 잠재는 +N% 옵션만 점수에 반영
+        if line.kind == "cooldown" or not line.is_percent or line.value is None: continue
+        val = line.value
 
-        if "데미지" in opt:
+        if line.kind in ("damage", "crit_damage"):
             total_special_score += val * 0.275
-        elif "방어율 무시" in opt:
+        elif line.kind == "ignore_def":
             total_special_score += val * 0.1875
-        elif target_atk in opt and "%" in opt:
+        elif target_atk in line.stats:
             total_stat_score += val
-        elif "올스탯" in opt and "%" in opt:
+        elif "ALL" in line.stats:
             total_stat_score += val * 0.2475
-        elif target_stat in opt and "%" in opt and "회복" not in opt:
+        elif target_stat in line.stats and line.kind != "recovery":
             total_stat_score += val * 0.225
 
     return round(total_stat_score + total_special_score, 2)
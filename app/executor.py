@@ -0,0 +1,138 @@
+import os
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait
+
+
+def _timed_call(func, args):
+    # 워커(스레드 / 프로세스)에서 실행되는 래퍼: 실제 시작 시각과 실행 시간을 함께 돌려줌
+    started_at = time.time()
+    result = func(*args)
+    return result, started_at, time.time() - started_at
+
+
+class TaskExecutor:
+    """CPU 작업을 이벤트 루프 밖에서 실행하는 실행기 계층
+
+    - cpu: 순수 파이썬 점수 계산 (process / thread / inline). 기본값은 thread
+      (요청당 계산이 짧고 서버 공용 아이템 점수 메모를 함께 쓸 수 있음. 코어가 여러 개인 배포에서는 process 를 선택)
+    - render: PIL 이미지 처리 (GIL 을 놓는 작업이 많아 스레드 풀 사용)
+    작업 이름별로 대기 시간(큐)과 실행 시간을 집계하여 무거운 요청이 다른 요청을 막는지 확인합니다.
+    """
+
+    MODES = ("process", "thread", "inline")
+
+    def __init__(self, cpu_mode: str = "thread", cpu_workers: int = 2, render_workers: int = 4, slow_task_ms: float = 500.0):
+        if cpu_mode not in self.MODES:
+            print(f"⚠️ 알 수 없는 ANALYSIS_EXECUTOR={cpu_mode}, thread 로 실행합니다.")
+            cpu_mode = "thread"
+        self.cpu_mode = cpu_mode
+        self.cpu_workers = cpu_workers
+        self.render_workers = render_workers
+        self.slow_task_seconds = slow_task_ms / 1000.0
+        self.cpu_pool = None
+        self.render_pool = None
+        self.tasks = {}
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            cpu_mode=os.getenv("ANALYSIS_EXECUTOR", "thread").lower(),
+            cpu_workers=int(os.getenv("ANALYSIS_WORKERS", str(min(2, os.cpu_count() or 1)))),
+            render_workers=int(os.getenv("RENDER_WORKERS", "4")),
+            slow_task_ms=float(os.getenv("SLOW_TASK_MS", "500")),
+        )
+
+    def startup(self):
+        if self.cpu_mode == "process" and self.cpu_pool is None:
+            # 이벤트 루프 / 커넥션 풀 스레드가 떠 있는 상태에서 fork 하지 않도록 spawn 사용
+            self.cpu_pool = ProcessPoolExecutor(self.cpu_workers, mp_context=multiprocessing.get_context("spawn"))
+            # 첫 요청이 워커 기동 시간을 떠안지 않도록 서버 시작 단계에서 미리 띄워둠
+            wait([self.cpu_pool.submit(int) for _ in range(self.cpu_workers)])
+        elif self.cpu_mode == "thread" and self.cpu_pool is None:
+            self.cpu_pool = ThreadPoolExecutor(self.cpu_workers, thread_name_prefix="analysis")
+        if self.render_pool is None:
+            self.render_pool = ThreadPoolExecutor(self.render_workers, thread_name_prefix="render")
+
+    def shutdown(self):
+        for pool in (self.cpu_pool, self.render_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self.cpu_pool = None
+        self.render_pool = None
+
+    async def run_cpu(self, name: str, func, *args):
+        """점수 계산 등 순수 파이썬 작업 (process 모드에서는 func / args 가 pickle 가능해야 함)"""
+        if self.cpu_mode == "inline":
+            return self._run_inline(name, func, args)
+        return await self._submit(self.cpu_pool, name, func, args)
+
+    async def run_render(self, name: str, func, *args):
+        """PIL 리사이즈 / 합성 / 인코딩 작업"""
+        return await self._submit(self.render_pool, name, func, args)
+
+    async def _submit(self, pool, name, func, args):
+        if pool is None:
+            # startup 전 (스크립트 / 테스트 등) 에는 이벤트 루프에서 그대로 실행
+            return self._run_inline(name, func, args)
+
+        stat = self._stat(name)
+        submitted_at = time.time()
+        stat["inflight"] += 1
+        try:
+            result, started_at, elapsed = await asyncio.get_running_loop().run_in_executor(pool, _timed_call, func, args)
+        except Exception:
+            stat["errors"] += 1
+            raise
+        finally:
+            stat["inflight"] -= 1
+
+        self._record(name, stat, max(0.0, started_at - submitted_at), elapsed)
+        return result
+
+    def _run_inline(self, name, func, args):
+        stat = self._stat(name)
+        try:
+            result, _, elapsed = _timed_call(func, args)
+        except Exception:
+            stat["errors"] += 1
+            raise
+        self._record(name, stat, 0.0, elapsed)
+        return result
+
+    def _stat(self, name: str) -> dict:
+        stat = self.tasks.get(name)
+        if stat is None:
+            stat = self.tasks[name] = {
+                "calls": 0, "errors": 0, "inflight": 0,
+                "run_seconds_sum": 0.0, "run_seconds_max": 0.0,
+                "wait_seconds_sum": 0.0, "wait_seconds_max": 0.0, "slow": 0,
+            }
+        return stat
+
+    def _record(self, name, stat, waited, elapsed):
+        stat["calls"] += 1
+        stat["run_seconds_sum"] += elapsed
+        stat["run_seconds_max"] = max(stat["run_seconds_max"], elapsed)
+        stat["wait_seconds_sum"] += waited
+        stat["wait_seconds_max"] = max(stat["wait_seconds_max"], waited)
+        if elapsed >= self.slow_task_seconds:
+            stat["slow"] += 1
+            print(f"⚠️ 느린 작업: {name} {elapsed * 1000:.0f}ms (대기 {waited * 1000:.0f}ms)")
+
+    def stats(self) -> dict:
+        tasks = {}
+        for name, stat in self.tasks.items():
+            calls = stat["calls"]
+            tasks[name] = {
+                "calls": calls, "errors": stat["errors"], "inflight": stat["inflight"], "slow": stat["slow"],
+                "run_seconds_avg": round(stat["run_seconds_sum"] / calls, 4) if calls else 0.0,
+                "run_seconds_max": round(stat["run_seconds_max"], 4),
+                "wait_seconds_avg": round(stat["wait_seconds_sum"] / calls, 4) if calls else 0.0,
+                "wait_seconds_max": round(stat["wait_seconds_max"], 4),
+            }
+        return {
+            "cpu_mode": self.cpu_mode, "cpu_workers": self.cpu_workers, "render_workers": self.render_workers,
+            "tasks": tasks,
+        }
@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import zlib
+import marshal
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+try:
+    from analyzer import SCORING_VERSION
+    from cache import normalize_name
+except ImportError:
+    from app.analyzer import SCORING_VERSION
+    from app.cache import normalize_name
+
+# Nexon Open API 의 date 파라미터는 KST 기준 날짜
+KST = timezone(timedelta(hours=9))
+
+
+def today_kst() -> str:
+    return datetime.now(KST).date().isoformat()
+
+
+def _pack(value) -> bytes:
+    return zlib.compress(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def _unpack(blob: bytes):
+    return json.loads(zlib.decompress(blob)) if blob else None
+
+
+class SnapshotStore:
+    """ocid · 날짜(KST)별 원본 basic / item / stat 응답과 진단 결과를 보관하는 sqlite 저장소
+
+    - payload: Nexon 원본 응답 (zlib 압축 JSON). 같은 날 다시 조회하면 최신 응답으로 교체
+    - item_scores: 아이템 내용 키(ItemScoreMemo 키) → 부위별 점수. 다음 분석 때 내용이 같은 아이템은 다시 계산하지 않음
+      튜플 키를 그대로 빠르게 읽도록 marshal 로 저장 (파이썬 버전이 바뀌어 읽지 못하면 다시 계산)
+      scoring_version 이 현재 SCORING_VERSION 과 다른 스냅샷의 점수는 이어받지 않음
+    - summary: 레벨 · 전투력 · 평균 점수 · 부위별 점수 (/history 추이 조회용, 업스트림 호출 없음)
+    이벤트 루프를 막지 않도록 스레드에서 호출하며, 연결 하나를 잠금으로 보호합니다.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots ("
+            "ocid TEXT NOT NULL, date TEXT NOT NULL, name TEXT NOT NULL, fetched_at REAL NOT NULL, "
+            "payload BLOB NOT NULL, item_scores BLOB, summary TEXT NOT NULL, scoring_version INTEGER NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (ocid, date))"
+        )
+        # scoring_version 이 없던 예전 DB: 열을 추가하고 기존 행은 0 (점수 재사용 안 함)
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(snapshots)")}
+        if "scoring_version" not in columns:
+            self.db.execute("ALTER TABLE snapshots ADD COLUMN scoring_version INTEGER NOT NULL DEFAULT 0")
+        self.db.execute("CREATE INDEX IF NOT EXISTS snapshots_name ON snapshots (name, date)")
+        self.db.commit()
+        self.saved = 0
+        self.reused_items = 0
+        self.rescored_items = 0
+
+    @classmethod
+    def from_env(cls):
+        """SNAPSHOT_DB 가 지정된 경우에만 저장소를 만듭니다. (없으면 None)"""
+        db_path = os.getenv("SNAPSHOT_DB")
+        return cls(db_path) if db_path else None
+
+    def save(self, ocid: str, date: str, name: str, bundle: dict, item_scores: dict, summary: dict):
+        payload = _pack({"basic": bundle.get("basic"), "item": bundle.get("item"), "stat": bundle.get("stat")})
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO snapshots (ocid, date, name, fetched_at, payload, item_scores, summary, scoring_version) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (ocid, date, normalize_name(name), time.time(), payload, zlib.compress(marshal.dumps(item_scores or {}), 6),
+                 json.dumps(summary, ensure_ascii=False), SCORING_VERSION)
+            )
+            self.db.commit()
+            self.saved += 1
+
+    def load(self, ocid: str, date: str):
+        """저장된 원본 응답 {"basic", "item", "stat"} (없으면 None)"""
+        with self.lock:
+            row = self.db.execute("SELECT payload FROM snapshots WHERE ocid = ? AND date = ?", (ocid, date)).fetchone()
+        return _unpack(row[0]) if row else None
+
+    def latest_item_scores(self, ocid: str, until: str = None) -> dict:
+        """현재 SCORING_VERSION 으로 저장된 가장 최근 스냅샷의 {ItemScoreMemo 키: 점수} (until 이 있으면 그 날짜까지 중 최신)"""
+        query = "SELECT item_scores FROM snapshots WHERE ocid = ? AND scoring_version = ?"
+        params = [ocid, SCORING_VERSION]
+        if until:
+            query += " AND date <= ?"
+            params.append(until)
+        with self.lock:
+            row = self.db.execute(query + " ORDER BY date DESC LIMIT 1", params).fetchone()
+        if row is None or not row[0]:
+            return {}
+        try:
+            return marshal.loads(zlib.decompress(row[0]))
+        except (ValueError, EOFError, TypeError, zlib.error):
+            return {}
+
+    def find_ocid(self, character_name: str):
+        """캐릭터명으로 저장된 ocid 를 찾습니다. (업스트림 /id 호출 없이 /history 응답용)"""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT ocid FROM snapshots WHERE name = ? ORDER BY date DESC LIMIT 1", (normalize_name(character_name),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def history(self, ocid: str, days: int) -> list:
+        """최근 days 일 동안의 일별 요약 (오래된 날짜부터)"""
+        since = (datetime.now(KST).date() - timedelta(days=days - 1)).isoformat()
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT date, summary FROM snapshots WHERE ocid = ? AND date >= ? ORDER BY date", (ocid, since)
+            ).fetchall()
+        return [{"date": date, **json.loads(summary)} for date, summary in rows]
+
+    def record_reuse(self, reused: int, rescored: int):
+        self.reused_items += reused
+        self.rescored_items += rescored
+
+    def stats(self) -> dict:
+        with self.lock:
+            count, characters = self.db.execute("SELECT COUNT(*), COUNT(DISTINCT ocid) FROM snapshots").fetchone()
+        return {
+            "snapshots": count, "characters": characters, "saved": self.saved,
+            "reused_items": self.reused_items, "rescored_items": self.rescored_items,
+        }
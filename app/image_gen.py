@@ -1,11 +1,196 @@
 import os
+import time
+import hashlib
+import zipfile
 import httpx
 from io import BytesIO
-from PIL import Image, ImageDraw, ImageFont, ImageChops
+from PIL import Image, ImageDraw, ImageFont, ImageChops, features
 
+try:
+    from cache import TTLCache, MISSING, SingleFlight
+except ImportError:
+    from app.cache import TTLCache, MISSING, SingleFlight
+
+
+# 카드 출력 포맷 → MIME 타입 (AVIF / WebP 는 Pillow 빌드에 코덱이 포함된 경우에만 사용)
+CARD_FORMATS = {"png": "image/png", "webp": "image/webp", "avif": "image/avif"}
+
+
+def _codec_available(fmt: str) -> bool:
+    return fmt == "png" or bool(features.check(fmt))
+
+
+def encoder_options_from_env() -> dict:
+    """포맷별 Pillow save() 옵션 (환경 변수로 조정)"""
+    return {
+        "png": {"compress_level": int(os.getenv("CARD_PNG_COMPRESS_LEVEL", "6"))},
+        "webp": {
+            "lossless": os.getenv("CARD_WEBP_LOSSLESS", "0") == "1",
+            "quality": int(os.getenv("CARD_WEBP_QUALITY", "85")),
+            "method": int(os.getenv("CARD_WEBP_METHOD", "4")),
+        },
+        "avif": {
+            "quality": int(os.getenv("CARD_AVIF_QUALITY", "70")),
+            "speed": int(os.getenv("CARD_AVIF_SPEED", "8")),
+        },
+    }
+
+
+def negotiate_format(accept: str, preferred: list) -> str:
+    """Accept 헤더와 서버 선호 순서(preferred)로 카드 포맷을 고릅니다. 맞는 것이 없으면 png"""
+    accepted = {}
+    for part in (accept or "").split(","):
+        media, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try: quality = float(value)
+                except ValueError: quality = 0.0
+        if media:
+            accepted[media.strip().lower()] = quality
+
+    for fmt in preferred:
+        mime = CARD_FORMATS.get(fmt)
+        # image/* · */* 는 png 처럼 누구나 읽을 수 있는 포맷에만 적용 (webp/avif 는 명시적으로 요청한 경우만)
+        wildcard = max(accepted.get("image/*", 0), accepted.get("*/*", 0)) if fmt == "png" else 0
+        if mime and max(accepted.get(mime, 0), wildcard) > 0:
+            return fmt
+    return "png"
+
+
+class ZipStream:
+    """추가한 파일을 곧바로 바이트로 내보내는 ZIP 작성기 (StreamingResponse 용, 전체 ZIP 을 메모리에 쌓지 않음)
+
+    카드 이미지는 이미 압축된 포맷이므로 기본은 무압축(STORED) 으로 담습니다.
+    """
 
-class CardGenerator:
     def __init__(self):
+        self._chunks = []
+        # seek / tell 이 없는 출력이면 zipfile 이 순차 쓰기 모드로 동작
+        self._zip = zipfile.ZipFile(self, "w", zipfile.ZIP_STORED)
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def add(self, name: str, data: bytes, compress: bool = False) -> bytes:
+        self._zip.writestr(name, data, compress_type=zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED)
+        return self._drain()
+
+    def close(self) -> bytes:
+        self._zip.close()
+        return self._drain()
+
+    def _drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class CardSheet:
+    """여러 카드를 격자로 붙인 한 장짜리 시트 (길드 단체 카드용)
+
+    카드는 scale 배율로 줄여서 붙이며, 끝나는 순서와 상관없이 index 위치에 배치됩니다.
+    """
+
+    def __init__(self, count: int, card_size: tuple, columns: int = 10, scale: float = 0.5, gap: int = 8,
+                 bg_color: tuple = (235, 235, 235)):
+        self.columns = max(1, min(columns, count))
+        self.cell = (round(card_size[0] * scale), round(card_size[1] * scale))
+        self.gap = gap
+        rows = (count + self.columns - 1) // self.columns
+        width = self.columns * self.cell[0] + (self.columns + 1) * gap
+        height = rows * self.cell[1] + (rows + 1) * gap
+        self.image = Image.new("RGB", (width, height), bg_color)
+
+    def paste(self, index: int, card):
+        row, col = divmod(index, self.columns)
+        x = self.gap + col * (self.cell[0] + self.gap)
+        y = self.gap + row * (self.cell[1] + self.gap)
+        self.image.paste(card, (x, y))
+
+
+class AvatarCache:
+    """캐릭터 이미지 URL → 원형으로 잘라낸 200x200 아바타 캐시
+
+    - 메모리: 처리된 PIL 이미지를 LRU + TTL 로 보관 (이벤트 루프에서만 접근)
+    - 디스크(선택): cache_dir 에 무손실 PNG 로 저장하여 재시작 후에도 재사용 (렌더 스레드에서 접근)
+    - 같은 URL 을 동시에 요청하면 디스크 조회 / 다운로드 / 가공은 한 번만 (SingleFlight)
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 86400.0, cache_dir: str = None):
+        self.memory = TTLCache(maxsize, ttl)
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self.disk_hits = 0
+        self.downloads = 0
+        self.lookups = SingleFlight()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            maxsize=int(os.getenv("AVATAR_CACHE_SIZE", "256")),
+            ttl=float(os.getenv("AVATAR_CACHE_TTL", "86400")),
+            cache_dir=os.getenv("AVATAR_CACHE_DIR") or None,
+        )
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".png")
+
+    def load_disk(self, url: str):
+        """디스크에 저장된 아바타 (없거나 만료되면 None)"""
+        if not self.cache_dir:
+            return None
+        path = self._path(url)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            with Image.open(path) as img:
+                return img.convert("RGBA")
+        except (OSError, ValueError):
+            return None
+
+    def save_disk(self, url: str, avatar):
+        if not self.cache_dir:
+            return
+        # 다른 스레드가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+        path = self._path(url)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            avatar.save(tmp_path, format="PNG")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"아바타 캐시 저장 실패: {e}")
+
+    def stats(self) -> dict:
+        return {
+            **self.memory.stats(), "disk": self.cache_dir is not None, "disk_hits": self.disk_hits,
+            "downloads": self.downloads, "coalesced": self.lookups.followers,
+        }
+
+
+class CardGenerator:
+    # 카드 레이아웃을 바꾸면 올려서 캐시된 카드 이미지 / ETag 를 무효화
+    TEMPLATE_VERSION = "1"
+
+    def __init__(self, executor=None, fetch_image=None, avatar_cache: AvatarCache = None):
+        # 렌더링(PIL)을 넘길 실행기 (없으면 이벤트 루프에서 그대로 실행)
+        self.executor = executor
+        # 캐릭터 이미지 다운로드 함수 (async url -> bytes | None). 서버에서는 공용 커넥션 풀을 사용
+        self.fetch_image = fetch_image or self._fetch_image
+        self.avatar_cache = avatar_cache or AvatarCache(maxsize=64)
+
+        # 출력 포맷 선호 순서 (Accept 협상용, 코덱이 없는 포맷은 제외) 와 인코더 설정
+        formats = [f.strip().lower() for f in os.getenv("CARD_FORMATS", "webp,png").split(",") if f.strip()]
+        self.formats = [f for f in formats if f in CARD_FORMATS and _codec_available(f)] or ["png"]
+        self.encoder_options = encoder_options_from_env()
+
         # 1. 캔버스 및 색상 설정
         self.card_size = (400, 600)
         self.bg_color = (250, 250, 250)
@@ -22,6 +207,57 @@ class CardGenerator:
         self.font_bold = os.path.join(base_path, "static", "fonts", "Maplestory Bold.ttf")
         self.font_light = os.path.join(base_path, "static", "fonts", "Maplestory Light.ttf")
 
+        # 3. 캐릭터 원형 프레임 위치
+        self.char_diameter = 200
+        self.char_pos = ((self.card_size[0] - self.char_diameter) // 2, 60)
+
+        # 카드마다 바뀌지 않는 폰트 / 원형 마스크 / 배경(프레임·테두리)은 한 번만 만들어 재사용
+        self.title_font, self.info_font, self.class_font = self._load_fonts()
+        self.circle_mask = self._build_circle_mask()
+        self.background = self._build_background()
+
+    def _load_fonts(self):
+        try:
+            return (
+                ImageFont.truetype(self.font_bold, 44),
+                ImageFont.truetype(self.font_light, 26),
+                ImageFont.truetype(self.font_light, 20),
+            )
+        except:
+            return ImageFont.load_default(), ImageFont.load_default(), ImageFont.load_default()
+
+    def _build_circle_mask(self):
+        # 2배 크기로 그린 원을 줄여 가장자리를 부드럽게 (안티에일리어싱)
+        scale = 2
+        size = self.char_diameter * scale
+        mask_big = Image.new('L', (size, size), 0)
+        ImageDraw.Draw(mask_big).ellipse((0, 0, size, size), fill=255)
+        return mask_big.resize((self.char_diameter, self.char_diameter), Image.Resampling.LANCZOS)
+
+    def _build_background(self):
+        background = Image.new("RGB", self.card_size, self.bg_color)
+        draw = ImageDraw.Draw(background)
+
+        # 캐릭터 원형 프레임
+        char_x, char_y = self.char_pos
+        inner_border_width = 5
+        draw.ellipse(
+            (char_x - inner_border_width, char_y - inner_border_width,
+             char_x + self.char_diameter + inner_border_width, char_y + self.char_diameter + inner_border_width),
+            fill=self.border_color
+        )
+
+        self._draw_outer_border(draw)
+        return background
+
+    def _draw_outer_border(self, draw):
+        pad = self.outer_padding
+        draw.rectangle(
+            (pad, pad, self.card_size[0] - pad - 1, self.card_size[1] - pad - 1),
+            outline=self.border_color,
+            width=self.outer_border_width
+        )
+
     def format_korean_unit(self, number: int) -> str:
         """전투력을 억/만 단위로 변환"""
         if number == 0: return "0"
@@ -35,52 +271,109 @@ class CardGenerator:
         if won > 0 or not result: result += f"{won}"
         return result
 
-    async def create_card(self, data: dict):
-        card = Image.new("RGB", self.card_size, self.bg_color)
-        draw = ImageDraw.Draw(card)
+    async def _fetch_image(self, url: str):
+        async with httpx.AsyncClient() as client:
+            response = await client.get(url)
+            return response.content if response.status_code == 200 else None
 
-        # 3. 캐릭터 원형 프레임 (기존 로직 유지)
-        char_diameter = 200
-        char_x = (self.card_size[0] - char_diameter) // 2
-        char_y = 60
-        inner_border_width = 5
+    async def _run(self, name: str, func, *args):
+        if self.executor is None:
+            return func(*args)
+        return await self.executor.run_render(name, func, *args)
 
-        draw.ellipse(
-            (char_x - inner_border_width, char_y - inner_border_width,
-             char_x + char_diameter + inner_border_width, char_y + char_diameter + inner_border_width),
-            fill=self.border_color
-        )
+    async def create_card(self, data: dict, fmt: str = "png"):
+        """(인코딩된 카드, 완전한 카드인지) - 캐릭터 이미지가 있는데 아바타를 받아오지 못했으면 False (캐시하지 말 것)"""
+        # 캐릭터 이미지 다운로드(I/O)만 이벤트 루프에서 하고, 합성 / 인코딩은 렌더 스레드 풀에서 실행
+        avatar = await self.get_avatar(data['image'])
+        buf = await self._run("card_render", self.render_card, data, avatar, fmt)
+        return buf, avatar is not None or not data['image']
 
-        async with httpx.AsyncClient() as client:
+    async def compose(self, data: dict, scale: float = 1.0):
+        """인코딩하지 않은 카드 이미지 (시트 합성용, scale 배율로 축소)"""
+        avatar = await self.get_avatar(data['image'])
+        return await self._run("card_compose", self._compose_scaled, data, avatar, scale)
+
+    def _compose_scaled(self, data: dict, avatar, scale: float):
+        card = self.compose_card(data, avatar)
+        if scale != 1.0:
+            size = (round(self.card_size[0] * scale), round(self.card_size[1] * scale))
+            card = card.resize(size, Image.Resampling.LANCZOS)
+        return card
+
+    async def get_avatar(self, url: str):
+        """원형으로 잘라낸 캐릭터 이미지 (메모리 → 디스크 → 다운로드 순으로 조회, 실패하면 None)"""
+        if not url:
+            return None
+        avatar = self.avatar_cache.memory.get(url)
+        if avatar is not MISSING:
+            return avatar
+        return await self.avatar_cache.lookups.do(url, lambda: self._load_avatar(url))
+
+    async def _load_avatar(self, url: str):
+        # 디스크 캐시를 쓰지 않으면 렌더 스레드를 거치지 않고 바로 다운로드
+        avatar = None
+        if self.avatar_cache.cache_dir:
+            avatar = await self._run("avatar_disk", self.avatar_cache.load_disk, url)
+        if avatar is not None:
+            self.avatar_cache.disk_hits += 1
+        else:
             try:
-                img_res = await client.get(data['image'])
-                char_img_rgba = Image.open(BytesIO(img_res.content)).convert("RGBA")
-                char_img_large = char_img_rgba.resize((500, 500), Image.Resampling.LANCZOS)
-                char_square = char_img_large.crop((150, 150, 350, 350))
-
-                scale = 2
-                mask_big = Image.new('L', (char_diameter * scale, char_diameter * scale), 0)
-                draw_mask = ImageDraw.Draw(mask_big)
-                draw_mask.ellipse((0, 0, char_diameter * scale, char_diameter * scale), fill=255)
-                mask_smooth = mask_big.resize((char_diameter, char_diameter), Image.Resampling.LANCZOS)
-
-                char_alpha = char_square.split()[3]
-                combined_mask = ImageChops.multiply(char_alpha, mask_smooth)
-                char_final = char_square.copy()
-                char_final.putalpha(combined_mask)
-                card.paste(char_final, (char_x, char_y), char_final)
+                image_bytes = await self.fetch_image(url)
             except Exception as e:
                 print(f"이미지 처리 오류: {e}")
+                return None
+            if image_bytes is None:
+                return None
+
+            self.avatar_cache.downloads += 1
+            avatar = await self._run("avatar_process", self._process_and_store, url, image_bytes)
+            if avatar is None:
+                return None
 
-        # 4. 폰트 로드
+        self.avatar_cache.memory.set(url, avatar)
+        return avatar
+
+    def _process_and_store(self, url: str, image_bytes: bytes):
+        avatar = self.process_avatar(image_bytes)
+        if avatar is not None:
+            self.avatar_cache.save_disk(url, avatar)
+        return avatar
+
+    def process_avatar(self, image_bytes: bytes):
+        """캐릭터 이미지를 확대 → 가운데 200x200 crop → 원형 마스크 적용"""
         try:
-            title_font = ImageFont.truetype(self.font_bold, 44)
-            info_font = ImageFont.truetype(self.font_light, 26)
-            class_font = ImageFont.truetype(self.font_light, 20)
-        except:
-            title_font = ImageFont.load_default()
-            info_font = ImageFont.load_default()
-            class_font = ImageFont.load_default()
+            char_img_rgba = Image.open(BytesIO(image_bytes)).convert("RGBA")
+            char_img_large = char_img_rgba.resize((500, 500), Image.Resampling.LANCZOS)
+            char_square = char_img_large.crop((150, 150, 350, 350))
+
+            char_alpha = char_square.split()[3]
+            combined_mask = ImageChops.multiply(char_alpha, self.circle_mask)
+            char_final = char_square.copy()
+            char_final.putalpha(combined_mask)
+            return char_final
+        except Exception as e:
+            print(f"이미지 처리 오류: {e}")
+            return None
+
+    def render_card(self, data: dict, avatar=None, fmt: str = "png") -> BytesIO:
+        return self.encode_card(self.compose_card(data, avatar), fmt)
+
+    def encode_card(self, card, fmt: str = "png") -> BytesIO:
+        """합성된 카드를 지정한 포맷으로 인코딩합니다. (png / webp / avif)"""
+        img_byte_arr = BytesIO()
+        card.save(img_byte_arr, format=fmt.upper(), **self.encoder_options.get(fmt, {}))
+        img_byte_arr.seek(0)
+        return img_byte_arr
+
+    def compose_card(self, data: dict, avatar=None):
+        # 배경 / 프레임 / 테두리가 그려진 템플릿 위에 캐릭터 이미지와 텍스트만 합성
+        card = self.background.copy()
+        draw = ImageDraw.Draw(card)
+
+        if avatar is not None:
+            card.paste(avatar, self.char_pos, avatar)
+
+        title_font, info_font, class_font = self.title_font, self.info_font, self.class_font
 
         # 5. 텍스트 배치 시작 (중앙 정렬 좌표 계산 최적화)
 
@@ -116,16 +409,9 @@ class CardGenerator:
         cp_x = (self.card_size[0] - (cp_bbox[2] - cp_bbox[0])) // 2
         draw.text((cp_x, 500), combat_power_text, fill=self.blue_color, font=info_font)
 
-        # 6. 전체 외곽 테두리 그리기
-        pad = self.outer_padding
-        draw.rectangle(
-            (pad, pad, self.card_size[0] - pad - 1, self.card_size[1] - pad - 1),
-            outline=self.border_color,
-            width=self.outer_border_width
-        )
+        # 긴 닉네임 등이 테두리를 덮은 경우에만 테두리를 다시 그림 (기존처럼 테두리가 항상 위에 보이도록)
+        inner_left = self.outer_padding + self.outer_border_width
+        if min(name_x, class_x, start_x_line1, cp_x) < inner_left:
+            self._draw_outer_border(draw)
 
-        # 7. 결과 반환
-        img_byte_arr = BytesIO()
-        card.save(img_byte_arr, format='PNG')
-        img_byte_arr.seek(0)
-        return img_byte_arr
\ No newline at end of file
+        return card
\ No newline at end of file
@@ -1,10 +1,16 @@
 from fastapi import FastAPI, HTTPException, Response, Request
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse, PlainTextResponse
+from fastapi.responses import HTMLResponse, FileResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+from contextlib import asynccontextmanager, aclosing
+from typing import List
 import sys
 import os
+import json
 import asyncio
+import hashlib
+import datetime
 
 # 현재 파일의 부모 폴더(app)를 경로에 추가
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -12,19 +18,73 @@ sys.path.append(BASE_DIR)
 
 try:
     from scraper import NexonAPIHandler
-    from analyzer import evaluate_equipment, generate_overall_review, get_best_preset
+    from analyzer import analyze_character, analyze_character_in_worker, analyze_snapshot, analyze_snapshot_in_worker, ItemScoreMemo
+    from cache import ReportCache, SingleFlight, TTLCache, MISSING, normalize_name
+    from executor import TaskExecutor
+    from responses import FastJSONResponse, CompressionMiddleware, json_dumps
+    from history import SnapshotStore, today_kst
+    from metrics import registry, span, observe_stage, MetricsMiddleware
+    from profiling import RequestProfiler, profile_analysis
 except ImportError:
     from app.scraper import NexonAPIHandler
-    from app.analyzer import evaluate_equipment, generate_overall_review, get_best_preset
+    from app.analyzer import analyze_character, analyze_character_in_worker, analyze_snapshot, analyze_snapshot_in_worker, ItemScoreMemo
+    from app.cache import ReportCache, SingleFlight, TTLCache, MISSING, normalize_name
+    from app.executor import TaskExecutor
+    from app.responses import FastJSONResponse, CompressionMiddleware, json_dumps
+    from app.history import SnapshotStore, today_kst
+    from app.metrics import registry, span, observe_stage, MetricsMiddleware
+    from app.profiling import RequestProfiler, profile_analysis
 
-from app.image_gen import CardGenerator
+from app.image_gen import CardGenerator, AvatarCache, CardSheet, ZipStream, CARD_FORMATS, negotiate_format
 
-app = FastAPI()
 nexon_api = NexonAPIHandler()
-card_gen = CardGenerator()
+task_executor = TaskExecutor.from_env()  # 점수 계산 / 이미지 렌더링을 이벤트 루프 밖에서 실행
+card_gen = CardGenerator(executor=task_executor, fetch_image=nexon_api.fetch_image, avatar_cache=AvatarCache.from_env())
+report_cache = ReportCache.from_env()
+snapshot_store = SnapshotStore.from_env()  # SNAPSHOT_DB 지정 시 일별 원본 응답 / 점수 보관 (없으면 None)
+lookups = SingleFlight()  # 동일 캐릭터 동시 조회 합치기 (캐릭터명 / ocid 기준)
+profiler = RequestProfiler.from_env()  # PROFILE_ADMIN_TOKEN / PROFILE_SAMPLE_RATE 지정 시에만 동작
 
-# 서버 세마포어 설정 (동시 API 처리 인원을 5명으로 제한)
-api_semaphore = asyncio.Semaphore(5)
+# 아이템 점수 메모 (ITEM_SCORE_MEMO_SIZE=0 이면 요청 단위로만 사용)
+ITEM_SCORE_MEMO_SIZE = int(os.getenv("ITEM_SCORE_MEMO_SIZE", "20000"))
+item_score_memo = ItemScoreMemo(ITEM_SCORE_MEMO_SIZE) if ITEM_SCORE_MEMO_SIZE > 0 else None
+
+# 길드 단위 일괄 조회 설정
+BATCH_MAX_NAMES = int(os.getenv("BATCH_MAX_NAMES", "300"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "10"))
+background_tasks = set()  # 백그라운드 갱신 태스크 참조 유지용
+
+# 캐릭터 카드 이미지 캐시
+# - card_data_cache: ocid → 카드에 그릴 정보 (반복 조회 시 업스트림 호출 없이 ETag 계산)
+# - card_cache: 렌더링 키 → PNG 바이트
+CARD_MAX_AGE = int(os.getenv("CARD_MAX_AGE", "300"))
+card_data_cache = TTLCache(int(os.getenv("CARD_CACHE_SIZE", "500")), float(os.getenv("CARD_DATA_TTL", "300")))
+card_cache = TTLCache(int(os.getenv("CARD_CACHE_SIZE", "500")), float(os.getenv("CARD_CACHE_TTL", "3600")))
+
+# 길드 단체 카드 (ZIP / 시트) 설정
+CARD_BATCH_CONCURRENCY = int(os.getenv("CARD_BATCH_CONCURRENCY", "8"))
+CARD_SHEET_MAX_CARDS = int(os.getenv("CARD_SHEET_MAX_CARDS", "100"))
+CARD_SHEET_COLUMNS = int(os.getenv("CARD_SHEET_COLUMNS", "10"))
+CARD_SHEET_SCALE = float(os.getenv("CARD_SHEET_SCALE", "0.5"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 서버 수명 동안 하나의 커넥션 풀을 공유 (요청마다 TCP/TLS 핸드셰이크 방지)
+    await nexon_api.startup()
+    task_executor.startup()
+    yield
+    task_executor.shutdown()
+    await nexon_api.close()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# 큰 JSON 응답(진단 리포트 등) 압축 (RESPONSE_COMPRESSION=0 이면 끔, 리버스 프록시에서 압축하는 경우 등)
+if os.getenv("RESPONSE_COMPRESSION", "1") == "1":
+    app.add_middleware(CompressionMiddleware, **CompressionMiddleware.options_from_env())
+# 요청 처리 시간 / 구간별 지표 (압축까지 포함하도록 가장 바깥에 둠, SERVER_TIMING=1 이면 Server-Timing 헤더)
+app.add_middleware(MetricsMiddleware, **MetricsMiddleware.options_from_env())
 
 # 경로 설정
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
@@ -54,47 +114,575 @@ async def robots_txt():
     return "User-agent: *\nAllow: /\nSitemap: https://meculator.onrender.com/sitemap.xml"
 
 
+@app.get("/stats/upstream", include_in_schema=False)
+async def upstream_stats():
+    return {"connections": nexon_api.connection_stats, "rate_limit": nexon_api.rate_limiter.stats()}
+
+
+@app.get("/stats/cache", include_in_schema=False)
+async def cache_stats():
+    return {
+        "ocid": nexon_api.ocid_cache.stats(), "report": report_cache.stats(), "coalescing": lookups.stats(),
+        "item_scores": item_score_memo.stats() if item_score_memo else None,
+        "card_data": card_data_cache.stats(), "card": card_cache.stats(), "avatar": card_gen.avatar_cache.stats(),
+        "snapshots": await asyncio.to_thread(snapshot_store.stats) if snapshot_store else None
+    }
+
+
+@app.get("/stats/executor", include_in_schema=False)
+async def executor_stats():
+    return task_executor.stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 수집용 지표 (요청 / 구간 / 업스트림 호출 시간 히스토그램, 업스트림 상태 코드·오류 횟수)"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def _require_profile_admin(request: Request):
+    if not profiler.admin_token:
+        raise HTTPException(status_code=404, detail="프로파일러가 설정되어 있지 않습니다.")
+    if not profiler.is_admin(request.headers.get("x-admin-token")):
+        raise HTTPException(status_code=403, detail="권한이 없습니다.")
+
+
+@app.get("/admin/profiles", include_in_schema=False)
+async def download_profiles(request: Request):
+    """보관된 프로파일 링 버퍼 전체를 JSON 파일로 내려받습니다. (X-Admin-Token 필요)"""
+    _require_profile_admin(request)
+    filename = f"profiles-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    return FastJSONResponse(
+        {"profiler": profiler.stats(), "profiles": list(profiler.entries)},
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@app.get("/admin/profiles/{profile_id}", include_in_schema=False)
+async def get_profile(request: Request, profile_id: int):
+    _require_profile_admin(request)
+    entry = profiler.get(profile_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="보관된 프로파일이 없습니다.")
+    return FastJSONResponse(entry)
+
+
 @app.get("/check-items/{character_name}")
-async def check_items(character_name: str):
-    async with api_semaphore:
-        ocid = await nexon_api.get_ocid(character_name)
-        if not ocid:
-            return {"error": "캐릭터를 찾을 수 없습니다."}
+async def check_items(request: Request, character_name: str, refresh: bool = False, compact: bool = False,
+                      date: str = None, profile: bool = False):
+    conn_stats = nexon_api.track_connections()
+    headers = {}
+    # ?profile=1 (관리자 토큰 필요): 캐시를 건너뛰고 점수 계산을 cProfile 로 측정해 /admin/profiles 에 보관
+    marker = None
+    if profile and profiler.enabled:
+        if not profiler.is_admin(request.headers.get("x-admin-token")):
+            raise HTTPException(status_code=403, detail="프로파일링 권한이 없습니다.")
+        marker = profiler.request_profile()
+        refresh = True
+    report = await _check_items(character_name, refresh, headers, _parse_date(date))
+    if marker is not None and marker["id"] is not None:
+        headers["X-Profile-Id"] = str(marker["id"])
+    # ?compact=1 이면 원본 옵션(raw_options)을 빼고 응답 (모달에서 /item/{slot} 으로 따로 조회)
+    if compact:
+        report = _compact_report(report)
+    headers["X-Upstream-Connections"] = (
+        f"requests={conn_stats['requests']}, "
+        f"new={conn_stats['new_connections']}, reused={conn_stats['reused_connections']}"
+    )
+    # 리포트는 JSON 기본 타입으로만 이루어져 있으므로 jsonable_encoder 를 거치지 않고 바로 직렬화
+    return FastJSONResponse(report, headers=headers)
+
+
+@app.get("/history/{character_name}")
+async def character_history(character_name: str, days: int = 30):
+    """스냅샷 저장소에 쌓인 일별 레벨 · 전투력 · 점수 추이 (업스트림 호출 없음)"""
+    if snapshot_store is None:
+        raise HTTPException(status_code=404, detail="스냅샷 저장소가 설정되어 있지 않습니다.")
+    ocid = await asyncio.to_thread(snapshot_store.find_ocid, character_name)
+    if ocid is None:
+        raise HTTPException(status_code=404, detail="저장된 기록이 없습니다.")
+
+    days = max(1, min(days, 365))
+    history = await asyncio.to_thread(snapshot_store.history, ocid, days)
+    return FastJSONResponse({"character": character_name, "days": days, "history": history})
+
+
+def _parse_date(date: str):
+    """?date=YYYY-MM-DD 검사 (오늘 날짜는 현재 정보 조회와 같으므로 None)"""
+    if not date:
+        return None
+    try:
+        day = datetime.date.fromisoformat(date).isoformat()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="date 는 YYYY-MM-DD 형식이어야 합니다.")
+    today = today_kst()
+    if day > today:
+        raise HTTPException(status_code=400, detail="미래 날짜는 조회할 수 없습니다.")
+    return None if day == today else day
+
+
+@app.get("/check-items/{character_name}/item/{slot}")
+async def check_item_options(character_name: str, slot: str):
+    """장비 한 부위의 원본 옵션 (캐시된 리포트에서 꺼내므로 보통 업스트림 호출 없음)"""
+    report = await _check_items(character_name, False)
+    if "error" in report:
+        status_code = 404 if report["error"] == "캐릭터를 찾을 수 없습니다." else 502
+        raise HTTPException(status_code=status_code, detail=report["error"])
+
+    for result in report["results"]:
+        if result["slot"] == slot:
+            return FastJSONResponse({
+                "slot": result["slot"], "part": result["part"], "name": result["name"], "raw_options": result["raw_options"]
+            })
+    raise HTTPException(status_code=404, detail="해당 부위의 장비를 찾을 수 없습니다.")
+
+
+def _compact_report(report: dict) -> dict:
+    """raw_options 를 뺀 리포트 (캐시에 저장된 리포트를 건드리지 않도록 새 dict 로 만듦)"""
+    if "results" not in report:
+        return report
+    results = [{key: value for key, value in result.items() if key != "raw_options"} for result in report["results"]]
+    return {**report, "results": results}
+
+
+@app.get("/card/{character_name}.png")
+async def character_card(character_name: str, request: Request):
+    """캐릭터 카드 PNG (렌더링 결과 캐시 + ETag / 304)"""
+    return await _card_response(character_name, request, "png")
+
+
+@app.get("/card/{character_name}")
+async def character_card_negotiated(character_name: str, request: Request):
+    """캐릭터 카드 (Accept 헤더에 따라 WebP / AVIF / PNG 중 선택)"""
+    fmt = negotiate_format(request.headers.get("accept", ""), card_gen.formats)
+    return await _card_response(character_name, request, fmt, vary_accept=True)
+
+
+async def _card_response(character_name: str, request: Request, fmt: str, vary_accept: bool = False):
+    ocid = await _resolve_ocid(character_name)
+    if isinstance(ocid, dict):
+        raise HTTPException(status_code=502, detail="데이터를 불러오는 데 실패했습니다.")
+    if not ocid:
+        raise HTTPException(status_code=404, detail="캐릭터를 찾을 수 없습니다.")
+
+    data = await _card_data(ocid)
+    if data is None:
+        raise HTTPException(status_code=502, detail="데이터를 불러오는 데 실패했습니다.")
+
+    key = _card_key(ocid, data, fmt)
+    etag = '"' + hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:20] + '"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={CARD_MAX_AGE}"}
+    if vary_accept:
+        headers["Vary"] = "Accept"
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+
+    image = card_cache.get(key)
+    headers["X-Card-Cache"] = "hit" if image is not MISSING else "miss"
+    if image is MISSING:
+        image, complete = await _render_card(key, data, fmt)
+        if not complete:
+            # 아바타 없이 그린 임시 카드: ETag 를 주지 않아 이미지 서버가 복구되면 다음 요청에서 다시 그림
+            headers = {"Cache-Control": "no-store", "X-Card-Cache": "incomplete"}
+            if vary_accept:
+                headers["Vary"] = "Accept"
+    return Response(content=image, media_type=CARD_FORMATS[fmt], headers=headers)
+
+
+def _card_key(ocid: str, data: dict, fmt: str) -> tuple:
+    # 카드 내용이 바뀌는 값 + 템플릿 버전 + 포맷이 같으면 같은 이미지 → 렌더링 전에 ETag 를 정할 수 있음
+    return (ocid, data["level"], data["combat_power"], data["image"], data["name"], data["world"], data["class"],
+            CardGenerator.TEMPLATE_VERSION, fmt)
+
+
+async def _render_card(key: tuple, data: dict, fmt: str) -> tuple:
+    """카드를 렌더링하여 캐시에 저장합니다. (같은 키 동시 요청은 한 번만 렌더링)
+
+    반환값: (이미지 바이트, 완전한 카드인지). 캐릭터 이미지를 받아오지 못한 카드는 캐시하지 않습니다.
+    """
+    async def render():
+        buf, complete = await card_gen.create_card(data, fmt)
+        image = buf.getvalue()
+        if complete:
+            card_cache.set(key, image)
+        return image, complete
+
+    return await lookups.do(("card", key), render)
+
+
+class CardBatchRequest(BaseModel):
+    names: List[str]
+    layout: str = "zip"  # zip: 카드별 파일을 ZIP 으로 스트리밍 / sheet: 한 장짜리 격자 이미지
+    format: str = "png"
+    columns: int = CARD_SHEET_COLUMNS
+
+
+@app.post("/card/batch")
+async def character_card_batch(body: CardBatchRequest):
+    """길드 단위 카드 일괄 생성 (캐릭터 이미지는 동시에 받고, 합성은 렌더 스레드 풀에서 실행)"""
+    names = [name.strip() for name in body.names if name.strip()]
+    fmt = body.format.lower()
+    if not names:
+        raise HTTPException(status_code=400, detail="names 가 비어 있습니다.")
+    if body.layout not in ("zip", "sheet"):
+        raise HTTPException(status_code=400, detail="layout 은 zip 또는 sheet 입니다.")
+    if fmt != "png" and fmt not in card_gen.formats:
+        raise HTTPException(status_code=400, detail=f"지원하는 포맷: {', '.join(sorted(set(card_gen.formats) | {'png'}))}")
+
+    if body.layout == "zip":
+        if len(names) > BATCH_MAX_NAMES:
+            raise HTTPException(status_code=400, detail=f"한 번에 최대 {BATCH_MAX_NAMES}명까지 조회할 수 있습니다.")
+        return StreamingResponse(
+            _stream_card_zip(names, fmt), media_type="application/zip",
+            headers={"Content-Disposition": 'attachment; filename="cards.zip"'}
+        )
+
+    if len(names) > CARD_SHEET_MAX_CARDS:
+        raise HTTPException(status_code=400, detail=f"시트는 한 번에 최대 {CARD_SHEET_MAX_CARDS}명까지 만들 수 있습니다.")
+    return await _card_sheet_response(names, fmt, body.columns)
+
+
+async def _bounded_map(names: List[str], job, concurrency: int):
+    """이름마다 job(index, name) 을 최대 concurrency 개씩 동시에 실행하고, 끝나는 순서대로 결과를 내보냅니다.
 
-        basic_info = await nexon_api.get_character_basic(ocid)
-        item_data = await nexon_api.get_character_item(ocid)
-        stat_data = await nexon_api.get_character_stat(ocid)
+    aclosing 으로 감싸서 쓰면 클라이언트가 중간에 연결을 끊을 때 남은 작업이 바로 취소됩니다.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
 
-        if not basic_info or not item_data:
-            return {"error": "데이터를 불러오는 데 실패했습니다."}
+    async def run(index: int, name: str):
+        async with semaphore:
+            return await job(index, name)
 
-        char_class = basic_info.get("character_class")
-        char_level = int(basic_info.get("character_level", 0))
-        char_image = basic_info.get("character_image", "")
+    tasks = [asyncio.create_task(run(i, name)) for i, name in enumerate(names)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # 클라이언트가 중간에 연결을 끊으면 남은 작업 취소
+        for task in tasks:
+            task.cancel()
+
+
+def _batch_card_jobs(names: List[str], job):
+    """캐릭터별 카드 작업을 제한된 동시성으로 실행하고 끝나는 순서대로 (index, name, 결과 | None) 를 내보냅니다."""
+    async def run(index: int, name: str):
+        try:
+            ocid = await _resolve_ocid(name)
+            data = await _card_data(ocid) if ocid and not isinstance(ocid, dict) else None
+            result = await job(ocid, data) if data is not None else None
+        except Exception as e:
+            print(f"카드 일괄 생성 실패 ({name}): {e}")
+            result = None
+        return index, name, result
+
+    return _bounded_map(names, run, CARD_BATCH_CONCURRENCY)
+
+
+async def _stream_card_zip(names: List[str], fmt: str):
+    archive = ZipStream()
+    failed = []
+
+    async def card_bytes(ocid: str, data: dict):
+        key = _card_key(ocid, data, fmt)
+        image = card_cache.get(key)
+        return image if image is not MISSING else (await _render_card(key, data, fmt))[0]
+
+    async with aclosing(_batch_card_jobs(names, card_bytes)) as jobs:
+        async for index, name, image in jobs:
+            if image is None:
+                failed.append(name)
+                continue
+            safe_name = name.replace("/", "_").replace("\\", "_")
+            yield archive.add(f"{index + 1:03d}_{safe_name}.{fmt}", image)
+
+    if failed:
+        yield archive.add("failed.json", json.dumps({"failed": failed}, ensure_ascii=False).encode("utf-8"), compress=True)
+    yield archive.close()
+
+
+async def _card_sheet_response(names: List[str], fmt: str, columns: int):
+    sheet = CardSheet(len(names), card_gen.card_size, columns=columns, scale=CARD_SHEET_SCALE)
+    failed = []
+    async with aclosing(_batch_card_jobs(names, lambda ocid, data: card_gen.compose(data, CARD_SHEET_SCALE))) as jobs:
+        async for index, name, card in jobs:
+            if card is None:
+                failed.append(name)
+            else:
+                sheet.paste(index, card)
+
+    if len(failed) == len(names):
+        raise HTTPException(status_code=404, detail="캐릭터를 찾을 수 없습니다.")
+    buf = await task_executor.run_render("card_sheet", card_gen.encode_card, sheet.image, fmt)
+    # 헤더에는 ASCII 만 넣을 수 있으므로 실패한 캐릭터는 개수만 표시
+    return Response(content=buf.getvalue(), media_type=CARD_FORMATS[fmt], headers={"X-Card-Failed": str(len(failed))})
+
+
+async def _card_data(ocid: str):
+    """카드에 그릴 캐릭터 정보 (basic + 전투력). 실패하면 None"""
+    data = card_data_cache.get(ocid)
+    if data is not MISSING:
+        return data
+
+    async def fetch():
+        basic_info, stat_data = await asyncio.gather(
+            nexon_api.get_character_basic(ocid), nexon_api.get_character_stat(ocid), return_exceptions=True
+        )
+        if not isinstance(basic_info, dict):
+            return None
 
         combat_power = 0
-        if stat_data and "final_stat" in stat_data:
-            for stat in stat_data["final_stat"]:
+        if isinstance(stat_data, dict):
+            for stat in stat_data.get("final_stat", []):
                 if stat.get("stat_name") == "전투력":
-                    combat_power = stat.get("stat_value")
+                    combat_power = int(stat.get("stat_value") or 0)
                     break
 
-        # 분리된 분석 로직(analyzer) 호출
-        best_preset_idx = get_best_preset(item_data, char_class, char_level)
-        items = item_data.get(f"item_equipment_preset_{best_preset_idx}")
-        if not items:
-            items = item_data.get("item_equipment", [])
+        card_data = {
+            "image": basic_info.get("character_image", ""),
+            "name": basic_info.get("character_name", ""),
+            "class": basic_info.get("character_class", ""),
+            "world": basic_info.get("world_name", ""),
+            "level": int(basic_info.get("character_level", 0)),
+            "combat_power": combat_power,
+        }
+        card_data_cache.set(ocid, card_data)
+        return card_data
 
-        evaluate_list = evaluate_equipment(items, char_class, char_level)
-        overall_review, all_sorted_results = generate_overall_review(evaluate_list)
+    return await lookups.do(("card_data", ocid), fetch)
 
-        return {
-            "character": character_name,
-            "class": char_class,
-            "level": char_level,
-            "character_image": char_image,
-            "combat_power": combat_power,
-            "best_preset": best_preset_idx,
-            "overall": overall_review,
-            "results": all_sorted_results
-        }
\ No newline at end of file
+
+class BatchRequest(BaseModel):
+    names: List[str]
+    compact: bool = False
+
+
+@app.post("/check-items/batch")
+async def check_items_batch(body: BatchRequest):
+    """여러 캐릭터를 동시에 진단하고, 끝나는 순서대로 NDJSON 한 줄씩 내려보냅니다."""
+    names = [name.strip() for name in body.names if name.strip()]
+    if not names:
+        raise HTTPException(status_code=400, detail="names 가 비어 있습니다.")
+    if len(names) > BATCH_MAX_NAMES:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {BATCH_MAX_NAMES}명까지 조회할 수 있습니다.")
+
+    return StreamingResponse(_stream_batch(names, body.compact), media_type="application/x-ndjson")
+
+
+async def _stream_batch(names: List[str], compact: bool = False):
+    async def run(index: int, name: str):
+        try:
+            report = await _check_items(name, False)
+        except Exception as e:
+            print(f"일괄 조회 실패 ({name}): {e}")
+            report = {"error": "데이터를 불러오는 데 실패했습니다."}
+        if compact:
+            report = _compact_report(report)
+        return {"index": index, "character": name, **report}
+
+    # 업스트림 호출량은 토큰 버킷이 제한하고, 여기서는 동시에 진행하는 캐릭터 수만 제한
+    async with aclosing(_bounded_map(names, run, BATCH_CONCURRENCY)) as lines:
+        async for line in lines:
+            yield json_dumps(line) + b"\n"
+
+
+async def _resolve_ocid(character_name: str):
+    """캐릭터명 → ocid (없으면 None, 업스트림 오류면 오류 dict)"""
+    return await lookups.do(
+        ("name", normalize_name(character_name)),
+        lambda: nexon_api.get_ocid(character_name)
+    )
+
+
+async def _check_items(character_name: str, refresh: bool, headers: dict = None, date: str = None):
+    with span("ocid"):
+        ocid = await _resolve_ocid(character_name)
+    if isinstance(ocid, dict):
+        return {"error": "데이터를 불러오는 데 실패했습니다."}
+    if not ocid:
+        return {"error": "캐릭터를 찾을 수 없습니다."}
+
+    if date:
+        # 지난 날짜 조회는 리포트 캐시 대신 스냅샷 저장소 사용 (같은 ocid·날짜 동시 요청은 합침)
+        if headers is not None:
+            headers["X-Report-Cache"] = "bypass"
+        report = await lookups.do(("ocid", ocid, date), lambda: _build_report(ocid, character_name, date))
+        return {**report, "character": character_name}
+
+    # 리포트 캐시 확인 (?refresh=1 이면 캐시를 건너뛰고 새로 조회)
+    cached = MISSING if refresh else report_cache.get(ocid)
+    if cached is not MISSING:
+        report, is_fresh = cached
+        if not is_fresh:
+            _schedule_refresh(ocid, character_name)
+        if headers is not None:
+            headers["X-Report-Cache"] = "hit" if is_fresh else "stale"
+        return {**report, "character": character_name}
+
+    if headers is not None:
+        headers["X-Report-Cache"] = "bypass" if refresh else "miss"
+    report = await _fetch_report(ocid, character_name)
+    return {**report, "character": character_name}
+
+
+async def _fetch_report(ocid: str, character_name: str):
+    """업스트림 조회 + 분석 후 캐시에 저장합니다. 같은 ocid 의 동시 요청은 한 번만 수행됩니다."""
+    async def fetch():
+        report = await _build_report(ocid, character_name)
+        if "error" not in report:
+            report_cache.set(ocid, report)
+        return report
+
+    return await lookups.do(("ocid", ocid), fetch)
+
+
+def _schedule_refresh(ocid: str, character_name: str):
+    """만료된(stale) 리포트를 백그라운드에서 갱신합니다."""
+    if ocid in report_cache.refreshing:
+        return
+    report_cache.refreshing.add(ocid)
+
+    async def refresh():
+        try:
+            await _fetch_report(ocid, character_name)
+        except Exception as e:
+            print(f"리포트 갱신 실패 ({character_name}): {e}")
+        finally:
+            report_cache.refreshing.discard(ocid)
+
+    task = asyncio.create_task(refresh())
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+
+async def _build_report(ocid: str, character_name: str, date: str = None):
+    previous_scores = None
+    if snapshot_store is not None:
+        # 직전 스냅샷의 아이템 점수는 업스트림 응답을 기다리는 동안 스레드에서 미리 읽어 둠
+        previous_scores = asyncio.ensure_future(asyncio.to_thread(snapshot_store.latest_item_scores, ocid, date))
+
+    # 지난 날짜의 정보는 바뀌지 않으므로 저장된 스냅샷이 있으면 업스트림 호출 없이 사용
+    bundle = None
+    if date and snapshot_store is not None:
+        with span("snapshot_load"):
+            bundle = await asyncio.to_thread(snapshot_store.load, ocid, date)
+    stored = bundle is not None
+    if bundle is None:
+        # basic / item / stat 동시 요청 (stat 실패 시 전투력만 제외하고 진행)
+        with span("upstream"):
+            bundle = await nexon_api.get_character_bundle(ocid, date)
+    basic_info = bundle["basic"]
+    item_data = bundle["item"]
+    stat_data = bundle["stat"]
+
+    if not basic_info or not item_data:
+        if previous_scores is not None:
+            previous_scores.cancel()
+        return {"error": "데이터를 불러오는 데 실패했습니다."}
+
+    char_class = basic_info.get("character_class")
+    char_level = int(basic_info.get("character_level", 0))
+    char_image = basic_info.get("character_image", "")
+
+    combat_power = 0 if stat_data else None
+    if stat_data and "final_stat" in stat_data:
+        for stat in stat_data["final_stat"]:
+            if stat.get("stat_name") == "전투력":
+                combat_power = stat.get("stat_value")
+                break
+
+    with span("previous_scores"):
+        previous = await previous_scores if previous_scores is not None else None
+    with span("analyze"):
+        best_preset_idx, overall_review, all_sorted_results, item_scores = await _analyze(
+            item_data, char_class, char_level, previous, character_name
+        )
+
+    report = {
+        "character": character_name,
+        "class": char_class,
+        "level": char_level,
+        "character_image": char_image,
+        "combat_power": combat_power,
+        "best_preset": best_preset_idx,
+        "overall": overall_review,
+        "results": all_sorted_results
+    }
+    if snapshot_store is not None and not stored:
+        _schedule_snapshot(ocid, date or today_kst(), character_name, bundle, item_scores, report)
+    return report
+
+
+async def _analyze(item_data: dict, char_class: str, char_level: int, previous: dict = None, character_name: str = None):
+    """(best_preset, overall_review, sorted_results, item_scores)
+
+    previous 는 직전 스냅샷의 아이템 점수 (스냅샷 저장소가 없으면 None, 이때 item_scores 도 None)
+    """
+    # 분리된 분석 로직(analyzer)은 실행기에서 실행 - 프리셋 선택과 최종 평가가 아이템 점수 메모를 공유
+    # (process 모드는 워커 프로세스별 메모 사용)
+    # analyze 구간(실행기 대기 포함) 안의 단계별 시간은 워커에서 재서 돌려받음
+    process = task_executor.cpu_mode == "process"
+    reason = profiler.choose()
+    if reason is not None:
+        # 프로파일링: 공용 메모 없이 전체 계산 경로를 워커 안에서 cProfile 로 측정
+        if previous is None:
+            func, args = analyze_character, (item_data, char_class, char_level)
+        else:
+            func, args = analyze_snapshot, (item_data, char_class, char_level, previous)
+        analysis, timings, functions = await task_executor.run_cpu(
+            "analyze_profiled", profile_analysis, func, args, profiler.top_n
+        )
+        if functions is not None:
+            profiler.record(reason, character_name, timings, functions)
+    elif previous is None:
+        if process:
+            analysis, timings = await task_executor.run_cpu("analyze", analyze_character_in_worker, item_data, char_class, char_level)
+        else:
+            timings = {}
+            analysis = await task_executor.run_cpu(
+                "analyze", analyze_character, item_data, char_class, char_level, item_score_memo, timings
+            )
+    # 직전 스냅샷의 아이템 점수를 이어받아 내용이 바뀐 아이템만 다시 계산
+    elif process:
+        analysis, timings = await task_executor.run_cpu(
+            "analyze", analyze_snapshot_in_worker, item_data, char_class, char_level, previous
+        )
+    else:
+        timings = {}
+        analysis = await task_executor.run_cpu(
+            "analyze", analyze_snapshot, item_data, char_class, char_level, previous, item_score_memo, timings
+        )
+    _observe_analysis(timings)
+
+    if previous is None:
+        return (*analysis, None)
+    best_preset_idx, overall_review, all_sorted_results, item_scores, reused, rescored = analysis
+    snapshot_store.record_reuse(reused, rescored)
+    return best_preset_idx, overall_review, all_sorted_results, item_scores
+
+
+def _observe_analysis(timings: dict):
+    for stage, seconds in timings.items():
+        observe_stage(stage, seconds)
+
+
+def _schedule_snapshot(ocid: str, date: str, character_name: str, bundle: dict, item_scores: dict, report: dict):
+    """원본 응답과 점수를 스냅샷 저장소에 백그라운드로 기록합니다. (응답 지연 없음)"""
+    combat_power = report["combat_power"]
+    summary = {
+        "name": character_name, "class": report["class"], "level": report["level"],
+        "combat_power": int(combat_power) if combat_power is not None else None,
+        "avg_score": report["overall"]["avg_score"], "rank": report["overall"]["rank"], "best_preset": report["best_preset"],
+        "items": {result["slot"]: result["total_score"] for result in report["results"]},
+    }
+
+    async def save():
+        try:
+            await asyncio.to_thread(snapshot_store.save, ocid, date, character_name, bundle, item_scores, summary)
+        except Exception as e:
+            print(f"스냅샷 저장 실패 ({character_name}): {e}")
+
+    task = asyncio.create_task(save())
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
\ No newline at end of file
@@ -0,0 +1,196 @@
+import os
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+# 요청 단위 구간 기록 (Server-Timing 헤더용). MetricsMiddleware 가 요청마다 빈 리스트를 넣어둠
+_request_spans: ContextVar = ContextVar("request_spans", default=None)
+
+# 일괄 조회처럼 구간이 많은 요청도 헤더가 너무 커지지 않도록 제한
+MAX_REQUEST_SPANS = 64
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """라벨별 누적 카운터 (Prometheus counter)"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.values = {}
+
+    def inc(self, *labels, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        return [f"{self.name}_total{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in self.values.items()]
+
+
+class Histogram:
+    """라벨별 누적 히스토그램 (Prometheus histogram, 구간 상한은 초 단위)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self.values = {}  # labels → [구간별 개수..., +Inf 개수, 합계]
+
+    def observe(self, seconds: float, *labels):
+        value = self.values.get(labels)
+        if value is None:
+            value = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        value[bisect_left(self.buckets, seconds)] += 1
+        value[-1] += seconds
+
+    def render(self) -> list:
+        lines = []
+        for labels, value in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), value):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(value[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name: str, help_text: str, labelnames: tuple = ()) -> Counter:
+        metric = Counter(name, help_text, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus 텍스트 포맷 (0.0.4)"""
+        lines = []
+        for metric in self.metrics:
+            name = f"{metric.name}_total" if metric.kind == "counter" else metric.name
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# 서버 프로세스 단위 지표 (gunicorn 워커가 여러 개면 워커별로 따로 집계됨)
+registry = Registry()
+http_request_seconds = registry.histogram(
+    "meculator_http_request_seconds", "HTTP 요청 처리 시간", ("method", "route", "status"))
+stage_seconds = registry.histogram(
+    "meculator_stage_seconds", "요청 처리 구간별 소요 시간 (ocid, upstream, analyze, serialize 등)", ("stage",))
+upstream_request_seconds = registry.histogram(
+    "meculator_upstream_request_seconds", "Nexon API 호출 시간 (토큰 버킷 대기 제외)", ("endpoint",))
+upstream_responses = registry.counter(
+    "meculator_upstream_responses", "Nexon API 응답 상태 코드별 횟수", ("endpoint", "status"))
+upstream_errors = registry.counter(
+    "meculator_upstream_errors", "Nexon API 호출 중 발생한 예외 (네트워크 오류, 타임아웃 등)", ("endpoint", "error"))
+
+
+def record_span(name: str, seconds: float):
+    """현재 요청의 Server-Timing 에만 구간을 남깁니다. (요청 밖이면 무시)"""
+    spans = _request_spans.get()
+    if spans is not None and len(spans) < MAX_REQUEST_SPANS:
+        spans.append((name, seconds))
+
+
+def observe_stage(stage: str, seconds: float):
+    """이미 잰 구간(워커 프로세스에서 돌려받은 분석 단계 등)을 기록합니다."""
+    stage_seconds.observe(seconds, stage)
+    record_span(stage, seconds)
+
+
+class span:
+    """with span("ocid"): ... - 구간 시간을 stage_seconds 히스토그램과 현재 요청의 Server-Timing 에 기록"""
+
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe_stage(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+def server_timing(spans: list) -> str:
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in spans)
+
+
+class MetricsMiddleware:
+    """요청별 처리 시간을 라우트 템플릿 기준으로 집계하고, server_timing 이면 Server-Timing 헤더를 붙이는 ASGI 미들웨어
+
+    라우트 라벨은 /check-items/{character_name} 처럼 템플릿을 쓰므로 캐릭터명 수만큼 시계열이 늘어나지 않습니다.
+    """
+
+    def __init__(self, app, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    @classmethod
+    def options_from_env(cls) -> dict:
+        return {"server_timing": os.getenv("SERVER_TIMING", "0") == "1"}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        spans = []
+        token = _request_spans.set(spans)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    total = ("total", time.perf_counter() - started)
+                    header = server_timing(spans + [total]).encode("latin-1")
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_spans.reset(token)
+            route = scope.get("route")
+            http_request_seconds.observe(
+                time.perf_counter() - started, scope.get("method", ""), getattr(route, "path", "unmatched"), status
+            )
@@ -0,0 +1,69 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+# 미리 컴파일한 수치 추출 패턴
+PERCENT_VALUE = re.compile(r'\+(\d+)%')
+FLAT_VALUE = re.compile(r'\+(\d+)')
+SECONDS_VALUE = re.compile(r'(\d+)초')
+
+# 옵션 문자열에서 찾는 스탯 키워드 (한 줄에 여러 스탯이 있으면 모두 기록)
+STAT_KEYWORDS = [
+    ("올스탯", "ALL"), ("STR", "STR"), ("DEX", "DEX"), ("INT", "INT"), ("LUK", "LUK"),
+    ("HP", "HP"), ("공격력", "ATK"), ("마력", "MATK"),
+]
+
+
+class OptionLine(NamedTuple):
+    """잠재능력 한 줄을 파싱한 결과
+
+    stats: 문자열에 나오는 스탯 (ALL / STR / DEX / INT / LUK / HP / ATK / MATK, 없으면 빈 집합)
+    value: 옵션 수치 (수치가 없으면 None)
+    is_percent: % 옵션 여부
+    kind: stat / per_level / crit_damage / cooldown / damage / ignore_def / recovery / other
+    """
+    stats: frozenset
+    value: Optional[int]
+    is_percent: bool
+    kind: str
+
+
+@lru_cache(maxsize=4096)
+def parse_option(raw: str) -> OptionLine:
+    """Nexon 잠재능력 문자열을 OptionLine 으로 변환합니다. (같은 문자열은 캐시된 결과 재사용)"""
+    stats = frozenset(code for keyword, code in STAT_KEYWORDS if keyword in raw)
+    is_percent = "%" in raw
+
+    if "크리티컬 데미지" in raw:
+        kind = "crit_damage"
+    elif "스킬 재사용 대기시간" in raw:
+        kind = "cooldown"
+    elif "레벨" in raw:
+        kind = "per_level"
+    elif "데미지" in raw:
+        kind = "damage"
+    elif "방어율 무시" in raw:
+        kind = "ignore_def"
+    elif "회복" in raw:
+        kind = "recovery"
+    else:
+        kind = "stat" if stats else "other"
+
+    if kind == "cooldown":
+        match = SECONDS_VALUE.search(raw)
+    elif is_percent:
+        match = PERCENT_VALUE.search(raw)
+    else:
+        match = FLAT_VALUE.search(raw)
+
+    return OptionLine(stats, int(match.group(1)) if match else None, is_percent, kind)
+
+
+def parse_potential(item_data: dict, potential_type: str) -> list:
+    """아이템의 윗잠재(potential) 또는 에디셔널(additional_potential) 3줄을 파싱합니다."""
+    lines = []
+    for i in (1, 2, 3):
+        raw = item_data.get(f"{potential_type}_option_{i}")
+        if raw:
+            lines.append(parse_option(raw))
+    return lines
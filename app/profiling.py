@@ -0,0 +1,122 @@
+import os
+import time
+import hmac
+import pstats
+import random
+import cProfile
+import threading
+from collections import deque
+from contextvars import ContextVar
+
+# 관리자 요청(?profile=1)에서 프로파일링을 요청했는지 표시 (분석 단계에서 확인, 결과 id 를 되돌려받음)
+_profile_request: ContextVar = ContextVar("profile_request", default=None)
+
+# 점수 계산 핫패스 모듈 (상위 함수 목록은 이 파일들의 함수만 모음)
+HOT_MODULES = ("calculator.py", "analyzer.py", "options.py")
+
+# 파이썬 3.12+ 의 cProfile 은 스레드 구분 없이 하나만 켤 수 있으므로 워커 안에서도 동시에 하나만 프로파일링
+_profile_lock = threading.Lock()
+
+
+def profile_analysis(func, args: tuple, top_n: int):
+    """워커(스레드 / 프로세스)에서 실행: func(*args, timings=...) 를 cProfile 로 감싸 실행합니다.
+
+    반환값: (결과, 단계별 시간, 상위 함수 목록 또는 None - 다른 프로파일링이 진행 중이면 그냥 실행)
+    """
+    timings = {}
+    if not _profile_lock.acquire(blocking=False):
+        return func(*args, timings=timings), timings, None
+    try:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            result = func(*args, timings=timings)
+        finally:
+            profiler.disable()
+    finally:
+        _profile_lock.release()
+    return result, timings, _top_functions(profiler, top_n)
+
+
+def _top_functions(profiler, top_n: int) -> list:
+    """핫패스 모듈 함수 중 자체 실행 시간(tottime) 상위 top_n 개"""
+    rows = []
+    for (filename, line, name), (_, ncalls, tottime, cumtime, _) in pstats.Stats(profiler).stats.items():
+        module = os.path.basename(filename)
+        if module in HOT_MODULES:
+            rows.append({
+                "function": f"{module[:-3]}.{name}", "line": line, "calls": ncalls,
+                "tottime_ms": round(tottime * 1000, 3), "cumtime_ms": round(cumtime * 1000, 3),
+            })
+    rows.sort(key=lambda row: row["tottime_ms"], reverse=True)
+    return rows[:top_n]
+
+
+class RequestProfiler:
+    """진단 요청의 점수 계산을 cProfile 로 감싸 상위 함수 목록을 링 버퍼에 보관하는 선택적 프로파일러
+
+    - 관리자: X-Admin-Token 헤더 + /check-items/{닉네임}?profile=1 (캐시를 건너뛰고 새로 분석)
+    - 표본: sample_rate 비율의 분석을 무작위로 프로파일링 (일괄 조회 / 백그라운드 갱신 포함)
+    프로파일링하는 분석은 공용 아이템 점수 메모 대신 새 메모를 써서 전체 계산 경로를 측정합니다.
+    admin_token 이 없고 sample_rate 가 0 이면 꺼져 있으며, 이때는 enabled 확인 외에 하는 일이 없습니다.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, admin_token: str = "", top_n: int = 30, buffer_size: int = 50):
+        self.sample_rate = max(0.0, min(sample_rate, 1.0))
+        self.admin_token = admin_token
+        self.top_n = top_n
+        self.entries = deque(maxlen=buffer_size)
+        self.next_id = 1
+        self.enabled = bool(admin_token) or self.sample_rate > 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+            admin_token=os.getenv("PROFILE_ADMIN_TOKEN", ""),
+            top_n=int(os.getenv("PROFILE_TOP_N", "30")),
+            buffer_size=int(os.getenv("PROFILE_BUFFER_SIZE", "50")),
+        )
+
+    def is_admin(self, token: str) -> bool:
+        return bool(self.admin_token) and token is not None and hmac.compare_digest(token, self.admin_token)
+
+    def request_profile(self) -> dict:
+        """현재 요청의 분석을 프로파일링하도록 표시합니다. (분석 후 "id" 가 채워짐)"""
+        marker = {"id": None}
+        _profile_request.set(marker)
+        return marker
+
+    def choose(self):
+        """이번 분석을 프로파일링할지 결정합니다. (프로파일링 이유 또는 None)"""
+        if not self.enabled:
+            return None
+        if _profile_request.get() is not None:
+            return "admin"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    def record(self, reason: str, character_name: str, timings: dict, functions: list):
+        """프로파일 결과 하나를 링 버퍼에 넣습니다. (가득 차면 가장 오래된 결과부터 버림)"""
+        entry = {
+            "id": self.next_id, "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "reason": reason,
+            "character": character_name, "analysis_ms": round(sum(timings.values()) * 1000, 2),
+            "stages_ms": {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()},
+            "functions": functions,
+        }
+        self.next_id += 1
+        self.entries.append(entry)
+        marker = _profile_request.get()
+        if reason == "admin" and marker is not None:
+            marker["id"] = entry["id"]
+        return entry
+
+    def get(self, entry_id: int):
+        return next((entry for entry in self.entries if entry["id"] == entry_id), None)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled, "sample_rate": self.sample_rate, "admin": bool(self.admin_token),
+            "stored": len(self.entries), "capacity": self.entries.maxlen, "recorded": self.next_id - 1,
+        }
@@ -0,0 +1,118 @@
+import os
+import time
+import asyncio
+
+
+class TokenBucket:
+    """초당 rate 개씩 채워지고 최대 capacity 개까지 쌓이는 토큰 버킷"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self) -> float:
+        """토큰을 하나 꺼냅니다. 성공하면 0, 부족하면 다음 토큰까지 기다려야 하는 시간(초)을 반환합니다."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def drain(self, seconds: float):
+        """429 응답 등으로 키가 제한된 경우 일정 시간 동안 토큰을 비웁니다."""
+        self._refill()
+        self.tokens = -seconds * self.rate
+
+
+class UpstreamRateLimiter:
+    """Nexon API 키별 토큰 버킷 + 키 로테이션
+
+    - API 키마다 별도의 버킷을 두고, 토큰이 남아있는 키를 돌아가며 사용합니다.
+    - 모든 키의 토큰이 부족하면 FIFO 순서로 대기합니다 (asyncio.Lock 은 대기 순서를 보장).
+    - 대기열 길이 / 대기 시간 통계를 남겨 워커 수 산정에 활용합니다.
+    """
+
+    def __init__(self, api_keys: list, rate: float = 5.0, burst: float = 5.0):
+        self.api_keys = api_keys
+        self.buckets = {key: TokenBucket(rate, burst) for key in api_keys}
+        self.usage = {key: 0 for key in api_keys}
+        self._next = 0
+        self._lock = asyncio.Lock()
+
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.acquired = 0
+        self.waited = 0
+        self.wait_seconds_sum = 0.0
+        self.wait_seconds_max = 0.0
+
+    @classmethod
+    def from_env(cls, api_keys: list):
+        return cls(
+            api_keys,
+            rate=float(os.getenv("NEXON_RATE_LIMIT", "5")),
+            burst=float(os.getenv("NEXON_RATE_BURST", "5")),
+        )
+
+    async def acquire(self) -> str:
+        """호출 가능한 API 키를 하나 받아옵니다 (필요하면 토큰이 찰 때까지 대기)."""
+        start = time.monotonic()
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            async with self._lock:
+                while True:
+                    key, wait = self._take()
+                    if key is not None:
+                        break
+                    await asyncio.sleep(wait)
+        finally:
+            self.queue_depth -= 1
+
+        elapsed = time.monotonic() - start
+        self.acquired += 1
+        self.usage[key] += 1
+        if elapsed > 0.001:
+            self.waited += 1
+        self.wait_seconds_sum += elapsed
+        self.wait_seconds_max = max(self.wait_seconds_max, elapsed)
+        return key
+
+    def _take(self):
+        # 라운드 로빈으로 토큰이 남은 키를 찾고, 없으면 가장 빨리 풀리는 키의 대기 시간을 반환
+        min_wait = None
+        for i in range(len(self.api_keys)):
+            idx = (self._next + i) % len(self.api_keys)
+            key = self.api_keys[idx]
+            wait = self.buckets[key].try_take()
+            if wait == 0:
+                self._next = idx + 1
+                return key, 0.0
+            min_wait = wait if min_wait is None else min(min_wait, wait)
+        return None, min_wait
+
+    def penalize(self, key: str, seconds: float = 1.0):
+        """429 를 받은 키는 잠시 쉬게 하고 다른 키로 넘어갑니다."""
+        if key in self.buckets:
+            self.buckets[key].drain(seconds)
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self.api_keys),
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "acquired": self.acquired,
+            "waited": self.waited,
+            "wait_seconds_sum": round(self.wait_seconds_sum, 4),
+            "wait_seconds_avg": round(self.wait_seconds_sum / self.acquired, 4) if self.acquired else 0.0,
+            "wait_seconds_max": round(self.wait_seconds_max, 4),
+            # 앞 5자리가 같은 키가 있어도 겹치지 않도록 등록 순서 번호를 붙임
+            "usage": {f"key#{index}:{key[:5]}***": count for index, (key, count) in enumerate(self.usage.items())},
+        }
@@ -0,0 +1,203 @@
+import os
+import json
+import zlib
+import random
+import struct
+import asyncio
+
+import httpx
+
+try:
+    from cache import normalize_name
+except ImportError:
+    from app.cache import normalize_name
+
+# Nexon Open API 엔드포인트 → 픽스처 키
+ENDPOINTS = {
+    "/character/basic": "basic",
+    "/character/stat": "stat",
+    "/character/item-equipment": "item",
+}
+
+NOT_FOUND_BODY = {"error": {"name": "OPENAPI00004", "message": "Please input valid parameter"}}
+
+
+def _placeholder_png(size: int = 96) -> bytes:
+    """캐릭터 이미지 대신 돌려줄 단색 PNG (PIL 없이 생성)"""
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    row = b"\x00" + bytes((120, 160, 220, 255)) * size
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 6, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(row * size, 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+class FixtureStore:
+    """녹화된 Nexon API 응답 모음 (캐릭터 한 명 = {"ocid", "basic", "stat", "item"})
+
+    디렉터리에는 캐릭터별 {ocid}.json (날짜 지정 조회는 {ocid}@{date}.json) 파일을 둡니다.
+    benchmarks/corpus.py 의 합성 캐릭터와 같은 형태라 그대로 넣어도 됩니다.
+    """
+
+    def __init__(self, characters=(), directory: str = None):
+        self.directory = directory
+        self.by_ocid = {}
+        self.ocids = {}  # 캐릭터명(소문자) → ocid
+        for character in characters:
+            self.add(character)
+        if directory and os.path.isdir(directory):
+            for filename in sorted(os.listdir(directory)):
+                if filename.endswith(".json"):
+                    with open(os.path.join(directory, filename), encoding="utf-8") as f:
+                        self.add(json.load(f), date=filename[:-5].partition("@")[2] or None)
+
+    def add(self, character: dict, date: str = None):
+        ocid = character["ocid"]
+        self.by_ocid[(ocid, date)] = character
+        name = character.get("name") or (character.get("basic") or {}).get("character_name")
+        if name:
+            self.ocids[normalize_name(name)] = ocid
+
+    def ocid(self, character_name: str):
+        return self.ocids.get(normalize_name(character_name))
+
+    def get(self, ocid: str, key: str, date: str = None):
+        """날짜별 응답이 없으면 현재 응답으로 대신합니다."""
+        character = self.by_ocid.get((ocid, date)) or self.by_ocid.get((ocid, None)) or {}
+        return character.get(key)
+
+    def record(self, ocid: str, key: str, value, date: str = None, name: str = None):
+        """응답 하나를 캐릭터 파일에 합쳐 저장합니다. (record 모드)"""
+        character = self.by_ocid.setdefault((ocid, date), {"ocid": ocid})
+        if name:
+            character["name"] = name
+            self.ocids[normalize_name(name)] = ocid
+        if key:
+            character[key] = value
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            filename = f"{ocid}@{date}.json" if date else f"{ocid}.json"
+            path = os.path.join(self.directory, filename)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(character, f, ensure_ascii=False)
+            os.replace(path + ".tmp", path)
+
+    def __len__(self):
+        return len(self.by_ocid)
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """네트워크 없이 FixtureStore 의 응답을 돌려주는 httpx 전송 계층 (부하 테스트 / 벤치마크용)
+
+    - /id, /character/basic, /character/stat, /character/item-equipment 를 경로 끝부분으로 구분 (base_url 무관)
+    - 없는 캐릭터는 실제 API 처럼 400, 그 외 URL(캐릭터 이미지 등)은 단색 PNG
+    - latency_ms(+ 0~jitter_ms)만큼 지연, error_rate 비율로 error_status 응답을 섞어 업스트림 장애를 흉내냄
+    """
+
+    def __init__(self, fixtures: FixtureStore, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 500, seed: int = None):
+        self.fixtures = fixtures
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.placeholder = _placeholder_png()
+        self.stats = {"requests": 0, "errors_injected": 0, "not_found": 0}
+
+    @classmethod
+    def from_env(cls, fixtures: FixtureStore):
+        return cls(
+            fixtures,
+            latency_ms=float(os.getenv("NEXON_REPLAY_LATENCY_MS", "0")),
+            jitter_ms=float(os.getenv("NEXON_REPLAY_JITTER_MS", "0")),
+            error_rate=float(os.getenv("NEXON_REPLAY_ERROR_RATE", "0")),
+            error_status=int(os.getenv("NEXON_REPLAY_ERROR_STATUS", "500")),
+            seed=int(os.getenv("NEXON_REPLAY_SEED")) if os.getenv("NEXON_REPLAY_SEED") else None,
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats["requests"] += 1
+        delay = self.latency_ms + (self.random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        path = request.url.path
+        params = request.url.params
+        if path.endswith("/id") or any(path.endswith(endpoint) for endpoint in ENDPOINTS):
+            if self.error_rate and self.random.random() < self.error_rate:
+                self.stats["errors_injected"] += 1
+                return httpx.Response(self.error_status, json={"error": {"name": "OPENAPI00001", "message": "injected"}})
+
+        if path.endswith("/id"):
+            ocid = self.fixtures.ocid(params.get("character_name", ""))
+            return self._json({"ocid": ocid} if ocid else None)
+
+        for endpoint, key in ENDPOINTS.items():
+            if path.endswith(endpoint):
+                return self._json(self.fixtures.get(params.get("ocid", ""), key, params.get("date")))
+
+        return httpx.Response(200, content=self.placeholder, headers={"content-type": "image/png"})
+
+    def _json(self, body):
+        if body is None:
+            self.stats["not_found"] += 1
+            return httpx.Response(400, json=NOT_FOUND_BODY)
+        return httpx.Response(200, json=body)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """실제 API 로 요청을 보내면서 200 응답을 FixtureStore 디렉터리에 저장하는 전송 계층 (record 모드)
+
+    응답 본문만 저장하므로 API 키는 기록되지 않습니다.
+    """
+
+    def __init__(self, fixtures: FixtureStore, transport: httpx.AsyncBaseTransport):
+        self.fixtures = fixtures
+        self.transport = transport
+        self.recorded = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.transport.handle_async_request(request)
+        path = request.url.path
+        params = request.url.params
+        key = next((key for endpoint, key in ENDPOINTS.items() if path.endswith(endpoint)), None)
+        if response.status_code != 200 or (key is None and not path.endswith("/id")):
+            return response
+
+        await response.aread()
+        try:
+            body = json.loads(response.content)
+        except ValueError:
+            return response
+        if key is not None:
+            self.fixtures.record(params.get("ocid", ""), key, body, date=params.get("date"))
+        elif body.get("ocid"):
+            self.fixtures.record(body["ocid"], None, None, name=params.get("character_name"))
+        self.recorded += 1
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+def transport_from_env(limits: httpx.Limits = None, http2: bool = False):
+    """NEXON_TRANSPORT 설정에 맞는 전송 계층 (live 이면 None → httpx 기본 전송 사용)
+
+    - replay: NEXON_FIXTURES_DIR 의 녹화 응답으로 응답 (네트워크 / API 쿼터 사용 없음)
+    - record: 실제 API 를 호출하면서 응답을 NEXON_FIXTURES_DIR 에 저장
+    """
+    mode = os.getenv("NEXON_TRANSPORT", "live").lower()
+    directory = os.getenv("NEXON_FIXTURES_DIR", "fixtures")
+    if mode == "replay":
+        fixtures = FixtureStore(directory=directory)
+        print(f"🎞️ Replay mode: {len(fixtures)} fixtures from {directory}")
+        return ReplayTransport.from_env(fixtures)
+    if mode == "record":
+        print(f"⏺️ Record mode: saving responses to {directory}")
+        return RecordingTransport(FixtureStore(directory=directory), httpx.AsyncHTTPTransport(limits=limits, http2=http2))
+    return None
@@ -0,0 +1,135 @@
+import os
+import json
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+from fastapi.responses import JSONResponse
+
+try:
+    from metrics import span
+except ImportError:
+    from app.metrics import span
+
+# orjson / brotli 는 설치된 경우에만 사용 (없으면 표준 json / gzip 으로 동작)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def json_dumps(content) -> bytes:
+    """응답용 JSON 직렬화 (orjson 이 있으면 orjson, 없으면 표준 json 과 같은 출력)"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson 으로 직렬화하는 JSONResponse
+
+    라우트에서 이 클래스로 직접 반환하면 FastAPI 의 jsonable_encoder 단계(중첩 dict 전체 복사)도 건너뜁니다.
+    내용은 dict / list / str / 숫자 / bool / None 으로만 이루어져 있어야 합니다.
+    """
+
+    def render(self, content) -> bytes:
+        with span("serialize"):
+            return json_dumps(content)
+
+
+# 이미 압축된 포맷(이미지, ZIP)은 다시 압축하지 않음
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml", "application/xml")
+
+
+class CompressionMiddleware:
+    """응답 본문이 minimum_size 이상이면 brotli(설치 시) / gzip 으로 압축하는 ASGI 미들웨어
+
+    - 한 번에 보내는 응답만 압축하고, 스트리밍 응답(NDJSON 일괄 조회, 카드 ZIP)은 그대로 흘려보냅니다.
+    - brotli 는 JSON 에서 gzip 보다 작고 빠른 편이라 클라이언트가 지원하면 우선 사용합니다.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    @classmethod
+    def options_from_env(cls) -> dict:
+        return {
+            "minimum_size": int(os.getenv("COMPRESS_MIN_SIZE", "1024")),
+            "gzip_level": int(os.getenv("GZIP_LEVEL", "6")),
+            "brotli_quality": int(os.getenv("BROTLI_QUALITY", "4")),
+        }
+
+    def _choose_encoding(self, accept_encoding: str):
+        accepted = set()
+        for part in accept_encoding.split(","):
+            coding, _, params = part.strip().partition(";")
+            name, _, value = params.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    if float(value) <= 0:
+                        continue
+                except ValueError:
+                    continue
+            accepted.add(coding.strip().lower())
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        # 첫 본문을 보고 압축 여부를 정해야 하므로 응답 시작 메시지를 잠시 보류
+        pending_start = None
+
+        async def send_wrapper(message):
+            nonlocal pending_start
+            if message["type"] == "http.response.start":
+                pending_start = message
+                return
+            if message["type"] != "http.response.body" or pending_start is None:
+                await send(message)
+                return
+
+            start, pending_start = pending_start, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            content_type = headers.get("content-type", "")
+            compressible = content_type.startswith(COMPRESSIBLE_TYPES) and "content-encoding" not in headers
+            streaming = message.get("more_body", False)
+
+            if compressible and not streaming:
+                headers.add_vary_header("Accept-Encoding")
+            if not compressible or streaming or len(body) < self.minimum_size:
+                await send(start)
+                await send(message)
+                return
+
+            with span("compress"):
+                compressed = self._compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,71 +1,224 @@
 import httpx
 import os
+import time
+import asyncio
+import importlib.util
+from contextvars import ContextVar
 from dotenv import load_dotenv
 
+try:
+    from cache import OcidCache, MISSING
+    from ratelimit import UpstreamRateLimiter
+    from replay import transport_from_env
+    from metrics import span, record_span, upstream_request_seconds, upstream_responses, upstream_errors
+except ImportError:
+    from app.cache import OcidCache, MISSING
+    from app.ratelimit import UpstreamRateLimiter
+    from app.replay import transport_from_env
+    from app.metrics import span, record_span, upstream_request_seconds, upstream_responses, upstream_errors
+
 # 현재 파일 위치 기준으로 .env 로드 시도
 load_dotenv()
 
+# HTTP/2는 h2 패키지(httpx[http2])가 설치된 경우에만 사용
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# 요청(/check-items 1회) 단위 커넥션 재사용 통계
+_request_conn_stats: ContextVar = ContextVar("request_conn_stats", default=None)
+
 
 class NexonAPIHandler:
-    def __init__(self):
-        self.api_key = os.getenv("NEXON_API_KEY")
+    def __init__(self, transport: httpx.AsyncBaseTransport = None):
+        # 여러 키를 쉼표로 구분해 NEXON_API_KEYS 에 등록하면 키별 쿼터를 나눠 사용
+        self.api_keys = [k.strip() for k in os.getenv("NEXON_API_KEYS", "").split(",") if k.strip()]
+        if not self.api_keys and os.getenv("NEXON_API_KEY"):
+            self.api_keys = [os.getenv("NEXON_API_KEY")]
+        # 업스트림 전송 계층: 기본은 실제 API, NEXON_TRANSPORT=replay / record 이면 녹화 응답 재생 / 녹화
+        transport_mode = os.getenv("NEXON_TRANSPORT", "live").lower()
+        if not self.api_keys and (transport is not None or transport_mode == "replay"):
+            self.api_keys = ["replay"]  # 재생 모드는 키 없이 동작
+        self.api_key = self.api_keys[0] if self.api_keys else None
         # 디버깅을 위해 서버 시작 시 키 로드 여부 출력 (앞 5자리만)
         if self.api_key:
-            print(f"✅ API Key Loaded: {self.api_key[:5]}***")
+            print(f"✅ API Key Loaded: {', '.join(k[:5] + '***' for k in self.api_keys)}")
         else:
             print("❌ API Key Missing! Check your .env file.")
 
-        self.base_url = "https://open.api.nexon.com/maplestory/v1"
+        self.base_url = os.getenv("NEXON_API_BASE_URL", "https://open.api.nexon.com/maplestory/v1").rstrip("/")
         self.headers = {
             "x-nxopen-api-key": self.api_key if self.api_key else ""
         }
         self.client = None
 
+        # API 키별 토큰 버킷 (Nexon 초당 호출 쿼터에 맞춤)
+        self.rate_limiter = UpstreamRateLimiter.from_env(self.api_keys or [""])
+
+        # 커넥션 풀 / 타임아웃 설정 (환경 변수로 조정 가능)
+        self.limits = httpx.Limits(
+            max_connections=int(os.getenv("NEXON_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("NEXON_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.getenv("NEXON_KEEPALIVE_EXPIRY", "30")),
+        )
+        self.timeout = httpx.Timeout(
+            float(os.getenv("NEXON_READ_TIMEOUT", "10")),
+            connect=float(os.getenv("NEXON_CONNECT_TIMEOUT", "3")),
+            pool=float(os.getenv("NEXON_POOL_TIMEOUT", "5")),
+        )
+        self.http2 = HTTP2_AVAILABLE and os.getenv("NEXON_HTTP2", "1") == "1"
+        # 전송 계층을 지정하면 httpx 는 limits / http2 를 무시하므로 record 모드의 실제 전송에 직접 넘김
+        self.transport = transport if transport is not None else transport_from_env(self.limits, self.http2)
+
+        # 서버 전체 누적 커넥션 통계
+        self.connection_stats = {"requests": 0, "new_connections": 0, "reused_connections": 0}
+
+        # 캐릭터명 → ocid 캐시 (ocid는 거의 바뀌지 않으므로 긴 TTL)
+        self.ocid_cache = OcidCache.from_env()
+
+    async def startup(self):
+        """FastAPI lifespan 시작 시 공용 커넥션 풀을 엽니다."""
+        await self._get_client()
+
+    async def close(self):
+        """FastAPI lifespan 종료 시 커넥션 풀을 닫고, 남은 ocid 캐시 기록을 마칩니다."""
+        await self.ocid_cache.flush()
+        if self.client is not None and not self.client.is_closed:
+            await self.client.aclose()
+        self.client = None
+
     async def _get_client(self):
         # 요청 시점에 클라이언트가 없으면 생성 (싱글톤 패턴)
         if self.client is None or self.client.is_closed:
-            self.client = httpx.AsyncClient(headers=self.headers, timeout=10.0)
+            # API 키는 _get 에서 요청마다 붙임 (캐릭터 이미지 등 다른 요청에는 키를 보내지 않음)
+            self.client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                transport=self.transport,
+            )
         return self.client
 
+    async def fetch_image(self, url: str):
+        """캐릭터 이미지 등 정적 리소스를 공용 커넥션 풀로 내려받습니다. (API 쿼터와 무관하므로 토큰 버킷 미사용)"""
+        client = await self._get_client()
+        response = await client.get(url)
+        return response.content if response.status_code == 200 else None
+
+    def track_connections(self) -> dict:
+        """현재 요청 컨텍스트에서 발생하는 업스트림 호출의 커넥션 재사용 통계를 수집합니다."""
+        stats = {"requests": 0, "new_connections": 0, "reused_connections": 0}
+        _request_conn_stats.set(stats)
+        return stats
+
+    async def _get(self, path: str, params: dict) -> httpx.Response:
+        client = await self._get_client()
+        opened = False
+
+        # httpcore trace 훅: 새 TCP 연결이 열렸는지(핸드셰이크 발생) 확인
+        async def trace(event_name, info):
+            nonlocal opened
+            if event_name == "connection.connect_tcp.complete":
+                opened = True
+
+        with span("rate_limit_wait"):
+            api_key = await self.rate_limiter.acquire()
+        started = time.perf_counter()
+        try:
+            response = await client.get(
+                f"{self.base_url}{path}", params=params,
+                headers={"x-nxopen-api-key": api_key}, extensions={"trace": trace}
+            )
+            upstream_responses.inc(path, response.status_code)
+            if response.status_code == 429:
+                self.rate_limiter.penalize(api_key)
+            return response
+        except Exception as e:
+            upstream_errors.inc(path, type(e).__name__)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            upstream_request_seconds.observe(elapsed, path)
+            record_span("upstream" + path.replace("/character/", "_").replace("/", "_"), elapsed)
+            request_stats = _request_conn_stats.get()
+            for stats in (self.connection_stats, request_stats):
+                if stats is None:
+                    continue
+                stats["requests"] += 1
+                stats["new_connections" if opened else "reused_connections"] += 1
+
+    @staticmethod
+    def _error_name(response) -> str:
+        """Nexon API 오류 응답의 error.name (예: OPENAPI00004, 형식이 다르면 빈 문자열)"""
+        try:
+            return response.json()["error"]["name"]
+        except (ValueError, KeyError, TypeError):
+            return ""
+
     async def get_ocid(self, character_name: str):
         if not self.api_key:
             return {"error": "서버의 API Key 설정이 되어있지 않습니다."}
 
-        url = f"{self.base_url}/id"
-        params = {"character_name": character_name}
+        cached = await self.ocid_cache.get(character_name)
+        if cached is not MISSING:
+            return cached or None
+
+        try:
+            response = await self._get("/id", {"character_name": character_name})
+            # 존재하지 않는 캐릭터는 400 + OPENAPI00004 로 응답 → 짧은 TTL 로 캐싱 (다른 400 은 캐싱하지 않음)
+            if response.status_code == 400 and self._error_name(response) == "OPENAPI00004":
+                self.ocid_cache.set_not_found(character_name)
+                return None
+            # 500 에러 방지를 위한 예외 처리
+            if response.status_code != 200:
+                return {"error": f"Nexon API Error ({response.status_code})", "detail": response.text}
+            ocid = response.json().get("ocid")
+            if ocid:
+                self.ocid_cache.set(character_name, ocid)
+            return ocid
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, headers=self.headers, params=params)
-                # 500 에러 방지를 위한 예외 처리
-                if response.status_code != 200:
-                    return {"error": f"Nexon API Error ({response.status_code})", "detail": response.text}
-                return response.json().get("ocid")
+        except Exception as e:
+            print(f"Network Error: {e}")
+            return {"error": "네트워크 연결 실패"}
 
-            except Exception as e:
-                print(f"Network Error: {e}")
-                return {"error": "네트워크 연결 실패"}
+    @staticmethod
+    def _character_params(ocid: str, date: str = None) -> dict:
+        # date(YYYY-MM-DD, KST)를 주면 그날 기준 정보를 조회 (없으면 현재 정보)
+        return {"ocid": ocid, "date": date} if date else {"ocid": ocid}
 
-    async def get_character_basic(self, ocid: str):
+    async def get_character_basic(self, ocid: str, date: str = None):
         """ocid로 캐릭터 기본 정보(이름, 월드, 직업, 레벨, 이미지)를 가져옵니다."""
-        url = f"{self.base_url}/character/basic"
-        params = {"ocid": ocid}
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers, params=params)
-            return response.json() if response.status_code == 200 else None
+        response = await self._get("/character/basic", self._character_params(ocid, date))
+        return response.json() if response.status_code == 200 else None
 
-    async def get_character_stat(self, ocid: str):
+    async def get_character_stat(self, ocid: str, date: str = None):
         """ocid로 캐릭터의 상세 스탯(전투력 등)을 가져옵니다."""
-        url = f"{self.base_url}/character/stat"
-        params = {"ocid": ocid}
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers, params=params)
-            return response.json() if response.status_code == 200 else None
+        response = await self._get("/character/stat", self._character_params(ocid, date))
+        return response.json() if response.status_code == 200 else None
 
-    async def get_character_item(self, ocid: str):
+    async def get_character_item(self, ocid: str, date: str = None):
         """캐릭터의 장비 아이템 정보를 가져옵니다."""
-        url = f"{self.base_url}/character/item-equipment"
-        params = {"ocid": ocid}
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers, params=params)
-            return response.json() if response.status_code == 200 else None
\ No newline at end of file
+        response = await self._get("/character/item-equipment", self._character_params(ocid, date))
+        return response.json() if response.status_code == 200 else None
+
+    async def get_character_bundle(self, ocid: str, date: str = None) -> dict:
+        """basic / item / stat 정보를 동시에 요청합니다.
+
+        세 요청 모두 ocid에만 의존하므로 병렬로 보내고, 일부가 실패해도 나머지 결과는 살려서 반환합니다.
+        실패한 항목은 None 이며 이름이 "failed" 목록에 담깁니다.
+        """
+        names = ("basic", "item", "stat")
+        results = await asyncio.gather(
+            self.get_character_basic(ocid, date),
+            self.get_character_item(ocid, date),
+            self.get_character_stat(ocid, date),
+            return_exceptions=True,
+        )
+
+        bundle = {"failed": []}
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                print(f"Network Error ({name}): {result}")
+                result = None
+            if result is None:
+                bundle["failed"].append(name)
+            bundle[name] = result
+        return bundle
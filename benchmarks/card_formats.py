@@ -0,0 +1,69 @@
+"""카드 출력 포맷 / 인코더 설정 비교 벤치마크
+
+    python benchmarks/card_formats.py [-n 30]
+
+같은 카드 한 장을 포맷·설정별로 인코딩하여 크기(bytes), 인코딩 시간, 원본 대비 PSNR 을 비교합니다.
+(PSNR 은 손실 압축 품질 참고용, 무손실 포맷은 inf)
+"""
+import os
+import sys
+import math
+import time
+import argparse
+from io import BytesIO
+from PIL import Image, ImageChops, ImageStat, features
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.image_gen import CardGenerator
+from benchmarks.card_render import SAMPLE_DATA, sample_avatar
+
+CANDIDATES = [
+    ("png", {"compress_level": 1}),
+    ("png", {"compress_level": 6}),
+    ("png", {"compress_level": 9}),
+    ("png", {"optimize": True}),
+    ("webp", {"lossless": True, "method": 4}),
+    ("webp", {"quality": 75, "method": 4}),
+    ("webp", {"quality": 85, "method": 4}),
+    ("webp", {"quality": 85, "method": 6}),
+    ("webp", {"quality": 95, "method": 4}),
+    ("avif", {"quality": 60, "speed": 8}),
+    ("avif", {"quality": 70, "speed": 8}),
+    ("avif", {"quality": 70, "speed": 4}),
+]
+
+
+def psnr(original, encoded: bytes) -> float:
+    decoded = Image.open(BytesIO(encoded)).convert("RGB")
+    diff = ImageChops.difference(original, decoded)
+    mse = sum(ImageStat.Stat(diff).sum2) / (original.size[0] * original.size[1] * 3)
+    return math.inf if mse == 0 else 10 * math.log10(255 ** 2 / mse)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=30, help="포맷별 반복 횟수")
+    args = parser.parse_args()
+
+    generator = CardGenerator()
+    card = generator.compose_card(SAMPLE_DATA, generator.process_avatar(sample_avatar()))
+
+    print(f"{'format':<6} {'options':<36} {'bytes':>8} {'encode ms':>10} {'PSNR':>7}")
+    for fmt, options in CANDIDATES:
+        if fmt != "png" and not features.check(fmt):
+            print(f"{fmt:<6} {'(코덱 없음)':<36}")
+            continue
+
+        buf = BytesIO()
+        card.save(buf, format=fmt.upper(), **options)
+        start = time.perf_counter()
+        for _ in range(args.n):
+            buf = BytesIO()
+            card.save(buf, format=fmt.upper(), **options)
+        elapsed = (time.perf_counter() - start) / args.n
+        data = buf.getvalue()
+        print(f"{fmt:<6} {str(options):<36} {len(data):>8} {elapsed * 1000:>10.2f} {psnr(card, data):>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
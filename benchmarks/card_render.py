@@ -0,0 +1,67 @@
+"""카드 렌더링 마이크로 벤치마크
+
+    python benchmarks/card_render.py [-n 200]
+
+- per_card_assets: 카드마다 폰트 / 원형 마스크 / 배경을 새로 만드는 경우 (기존 create_card 방식)
+- preloaded: CardGenerator 생성 시 만들어둔 자산을 재사용하는 경우 (아바타는 매번 처리)
+- avatar_cached: 처리된 아바타까지 캐시에서 꺼내 쓰는 경우 (재렌더링)
+네트워크 없이 합성한 캐릭터 이미지로 측정합니다.
+"""
+import os
+import sys
+import time
+import argparse
+from io import BytesIO
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.image_gen import CardGenerator
+
+SAMPLE_DATA = {
+    "image": "", "name": "메큘레이터", "class": "아크메이지(썬,콜)", "world": "스카니아",
+    "level": 285, "combat_power": 512345678,
+}
+
+
+def sample_avatar() -> bytes:
+    # Nexon 캐릭터 이미지와 비슷한 크기(300x300)의 투명 배경 PNG
+    img = Image.new("RGBA", (300, 300), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.ellipse((100, 60, 200, 160), fill=(255, 214, 170, 255))
+    draw.rectangle((110, 150, 190, 260), fill=(60, 90, 200, 255))
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def bench(label: str, func, n: int):
+    func()  # 워밍업
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    elapsed = (time.perf_counter() - start) / n
+    print(f"{label:<18} {elapsed * 1000:8.2f} ms/card")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=200, help="반복 횟수")
+    args = parser.parse_args()
+
+    avatar = sample_avatar()
+    generator = CardGenerator()
+
+    def per_card_assets():
+        fresh = CardGenerator()
+        fresh.render_card(SAMPLE_DATA, fresh.process_avatar(avatar))
+
+    before = bench("per_card_assets", per_card_assets, args.n)
+    after = bench("preloaded", lambda: generator.render_card(SAMPLE_DATA, generator.process_avatar(avatar)), args.n)
+    processed = generator.process_avatar(avatar)
+    cached = bench("avatar_cached", lambda: generator.render_card(SAMPLE_DATA, processed), args.n)
+    print(f"{'speedup':<18} {before / after:8.2f} x (preloaded), {before / cached:.2f} x (avatar_cached)")
+
+
+if __name__ == "__main__":
+    main()
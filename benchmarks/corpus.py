@@ -0,0 +1,168 @@
+"""벤치마크용 합성 캐릭터 데이터 (Nexon Open API 응답 형태)
+
+    from benchmarks.corpus import make_character, make_corpus
+
+- 시드가 같으면 항상 같은 데이터를 만듭니다. (결과 비교용)
+- 직업은 calculator.CLASS_PROFILES 의 전 직업을 순서대로 돌아가며 배정합니다.
+- 장비는 실제 응답과 같은 키 구성(옵션 값은 문자열)으로 부위별 24개 + 프리셋 3개를 만듭니다.
+"""
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.calculator import CLASS_PROFILES
+
+CLASSES = sorted(CLASS_PROFILES)
+
+# (슬롯, 부위, 아이템 이름 후보)
+SLOTS = [
+    ("모자", "모자", ["앱솔랩스 나이트헬름", "아케인셰이드 나이트햇", "에테르넬 나이트헬름", "하이네스 워리어헬름"]),
+    ("상의", "상의", ["이글아이 워리어아머", "에테르넬 나이트아머"]),
+    ("하의", "하의", ["트릭스터 워리어팬츠", "에테르넬 나이트팬츠"]),
+    ("신발", "신발", ["앱솔랩스 나이트슈즈", "아케인셰이드 나이트슈즈", "타일런트 하데스 부츠"]),
+    ("장갑", "장갑", ["앱솔랩스 나이트글러브", "아케인셰이드 나이트글러브", "타일런트 히아데스 글러브"]),
+    ("망토", "망토", ["앱솔랩스 나이트케이프", "아케인셰이드 나이트망토", "타일런트 하데스 클록"]),
+    ("벨트", "벨트", ["골든 클로버 벨트", "몽환의 벨트", "타일런트 헤르메스 벨트"]),
+    ("어깨장식", "어깨장식", ["앱솔랩스 숄더", "아케인셰이드 숄더", "에테르넬 숄더패드"]),
+    ("얼굴장식", "얼굴장식", ["트와일라이트 마크", "루즈 컨트롤 머신 마크"]),
+    ("눈장식", "눈장식", ["블랙빈 마크", "마력이 깃든 안대", "파풀라투스 마크"]),
+    ("귀고리", "귀고리", ["데이브레이크 이어링", "에스텔라 이어링", "커맨더 포스 이어링"]),
+    ("반지1", "반지", ["마이스터링", "이터널 플레임 링", "거대한 공포"]),
+    ("반지2", "반지", ["어웨이크 링", "고귀한 이터널 플레임 링", "글로리온 링 : 슈프림"]),
+    ("반지3", "반지", ["카오스 링", "가디언 엔젤 링"]),
+    ("반지4", "반지", ["리스트레인트 링", "컨티뉴어스 링", "웨폰퍼프 - S링"]),
+    ("펜던트", "펜던트", ["도미네이터 펜던트", "데이브레이크 펜던트", "고통의 근원"]),
+    ("펜던트2", "펜던트", ["매커네이터 펜던트", "카오스 혼테일의 목걸이", "가디언 엔젤 링"]),
+    ("포켓 아이템", "포켓 아이템", ["핑크빛 성배", "저주받은 마도서"]),
+    ("기계 심장", "기계 심장", ["티타늄 하트", "플라즈마 하트", "블랙 하트"]),
+    ("무기", "두손검", ["앱솔랩스 투핸드소드", "아케인셰이드 투핸드소드", "제네시스 투핸드소드", "데스티니 투핸드소드"]),
+    ("보조무기", "보조무기", ["아이언 체인", "에테르넬 보조무기"]),
+    ("엠블렘", "엠블렘", ["골드 메이플리프 엠블렘"]),
+    ("뱃지", "뱃지", ["창세의 뱃지", "칠요의 뱃지", "크리스탈 웬투스 뱃지"]),
+    ("훈장", "훈장", ["칠요의 몬스터파커", "카루타 원정대 훈장", "영웅의 훈장"]),
+]
+
+ITEM_LEVELS = {"앱솔랩스": 160, "아케인셰이드": 200, "에테르넬": 250, "타일런트": 150, "제네시스": 200, "데스티니": 200}
+
+GRADES = ["레어", "에픽", "유니크", "레전드리"]
+
+OPTION_KEYS = ["str", "dex", "int", "luk", "max_hp", "max_mp", "attack_power", "magic_power", "armor", "speed", "jump",
+               "boss_damage", "ignore_monster_armor", "all_stat", "damage", "equipment_level_decrease", "max_hp_rate",
+               "max_mp_rate"]
+
+
+def _empty_option():
+    return {key: "0" for key in OPTION_KEYS}
+
+
+def _option(rnd, values: dict):
+    option = _empty_option()
+    for key, value in values.items():
+        option[key] = str(value)
+    return option
+
+
+def _potential_lines(rnd, stat: str, grade_index: int, additional: bool, weapon: bool) -> list:
+    percent = [3, 6, 9, 12][grade_index] if not additional else [2, 4, 7, 10][grade_index]
+    if weapon:
+        pool = [f"공격력 : +{percent}%", f"마력 : +{percent}%", f"보스 몬스터 공격 시 데미지 : +{30 + percent}%",
+                f"몬스터 방어율 무시 : +{30 + percent}%", f"데미지 : +{percent}%", "공격력 : +12"]
+    else:
+        pool = [f"{stat} : +{percent}%", f"{stat} : +{percent - 3 if percent > 3 else percent}%",
+                f"올스탯 : +{max(percent - 3, 1)}%", f"캐릭터 기준 10레벨 당 {stat} : +{1 + grade_index // 2}",
+                f"크리티컬 데미지 : +{[1, 3, 5, 8][grade_index]}%", f"{stat} : +{6 * (grade_index + 1)}",
+                "최대 HP : +12%", "공격력 : +12", "마력 : +12", "모든 스킬의 재사용 대기시간 : -1초(10초 이하는 5%감소, 5초 미만으로 감소 불가)",
+                "메소 획득량 : +20%", "HP 회복 아이템 및 회복 스킬 효율 : +30%"]
+    return [rnd.choice(pool) for _ in range(3)]
+
+
+def _item(rnd, slot: str, part: str, names: list, stat_key: str, atk_key: str) -> dict:
+    name = rnd.choice(names)
+    level = next((lv for prefix, lv in ITEM_LEVELS.items() if name.startswith(prefix)), rnd.choice([130, 140, 150, 160]))
+    weapon = slot in ("무기", "보조무기", "엠블렘")
+    stat = stat_key.upper() if stat_key in ("str", "dex", "int", "luk") else "STR"
+
+    star = rnd.choice([0, 12, 17, 18, 21, 22, 22, 23]) if part not in ("포켓 아이템", "뱃지", "훈장", "엠블렘", "보조무기") else 0
+    base = _option(rnd, {"str": 40, "dex": 40, "int": 40, "luk": 40, atk_key: 3 if not weapon else 300, "armor": 300})
+    base["base_equipment_level"] = level
+
+    add = _option(rnd, {stat_key: rnd.randint(0, 120), "all_stat": rnd.randint(0, 7), atk_key: rnd.randint(0, 7),
+                        "boss_damage": rnd.choice([0, 0, 12, 14]) if weapon else 0,
+                        "damage": rnd.choice([0, 5, 6]) if weapon else 0})
+    etc = _option(rnd, {stat_key: rnd.choice([0, 30, 60]), atk_key: rnd.choice([0, 10, 20])})
+    starforce = _option(rnd, {stat_key: min(star, 22) * 4 + (star > 15) * 30, atk_key: max(star - 15, 0) * 9})
+    total = {key: str(sum(int(opt.get(key, 0) or 0) for opt in (base, add, etc, starforce))) for key in OPTION_KEYS}
+
+    grade_index = rnd.randint(1, 3)
+    additional_index = rnd.randint(0, grade_index)
+    potential = _potential_lines(rnd, stat, grade_index, False, weapon)
+    additional = _potential_lines(rnd, stat, additional_index, True, weapon)
+
+    return {
+        "item_equipment_part": part, "item_equipment_slot": slot, "item_name": name,
+        "item_icon": f"https://open.api.nexon.com/static/maplestory/item/icon/{rnd.getrandbits(48):012X}",
+        "item_description": None, "item_shape_name": name,
+        "item_shape_icon": f"https://open.api.nexon.com/static/maplestory/item/icon/{rnd.getrandbits(48):012X}",
+        "item_gender": None, "item_total_option": total, "item_base_option": base,
+        "potential_option_flag": "false", "additional_potential_option_flag": "false",
+        "potential_option_grade": GRADES[grade_index], "additional_potential_option_grade": GRADES[additional_index],
+        "potential_option_1": potential[0], "potential_option_2": potential[1], "potential_option_3": potential[2],
+        "additional_potential_option_1": additional[0], "additional_potential_option_2": additional[1],
+        "additional_potential_option_3": additional[2],
+        "equipment_level_increase": 0, "item_exceptional_option": {**{k: "0" for k in ("str", "dex", "int", "luk", "max_hp", "max_mp", "attack_power", "magic_power")}, "exceptional_upgrade": 0},
+        "item_add_option": add, "growth_exp": 0, "growth_level": 0, "scroll_upgrade": str(rnd.choice([8, 9, 10, 11])),
+        "cuttable_count": "255", "golden_hammer_flag": "적용", "scroll_resilience_count": "0",
+        "scroll_upgradeable_count": "0", "soul_name": None, "soul_option": None, "item_etc_option": etc,
+        "starforce": str(star), "starforce_scroll_flag": "미사용", "item_starforce_option": starforce,
+        "special_ring_level": 0, "date_expire": None,
+    }
+
+
+def make_character(seed: int, class_name: str = None) -> dict:
+    """{"ocid", "basic", "stat", "item"} 형태의 캐릭터 한 명"""
+    rnd = random.Random(seed)
+    class_name = class_name or CLASSES[seed % len(CLASSES)]
+    profile = CLASS_PROFILES[class_name]
+    stat_key = profile.main_stat if profile.main_stat in ("str", "dex", "int", "luk") else ("max_hp" if profile.main_stat == "hp" else "str")
+    level = rnd.randint(220, 290)
+    name = f"bench{seed:05d}"
+
+    presets = []
+    for _ in range(3):
+        presets.append([_item(rnd, slot, part, names, stat_key, profile.atk_key) for slot, part, names in SLOTS])
+    preset_no = rnd.randint(1, 3)
+
+    combat_power = rnd.randint(10_000_000, 800_000_000)
+    return {
+        "ocid": f"{seed:032x}",
+        "basic": {
+            "date": None, "character_name": name, "world_name": "스카니아", "character_gender": "남",
+            "character_class": class_name, "character_class_level": "6", "character_level": level,
+            "character_exp": rnd.randint(0, 10 ** 12), "character_exp_rate": f"{rnd.uniform(0, 100):.3f}",
+            "character_guild_name": "벤치길드",
+            "character_image": f"https://open.api.nexon.com/static/maplestory/character/look/{name}",
+            "character_date_create": "2020-01-01T00:00+09:00", "access_flag": "true", "liberation_quest_clear_flag": "true",
+        },
+        "stat": {
+            "date": None, "character_class": class_name, "remain_ap": 0,
+            "final_stat": [
+                {"stat_name": "전투력", "stat_value": str(combat_power)},
+                {"stat_name": "STR", "stat_value": str(rnd.randint(4000, 60000))},
+                {"stat_name": "DEX", "stat_value": str(rnd.randint(4000, 60000))},
+                {"stat_name": "INT", "stat_value": str(rnd.randint(4000, 60000))},
+                {"stat_name": "LUK", "stat_value": str(rnd.randint(4000, 60000))},
+            ],
+        },
+        "item": {
+            "date": None, "character_gender": "남", "character_class": class_name, "preset_no": preset_no,
+            "item_equipment": presets[preset_no - 1],
+            "item_equipment_preset_1": presets[0], "item_equipment_preset_2": presets[1], "item_equipment_preset_3": presets[2],
+            "title": None, "dragon_equipment": [], "mechanic_equipment": [],
+        },
+    }
+
+
+def make_corpus(count: int, seed: int = 0) -> list:
+    """전 직업을 돌아가며 배정한 캐릭터 count 명"""
+    return [make_character(seed + i) for i in range(count)]
@@ -0,0 +1,37 @@
+"""재생(replay) 모드용 픽스처 디렉터리 생성
+
+    python benchmarks/fixtures.py fixtures/ [--characters N] [--seed 0]
+
+benchmarks/corpus.py 의 합성 캐릭터를 app/replay.py 의 FixtureStore 형식({ocid}.json)으로 저장합니다.
+이후 아래처럼 실행하면 API 쿼터 없이 /check-items 등을 부하 테스트할 수 있습니다. (캐릭터명: bench00000 ~)
+
+    NEXON_TRANSPORT=replay NEXON_FIXTURES_DIR=fixtures NEXON_RATE_LIMIT=1000 NEXON_RATE_BURST=1000 \\
+        NEXON_REPLAY_LATENCY_MS=40 uvicorn app.main:app
+
+실제 응답을 모으려면 NEXON_TRANSPORT=record 로 서버를 띄우고 조회하면 같은 디렉터리에 저장됩니다.
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.replay import FixtureStore
+from benchmarks.corpus import CLASSES, make_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory", help="픽스처를 저장할 디렉터리")
+    parser.add_argument("--characters", type=int, default=len(CLASSES), help="합성 캐릭터 수 (기본: 전 직업 한 명씩)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    store = FixtureStore(directory=args.directory)
+    for character in make_corpus(args.characters, args.seed):
+        for key in ("basic", "stat", "item"):
+            store.record(character["ocid"], key, character[key])
+    print(f"{args.characters}명 저장 → {args.directory} (예: {character['basic']['character_name']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""분석 / 렌더링 핫패스 벤치마크 실행기
+
+    python benchmarks/run.py [--characters N] [--seconds 1.0] [--only analyzer,route]
+                             [--output results.json] [--baseline baseline.json] [--threshold 0.15]
+
+benchmarks/corpus.py 의 전 직업 합성 캐릭터로 아래 항목의 처리량(ops/s)과 지연 분포(p50 / p90 / p99)를 측정합니다.
+- analyzer.*: get_best_preset, evaluate_equipment, generate_overall_review, analyze_character
+- calculator.*: 점수 함수별 (호출이 매우 짧아 batch 번 호출을 한 표본으로 재고 1회 기준으로 환산)
+- card.*: CardGenerator.create_card (처리된 아바타 캐시 적중 / 매번 다운로드·처리)
+- route.*: /check-items 전체 경로 (ASGI 로 직접 호출, 업스트림은 app/replay.py 의 ReplayTransport)
+  - route.check_items: ?refresh=1, 아이템 점수 메모 없이 매번 조회·분석 (ITEM_SCORE_MEMO_SIZE=0)
+  - route.check_items_cached: 리포트 캐시 적중
+
+--output 으로 결과를 JSON 으로 저장하고, --baseline 을 주면 항목별 p50 을 비교해
+threshold(기본 15%) 이상 느려진 항목이 있으면 종료 코드 1 을 반환합니다. (--save-baseline 으로 기준 갱신)
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from app.analyzer import get_best_preset, evaluate_equipment, generate_overall_review, analyze_character
+from app.calculator import (
+    get_class_profile, calculate_item_score, get_advanced_add_score, add_diff_score, calculate_potential_score,
+    calculate_weapon_add_option_score, calculate_weapon_potential_score, get_starforce_score,
+)
+from benchmarks.corpus import CLASSES, make_corpus
+from benchmarks.card_render import sample_avatar
+
+WEAPON_SLOTS = ("무기", "보조무기", "엠블렘")
+SPECIAL_PARTS = ("훈장", "뱃지", "포켓 아이템")
+
+
+class Case:
+    """벤치마크 항목 하나
+
+    func(i) 는 i 번째 입력으로 한 번 실행 (입력은 코퍼스를 순환, card / route 항목은 코루틴 함수).
+    batch 는 표본 하나에 포함되는 호출 수 (결과는 호출 1회 기준).
+    """
+
+    def __init__(self, name: str, func, batch: int = 1):
+        self.name = name
+        self.func = func
+        self.batch = batch
+
+
+def summarize(samples_ns: list, batch: int, wall_s: float) -> dict:
+    samples = sorted(ns / batch / 1000 for ns in samples_ns)  # µs / 호출
+
+    def pct(p):
+        return samples[min(len(samples) - 1, int(p / 100 * len(samples)))]
+
+    calls = len(samples_ns) * batch
+    return {
+        "calls": calls, "ops_per_sec": round(calls / wall_s, 1), "mean_us": round(sum(samples) / len(samples), 2),
+        "p50_us": round(pct(50), 2), "p90_us": round(pct(90), 2), "p99_us": round(pct(99), 2), "max_us": round(samples[-1], 2),
+    }
+
+
+def run_sync(case: Case, seconds: float, min_samples: int) -> dict:
+    clock = time.perf_counter_ns
+    func, batch = case.func, case.batch
+    for i in range(min(batch, 50)):
+        func(i)  # 워밍업
+    samples = []
+    i = 0
+    start = clock()
+    deadline = start + int(seconds * 1e9)
+    while len(samples) < min_samples or clock() < deadline:
+        t0 = clock()
+        for _ in range(batch):
+            func(i)
+            i += 1
+        samples.append(clock() - t0)
+    return summarize(samples, batch, (clock() - start) / 1e9)
+
+
+async def run_async(case: Case, seconds: float, min_samples: int, concurrency: int) -> dict:
+    clock = time.perf_counter_ns
+    for i in range(concurrency):
+        await case.func(i)  # 워밍업
+    samples = []
+    counter = iter(range(10 ** 12))
+    start = clock()
+    deadline = start + int(seconds * 1e9)
+
+    async def worker():
+        while len(samples) < min_samples or clock() < deadline:
+            i = next(counter)
+            t0 = clock()
+            await case.func(i)
+            samples.append(clock() - t0)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(samples, 1, (clock() - start) / 1e9)
+
+
+def analyzer_cases(corpus: list) -> list:
+    characters = [(c["item"], c["basic"]["character_class"], c["basic"]["character_level"]) for c in corpus]
+    evaluated = []
+    for item_data, cls, lvl in characters:
+        preset = get_best_preset(item_data, cls, lvl)
+        evaluated.append(evaluate_equipment(item_data[f"item_equipment_preset_{preset}"], cls, lvl))
+    n = len(characters)
+
+    def best_preset(i):
+        get_best_preset(*characters[i % n])
+
+    def evaluate(i):
+        item_data, cls, lvl = characters[i % n]
+        evaluate_equipment(item_data["item_equipment"], cls, lvl)
+
+    return [
+        Case("analyzer.get_best_preset", best_preset),
+        Case("analyzer.evaluate_equipment", evaluate),
+        Case("analyzer.generate_overall_review", lambda i: generate_overall_review(evaluated[i % n]), batch=10),
+        Case("analyzer.analyze_character", lambda i: analyze_character(*characters[i % n])),
+    ]
+
+
+def calculator_cases(corpus: list) -> list:
+    armor, weapons = [], []
+    for c in corpus:
+        profile = get_class_profile(c["basic"]["character_class"])
+        level = c["basic"]["character_level"]
+        for item in c["item"]["item_equipment"]:
+            slot, part = item["item_equipment_slot"], item["item_equipment_part"]
+            req_level = int(item["item_base_option"].get("base_equipment_level", 0))
+            if any(k in slot for k in WEAPON_SLOTS):
+                weapons.append((item, profile))
+            elif not any(k in part for k in SPECIAL_PARTS):
+                armor.append((item, profile, level, req_level, part, calculate_item_score(item["item_add_option"], profile)))
+    stars = [(int(item["starforce"]), req_level) for item, _, _, req_level, _, _ in armor]
+    rnd = random.Random(0)
+    diffs = [rnd.uniform(-60, 60) for _ in range(1000)]
+    na, nw, ns = len(armor), len(weapons), len(stars)
+
+    def item_score(i):
+        item, profile = armor[i % na][:2]
+        calculate_item_score(item["item_add_option"], profile)
+
+    def advanced_add(i):
+        _, profile, _, req_level, part, grade = armor[i % na]
+        get_advanced_add_score(grade, req_level, part, profile)
+
+    def potential(i):
+        item, profile, level = armor[i % na][:3]
+        calculate_potential_score(item, "potential", profile, level)
+
+    def additional(i):
+        item, profile, level = armor[i % na][:3]
+        calculate_potential_score(item, "additional_potential", profile, level)
+
+    def weapon_potential(i):
+        item, profile = weapons[i % nw]
+        calculate_weapon_potential_score(item, "potential", profile)
+
+    return [
+        Case("calculator.calculate_item_score", item_score, batch=100),
+        Case("calculator.get_advanced_add_score", advanced_add, batch=100),
+        Case("calculator.add_diff_score", lambda i: add_diff_score(diffs[i % 1000]), batch=100),
+        Case("calculator.calculate_potential_score", potential, batch=100),
+        Case("calculator.calculate_potential_score[additional]", additional, batch=100),
+        Case("calculator.calculate_weapon_add_option_score", lambda i: calculate_weapon_add_option_score(*weapons[i % nw]), batch=100),
+        Case("calculator.calculate_weapon_potential_score", weapon_potential, batch=100),
+        Case("calculator.get_starforce_score", lambda i: get_starforce_score(*stars[i % ns]), batch=100),
+    ]
+
+
+def card_cases(corpus: list) -> list:
+    from app.image_gen import CardGenerator
+
+    avatar = sample_avatar()
+
+    async def fetch_image(url):
+        return avatar
+
+    cards = [{
+        "image": c["basic"]["character_image"], "name": c["basic"]["character_name"], "class": c["basic"]["character_class"],
+        "world": c["basic"]["world_name"], "level": c["basic"]["character_level"],
+        "combat_power": int(c["stat"]["final_stat"][0]["stat_value"]),
+    } for c in corpus]
+    n = len(cards)
+    generator = CardGenerator(fetch_image=fetch_image)
+
+    async def cached(i):
+        await generator.create_card(cards[i % n])
+
+    async def cold(i):
+        await generator.create_card({**cards[i % n], "image": f"{cards[i % n]['image']}?v={i}"})
+
+    return [
+        Case("card.create_card", cached),
+        Case("card.create_card[avatar_miss]", cold),
+    ]
+
+
+def prepare_route_env(args):
+    """app.main 을 불러오기 전에 재생 모드 / 격리 설정 (디스크 캐시·스냅샷 끔)"""
+    os.environ.update({
+        "NEXON_TRANSPORT": "replay", "NEXON_FIXTURES_DIR": "", "NEXON_RATE_LIMIT": "100000", "NEXON_RATE_BURST": "100000",
+        "NEXON_REPLAY_LATENCY_MS": str(args.upstream_latency_ms), "ITEM_SCORE_MEMO_SIZE": "0",
+        "OCID_CACHE_DB": "", "SNAPSHOT_DB": "", "AVATAR_CACHE_DIR": "",
+    })
+    if args.executor:
+        os.environ["ANALYSIS_EXECUTOR"] = args.executor
+
+
+async def run_route_cases(corpus: list, args, selected) -> dict:
+    import httpx
+    import app.main as server
+
+    for character in corpus:
+        server.nexon_api.transport.fixtures.add(character)
+    names = [c["basic"]["character_name"] for c in corpus]
+    n = len(names)
+    results = {}
+    async with server.lifespan(server.app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://bench") as client:
+            async def check(i, refresh):
+                response = await client.get(f"/check-items/{names[i % n]}", params={"refresh": 1} if refresh else None)
+                if response.status_code != 200 or "error" in response.json():
+                    raise RuntimeError(f"/check-items/{names[i % n]} 실패: {response.status_code} {response.text[:200]}")
+
+            cases = [
+                Case("route.check_items", lambda i: check(i, True)),
+                Case("route.check_items_cached", lambda i: check(i, False)),
+            ]
+            for case in cases:
+                if selected(case.name):
+                    if case.name == "route.check_items_cached":
+                        for i in range(n):
+                            await check(i, False)  # 전 캐릭터 리포트를 캐시에 채워둠
+                    results[case.name] = await run_async(case, args.seconds, args.min_samples, args.concurrency)
+                    report(case.name, results[case.name])
+    return results
+
+
+def report(name: str, result: dict):
+    print(f"{name:<52} {result['ops_per_sec']:>11.1f} {result['p50_us']:>10.1f} {result['p90_us']:>10.1f} "
+            f"{result['p99_us']:>10.1f}")
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """p50 기준 threshold 이상 느려진 항목 목록"""
+    regressions = []
+    print(f"\n{'case':<52} {'base p50':>10} {'now p50':>10} {'change':>8}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<52} {'-':>10} {result['p50_us']:>10.1f} {'new':>8}")
+            continue
+        change = result["p50_us"] / base["p50_us"] - 1 if base["p50_us"] else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  ⚠ 느려짐"
+        print(f"{name:<52} {base['p50_us']:>10.1f} {result['p50_us']:>10.1f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--characters", type=int, default=None, help="합성 캐릭터 수 (기본: 전 직업 한 명씩)")
+    parser.add_argument("--seconds", type=float, default=1.0, help="항목별 최소 측정 시간(초)")
+    parser.add_argument("--min-samples", type=int, default=50, help="항목별 최소 표본 수")
+    parser.add_argument("--only", default="", help="쉼표로 구분한 항목 이름 접두어 (예: analyzer,route.check_items)")
+    parser.add_argument("--concurrency", type=int, default=1, help="route / card 항목 동시 요청 수")
+    parser.add_argument("--upstream-latency-ms", type=float, default=0.0, help="재생 업스트림 응답 지연(ms)")
+    parser.add_argument("--executor", choices=("process", "thread", "inline"), default=None,
+                        help="route 항목의 ANALYSIS_EXECUTOR (기본: 환경 변수 / 서버 기본값)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.15, help="p50 이 이 비율 이상 늘면 회귀로 판단")
+    parser.add_argument("--save-baseline", action="store_true", help="결과를 --baseline 경로에 기준으로 저장")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.characters or len(CLASSES))
+    prefixes = [p.strip() for p in args.only.split(",") if p.strip()]
+
+    def selected(name):
+        return not prefixes or any(name.startswith(p) for p in prefixes)
+
+    print(f"코퍼스 {len(corpus)}명, 항목당 {args.seconds}s 이상\n")
+    print(f"{'case':<52} {'ops/s':>11} {'p50 µs':>10} {'p90 µs':>10} {'p99 µs':>10}")
+
+    results = {}
+    for case in analyzer_cases(corpus) + calculator_cases(corpus):
+        if selected(case.name):
+            results[case.name] = run_sync(case, args.seconds, args.min_samples)
+            report(case.name, results[case.name])
+
+    async def run_async_cases():
+        for case in card_cases(corpus):
+            if selected(case.name):
+                results[case.name] = await run_async(case, args.seconds, args.min_samples, args.concurrency)
+                report(case.name, results[case.name])
+        if any(selected(name) for name in ("route.check_items", "route.check_items_cached")):
+            prepare_route_env(args)
+            results.update(await run_route_cases(corpus, args, selected))
+
+    asyncio.run(run_async_cases())
+
+    output = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "git": git_revision(), "python": platform.python_version(),
+            "platform": platform.platform(), "cpus": os.cpu_count(), "characters": len(corpus), "seconds": args.seconds,
+            "concurrency": args.concurrency, "upstream_latency_ms": args.upstream_latency_ms,
+            "executor": os.getenv("ANALYSIS_EXECUTOR", "thread"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(output, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.output}")
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(output, f, ensure_ascii=False, indent=2)
+        print(f"기준 저장: {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)}개 항목이 {args.threshold:.0%} 이상 느려졌습니다: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
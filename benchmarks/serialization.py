@@ -0,0 +1,89 @@
+"""진단 리포트 직렬화 / 압축 벤치마크
+
+    python benchmarks/serialization.py [-n 200] [--characters 20]
+
+/check-items 가 돌려주는 리포트(장비 25개 안팎)를 합성 캐릭터로 만들어
+- fastapi_default: jsonable_encoder + 표준 json (기존 FastAPI 기본 경로)
+- stdlib: jsonable_encoder 없이 표준 json
+- orjson: FastJSONResponse (orjson 설치 시)
+로 직렬화하는 시간과, gzip / brotli 압축 크기·시간을 비교합니다. (전체 / compact 리포트)
+"""
+import os
+import sys
+import gzip
+import time
+import argparse
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.analyzer import analyze_character
+from app.responses import orjson, brotli
+from app.main import _compact_report
+from benchmarks.corpus import make_corpus
+
+
+def build_report(character: dict) -> dict:
+    basic = character["basic"]
+    best_preset, overall, results = analyze_character(character["item"], basic["character_class"], basic["character_level"])
+    return {
+        "character": basic["character_name"], "class": basic["character_class"], "level": basic["character_level"],
+        "character_image": basic["character_image"], "combat_power": character["stat"]["final_stat"][0]["stat_value"],
+        "best_preset": best_preset, "overall": overall, "results": results,
+    }
+
+
+def per_report_ms(func, reports, n: int) -> float:
+    for report in reports:
+        func(report)  # 워밍업
+    start = time.perf_counter()
+    for _ in range(n):
+        for report in reports:
+            func(report)
+    return (time.perf_counter() - start) / (n * len(reports)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=200, help="반복 횟수")
+    parser.add_argument("--characters", type=int, default=20, help="합성 캐릭터 수")
+    args = parser.parse_args()
+
+    full = [build_report(character) for character in make_corpus(args.characters)]
+    variants = {"full": full, "compact": [_compact_report(report) for report in full]}
+    items = sum(len(report["results"]) for report in full) / len(full)
+    print(f"리포트 {len(full)}개, 평균 장비 {items:.1f}개")
+
+    serializers = {
+        "fastapi_default": lambda r: JSONResponse(jsonable_encoder(r)).body,
+        "stdlib": lambda r: JSONResponse(r).body,
+    }
+    if orjson is not None:
+        serializers["orjson"] = lambda r: orjson.dumps(r, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        print("(orjson 미설치 - orjson 항목 생략)")
+
+    print(f"\n{'variant':<8} {'serializer':<16} {'bytes':>8} {'ms/report':>10}")
+    for variant, reports in variants.items():
+        for label, func in serializers.items():
+            size = sum(len(func(report)) for report in reports) / len(reports)
+            print(f"{variant:<8} {label:<16} {size:>8.0f} {per_report_ms(func, reports, args.n):>10.3f}")
+
+    compressors = {"gzip-1": lambda b: gzip.compress(b, compresslevel=1), "gzip-6": lambda b: gzip.compress(b, compresslevel=6)}
+    if brotli is not None:
+        compressors["br-4"] = lambda b: brotli.compress(b, quality=4)
+        compressors["br-11"] = lambda b: brotli.compress(b, quality=11)
+    else:
+        print("\n(brotli 미설치 - br 항목 생략)")
+
+    print(f"\n{'variant':<8} {'encoding':<16} {'bytes':>8} {'ms/report':>10}")
+    for variant, reports in variants.items():
+        bodies = [JSONResponse(report).body for report in reports]
+        for label, func in compressors.items():
+            size = sum(len(func(body)) for body in bodies) / len(bodies)
+            print(f"{variant:<8} {label:<16} {size:>8.0f} {per_report_ms(func, bodies, max(1, args.n // 4)):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
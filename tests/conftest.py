@@ -0,0 +1,5 @@
+import os
+import sys
+
+# python -m pytest tests / pytest 어디서 실행해도 app, benchmarks 패키지를 찾을 수 있도록
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,106 @@
+"""추가옵션 점수 테이블(add_diff_score / ADD_OVER_* / ADD_UNDER_*)이 예전 5% 구간 반복문과 같은 값을 내는지 확인
+
+반복문 버전(reference_*)은 테이블 방식으로 바꾸기 전 calculator.get_advanced_add_score 를 그대로 옮긴 것입니다.
+반올림 전 값까지 비트 단위로 같아야 합니다.
+"""
+import random
+
+import pytest
+
+from app.calculator import CLASS_PROFILES, add_diff_score, get_advanced_add_score
+
+# 추가옵션 목표 테이블 세 갈래: default / xenon / demon_avenger
+BRANCH_CLASSES = ("히어로", "제논", "데몬어벤져")
+LEVELS = range(100, 301)
+
+
+def reference_add_diff_score(diff_percent):
+    score = 100.0
+    rem = abs(diff_percent)
+
+    if diff_percent > 0:
+        mult = 0.5
+        decay = 0.9
+    else:
+        mult = 1.2
+        decay = 1.05
+
+    while rem > 0:
+        chunk = min(5.0, rem)
+        if diff_percent > 0:
+            score += (chunk * mult)
+            mult *= decay
+        else:
+            score -= (chunk * mult)
+            mult = min(mult * decay, 3.0)
+        rem -= chunk
+
+    return score
+
+
+def reference_advanced_add_score(actual_급수, level, part_name, profile):
+    no_add_slots = ["반지", "어깨장식", "기계 심장", "훈장", "뱃지", "포켓 아이템", "엠블렘", "보조무기", "무기"]
+    if any(k in part_name for k in no_add_slots):
+        return 100.0
+
+    if profile.add_target == "xenon":
+        target_map = {250: 300, 200: 265, 160: 240, 150: 220}
+        target = target_map.get(level)
+        if target is None:
+            if level >= 100:
+                target = (level * 1.2) + 40
+            else:
+                return 100.0
+    elif profile.add_target == "demon_avenger":
+        target_map = {250: 4200, 200: 3600, 160: 2880, 150: 2700}
+        target = target_map.get(level)
+        if target is None:
+            if level >= 100:
+                target = level * 18
+            else:
+                return 100.0
+    else:
+        target_map = {250: 186, 200: 162, 160: 144, 150: 132, 140: 126, 135: 123, 130: 120}
+        target = target_map.get(level)
+        if target is None:
+            if level >= 100:
+                target = (level * 0.6) + 42
+            else:
+                return 100.0
+
+    diff_percent = ((actual_급수 - target) / target) * 100.0
+    return round(max(0, reference_add_diff_score(diff_percent)), 2)
+
+
+def _mismatches(cases):
+    return [case for case in cases if get_advanced_add_score(*case) != reference_advanced_add_score(*case)]
+
+
+@pytest.mark.parametrize("class_name", BRANCH_CLASSES)
+def test_advanced_add_score_matches_loop(class_name):
+    """레벨 100~300, 급수 0 ~ 목표의 약 3배 (데몬어벤져는 HP 라 10 단위)"""
+    profile = CLASS_PROFILES[class_name]
+    step = 10 if profile.add_target == "demon_avenger" else 1
+    limit = 16500 if profile.add_target == "demon_avenger" else 1300
+    cases = [(actual, level, "모자", profile) for level in LEVELS for actual in range(0, limit, step)]
+    assert _mismatches(cases) == []
+
+
+@pytest.mark.parametrize("class_name", BRANCH_CLASSES)
+def test_advanced_add_score_outliers(class_name):
+    """목표보다 훨씬 높거나 낮은 급수, 소수 급수, 추가옵션이 없는 부위, 레벨 100 미만"""
+    profile = CLASS_PROFILES[class_name]
+    actuals = (-1000, -1, 0, 0.5, 1e-9, 99.99, 10 ** 4, 10 ** 5, 10 ** 6, 123456.789)
+    cases = [(actual, level, "모자", profile) for level in (0, 99, 100, 150, 200, 250, 300) for actual in actuals]
+    cases += [(actual, 250, part, profile) for part in ("반지", "무기", "보조무기", "엠블렘") for actual in actuals]
+    assert _mismatches(cases) == []
+
+
+def test_add_diff_score_bit_identical():
+    """반올림 전 값: 5% 경계 근처, 배율이 0/3.0 에 닿는 큰 차이, 무작위 소수"""
+    rng = random.Random(0)
+    diffs = [sign * (5.0 * n + delta) for sign in (1, -1) for n in range(400) for delta in (0.0, 1e-12, 2.5, 5.0 - 1e-12)]
+    diffs += [0.0, -0.0, 1e4, -1e4, 1e5, -1e5, 1e6]
+    diffs += [rng.uniform(-500, 2000) for _ in range(20000)]
+    mismatches = [diff for diff in diffs if add_diff_score(diff) != reference_add_diff_score(diff)]
+    assert mismatches == []
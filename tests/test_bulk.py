@@ -0,0 +1,55 @@
+"""bulk.py(NumPy 대량 계산)가 evaluate_equipment / get_best_preset 과 같은 결과를 내는지 확인 (numpy 없으면 건너뜀)"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.analyzer import evaluate_equipment, get_best_preset
+from app.bulk import bulk_best_presets, bulk_evaluate
+from benchmarks.corpus import CLASSES, make_corpus
+
+# 전 직업이 두 번씩 나오도록
+CHARACTERS = make_corpus(len(CLASSES) * 2, seed=7)
+
+
+def _equipment_sets():
+    sets = []
+    for character in CHARACTERS:
+        basic = character["basic"]
+        for preset in range(1, 4):
+            items = character["item"][f"item_equipment_preset_{preset}"]
+            sets.append((items, basic["character_class"], basic["character_level"]))
+    return sets
+
+
+def test_bulk_evaluate_matches_evaluate_equipment():
+    sets = _equipment_sets()
+    bulk = bulk_evaluate(sets)
+    for set_no, (items, char_class, char_level) in enumerate(sets):
+        expected = evaluate_equipment(items, char_class, char_level)
+        rows = np.flatnonzero((bulk.set_index == set_no) & bulk.included)
+        assert len(rows) == len(expected), (char_class, set_no)
+        for row, result in zip(rows, expected):
+            assert bool(bulk.is_special[row]) == result["is_special"]
+            assert (
+                bulk.total_score[row], bulk.add[row], bulk.star[row], bulk.pot[row], bulk.pot_additional[row]
+            ) == (
+                result["total_score"], result["detail"]["add"], result["detail"]["star"], result["detail"]["pot"],
+                result["detail"]["pot_additional"]
+            ), (char_class, result["name"])
+
+
+def test_bulk_averages_match_overall_review():
+    sets = _equipment_sets()
+    averages = bulk_evaluate(sets).averages(len(sets))
+    for set_no, (items, char_class, char_level) in enumerate(sets):
+        scores = [result["total_score"] for result in evaluate_equipment(items, char_class, char_level) if not result["is_special"]]
+        assert averages[set_no] == pytest.approx(sum(scores) / len(scores) if scores else 0.0)
+
+
+def test_bulk_best_presets_matches_get_best_preset():
+    characters = [
+        (character["item"], character["basic"]["character_class"], character["basic"]["character_level"])
+        for character in CHARACTERS
+    ]
+    expected = [get_best_preset(*character) for character in characters]
+    assert bulk_best_presets(characters).tolist() == expected
@@ -0,0 +1,50 @@
+"""캐릭터 이미지를 받아오지 못해 아바타 없이 그린 카드가 캐시 / ETag 로 굳지 않는지 확인 (녹화 응답 재생 모드)"""
+import os
+import asyncio
+
+os.environ.update({
+    "NEXON_TRANSPORT": "replay", "NEXON_FIXTURES_DIR": "", "NEXON_RATE_LIMIT": "100000", "NEXON_RATE_BURST": "100000",
+    "OCID_CACHE_DB": "", "SNAPSHOT_DB": "", "AVATAR_CACHE_DIR": "",
+})
+
+import httpx
+
+import app.main as server
+from benchmarks.corpus import make_character
+
+
+def test_card_without_avatar_is_not_cached():
+    character = make_character(3)
+    server.nexon_api.transport.fixtures.add(character)
+    url = f"/card/{character['basic']['character_name']}.png"
+    fetch_image = server.card_gen.fetch_image
+
+    async def cdn_down(image_url):
+        raise httpx.ConnectError("CDN down")
+
+    async def scenario():
+        async with server.lifespan(server.app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test") as client:
+                server.card_gen.fetch_image = cdn_down
+                try:
+                    broken = await client.get(url)
+                finally:
+                    server.card_gen.fetch_image = fetch_image
+                recovered = await client.get(url)
+                cached = await client.get(url, headers={"If-None-Match": recovered.headers["ETag"]})
+                again = await client.get(url)
+        return broken, recovered, cached, again
+
+    broken, recovered, cached, again = asyncio.run(scenario())
+    assert broken.status_code == 200
+    assert "ETag" not in broken.headers
+    assert broken.headers["Cache-Control"] == "no-store"
+    assert broken.headers["X-Card-Cache"] == "incomplete"
+
+    # 복구 후에는 아바타가 들어간 새 카드를 그려 캐시하고, 그다음부터는 ETag / 캐시로 응답
+    assert recovered.status_code == 200
+    assert recovered.headers["X-Card-Cache"] == "miss"
+    assert recovered.content != broken.content
+    assert cached.status_code == 304
+    assert again.headers["X-Card-Cache"] == "hit"
+    assert again.content == recovered.content
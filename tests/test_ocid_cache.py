@@ -0,0 +1,28 @@
+"""ocid 캐시 디스크 계층: 기록은 백그라운드로, 재시작 후에는 디스크에서 이어서 조회"""
+import asyncio
+
+from app.cache import MISSING, OcidCache
+
+
+def test_disk_tier_write_behind_and_reload(tmp_path):
+    db_path = str(tmp_path / "ocid.db")
+
+    async def first_worker():
+        cache = OcidCache(db_path=db_path)
+        cache.set(" Bench00001 ", "ocid-1")
+        cache.set_not_found("nobody")
+        assert await cache.get("bench00001") == "ocid-1"  # 메모리에서 바로 응답
+        await cache.flush()
+        assert not cache.pending
+
+    async def restarted_worker():
+        cache = OcidCache(db_path=db_path)
+        found = await cache.get("BENCH00001")
+        not_found = await cache.get("nobody")
+        missing = await cache.get("someone-else")
+        return found, not_found, missing, cache.stats()
+
+    asyncio.run(first_worker())
+    found, not_found, missing, stats = asyncio.run(restarted_worker())
+    assert (found, not_found, missing) == ("ocid-1", OcidCache.NOT_FOUND, MISSING)
+    assert stats["hits"] == 2 and stats["misses"] == 1
@@ -0,0 +1,240 @@
+"""잠재능력 파서(options.parse_option) 기반 점수가 예전 정규식 / 문자열 검사 방식과 같은 값을 내는지 확인
+
+reference_* 함수는 파서로 바꾸기 전 calculator 의 calculate_potential_score / calculate_weapon_potential_score 를
+그대로 옮긴 것입니다. (직업명 → 주스탯은 지금의 get_main_stat 사용)
+"""
+import re
+import random
+
+import pytest
+
+from app.analyzer import evaluate_equipment
+from app.calculator import calculate_potential_score, calculate_weapon_potential_score, get_class_profile, get_main_stat
+from benchmarks.corpus import CLASSES, make_corpus
+
+STATS = ("STR", "DEX", "INT", "LUK")
+
+# 실제 옵션 + 한 줄에 스탯이 여러 개 나오는 줄, 수치가 없는 줄 등 예외적인 문자열
+LINE_POOL = (
+    [f"{stat} : +{value}%" for stat in STATS for value in (3, 9, 12)]
+    + [f"{stat} : +{value}" for stat in STATS for value in (6, 18)]
+    + [f"캐릭터 기준 10레벨 당 {stat} : +{value}" for stat in STATS for value in (1, 2)]
+    + [
+        "STR : +9%, DEX : +9%", "INT : +9%, LUK : +9%", "DEX : +6, LUK : +6", "STR, DEX, LUK : +12%",
+        "캐릭터 기준 9레벨 당 STR, DEX : +2", "올스탯 : +6%", "올스탯 : +10", "올스탯 : +6%, STR : +3%",
+        "최대 HP : +12%", "최대 HP : +300", "캐릭터 기준 10레벨 당 HP : +20", "HP 회복 아이템 및 회복 스킬 효율 : +30%",
+        "공격력 : +12", "마력 : +12", "공격력 : +12%", "마력 : +12%", "공격력 : +10, 마력 : +10", "캐릭터 기준 10레벨 당 공격력 : +1",
+        "크리티컬 데미지 : +8%", "크리티컬 데미지 : +3%", "크리티컬 확률 : +12%", "보스 몬스터 공격 시 데미지 : +40%",
+        "데미지 : +12%", "몬스터 방어율 무시 : +40%", "모든 스킬의 재사용 대기시간 : -1초(10초 이하는 5%감소, 5초 미만으로 감소 불가)",
+        "모든 스킬의 재사용 대기시간 : -2초(10초 이하는 10%감소, 5초 미만으로 감소 불가)", "메소 획득량 : +20%",
+        "아이템 드롭률 : +20%", "피격 시 10% 확률로 데미지의 50% 무시", "STR : %", "공격력 : +",
+    ]
+)
+POTENTIAL_TYPES = ("potential", "additional_potential")
+
+
+def reference_potential_score(item_data, potential_type, class_name):
+    slot = item_data.get("item_equipment_slot", "")
+    part = item_data.get("item_equipment_part", "")
+
+    exclude_keywords = ["무기", "보조무기", "엠블렘"]
+    is_excluded = any(k in slot for k in exclude_keywords) or any(k in part for k in exclude_keywords)
+
+    if is_excluded:
+        return -1
+
+    main_stat = get_main_stat(class_name).upper()
+
+    options = [
+        item_data.get(f"{potential_type}_option_1"),
+        item_data.get(f"{potential_type}_option_2"),
+        item_data.get(f"{potential_type}_option_3")
+    ]
+
+    total_stat_score = 0.0
+    total_special_score = 0.0
+
+    crit_count = 0
+    crit_val_sum = 0
+
+    for opt in options:
+        if not opt: continue
+
+        if "크리티컬 데미지" in opt:
+            val_match = re.search(r'\+(\d+)%', opt)
+            if val_match:
+                crit_count += 1
+                crit_val_sum += int(val_match.group(1))
+            continue
+
+        if "스킬 재사용 대기시간" in opt:
+            val_match = re.search(r'(\d+)초', opt)
+            if val_match:
+                total_special_score += int(val_match.group(1)) * 7.25
+            continue
+
+        if main_stat == "ALL_STAT":
+            if "올스탯" in opt and "%" in opt:
+                val_match = re.search(r'\+(\d+)%', opt)
+                if val_match:
+                    total_stat_score += int(val_match.group(1))
+            elif "레벨" in opt:
+                val_match = re.search(r'\+(\d+)', opt)
+                if val_match:
+                    val = int(val_match.group(1))
+                    if any(stat in opt for stat in ["STR", "DEX", "LUK"]):
+                        total_stat_score += val / 3.0
+            elif any(stat in opt for stat in ["STR", "DEX", "LUK"]) and "%" in opt:
+                val_match = re.search(r'\+(\d+)%', opt)
+                if val_match:
+                    total_stat_score += int(val_match.group(1)) / 3.0
+            elif "공격력" in opt and "%" not in opt:
+                val_match = re.search(r'\+(\d+)', opt)
+                if val_match:
+                    total_stat_score += int(val_match.group(1)) * 0.3
+            elif any(stat in opt for stat in ["STR", "DEX", "LUK"]) and "%" not in opt:
+                val_match = re.search(r'\+(\d+)', opt)
+                if val_match:
+                    total_stat_score += (int(val_match.group(1)) / 3.0) * 0.09
+        else:
+            if "올스탯" in opt and "%" in opt:
+                val_match = re.search(r'\+(\d+)%', opt)
+                if val_match:
+                    val = int(val_match.group(1))
+                    weight = 1.2 if class_name in ["섀도어", "카데나", "듀얼블레이더"] else 1.1
+                    total_stat_score += val * weight
+            elif "레벨" in opt and main_stat in opt:
+                val_match = re.search(r'\+(\d+)', opt)
+                if val_match:
+                    val = int(val_match.group(1))
+                    total_stat_score += val * 3.5
+            elif main_stat in opt and "%" in opt and "회복" not in opt:
+                val_match = re.search(r'\+(\d+)%', opt)
+                if val_match:
+                    total_stat_score += int(val_match.group(1))
+            elif ("공격력" in opt or "마력" in opt) and "%" not in opt:
+                atk_key = "마력" if main_stat == "INT" else "공격력"
+                if atk_key in opt:
+                    val_match = re.search(r'\+(\d+)', opt)
+                    if val_match:
+                        total_stat_score += int(val_match.group(1)) * 0.3
+            elif main_stat in opt and "%" not in opt and "회복" not in opt:
+                val_match = re.search(r'\+(\d+)', opt)
+                if val_match:
+                    total_stat_score += int(val_match.group(1)) * 0.09
+
+    cd_points = 0
+    if potential_type == "potential":
+        if crit_count == 1:
+            cd_points = crit_val_sum * 1.125
+        elif crit_count >= 2:
+            cd_points = crit_val_sum * 1.875
+    elif potential_type == "additional_potential":
+        cd_points = crit_val_sum * 4.0
+
+    total_special_score += cd_points
+
+    if main_stat == "ALL_STAT":
+        total_stat_score *= 1.35
+
+    if class_name == "데몬어벤져" and potential_type == "additional_potential":
+        total_stat_score *= 0.9
+
+    return round(total_stat_score + total_special_score, 2)
+
+
+def reference_weapon_potential_score(item_data, potential_type, class_name):
+    slot = item_data.get("item_equipment_slot", "")
+    part = item_data.get("item_equipment_part", "")
+    is_wse = any(k in slot for k in ["무기", "보조무기"]) or "엠블렘" in part
+    if not is_wse:
+        return 0.0
+
+    main_stat = get_main_stat(class_name)
+    target_atk = "마력" if main_stat == "int" else "공격력"
+    target_stat = main_stat.upper()
+
+    options = [
+        item_data.get(f"{potential_type}_option_1"),
+        item_data.get(f"{potential_type}_option_2"),
+        item_data.get(f"{potential_type}_option_3")
+    ]
+
+    total_stat_score = 0.0
+    total_special_score = 0.0
+
+    for opt in options:
+        if not opt: continue
+        val_match = re.search(r'\+(\d+)%', opt)
+        if not val_match: continue
+        val = int(val_match.group(1))
+
+        if "데미지" in opt:
+            total_special_score += val * 0.275
+        elif "방어율 무시" in opt:
+            total_special_score += val * 0.1875
+        elif target_atk in opt and "%" in opt:
+            total_stat_score += val
+        elif "올스탯" in opt and "%" in opt:
+            total_stat_score += val * 0.2475
+        elif target_stat in opt and "%" in opt and "회복" not in opt:
+            total_stat_score += val * 0.225
+
+    return round(total_stat_score + total_special_score, 2)
+
+
+def _mismatches(items, class_name):
+    profile = get_class_profile(class_name)
+    mismatches = []
+    for item in items:
+        for potential_type in POTENTIAL_TYPES:
+            got = (calculate_potential_score(item, potential_type, profile, 200),
+                   calculate_weapon_potential_score(item, potential_type, profile))
+            expected = (reference_potential_score(item, potential_type, class_name),
+                        reference_weapon_potential_score(item, potential_type, class_name))
+            if got != expected:
+                mismatches.append((item["item_equipment_slot"], potential_type, got, expected))
+    return mismatches
+
+
+def _crafted_items(seed: int, count: int) -> list:
+    """합성 캐릭터의 방어구 / 무기 / 엠블렘에 LINE_POOL 에서 뽑은 잠재 3줄씩을 넣은 아이템"""
+    rng = random.Random(seed)
+    templates = [item for item in make_corpus(1, seed)[0]["item"]["item_equipment"]
+                 if item["item_equipment_slot"] in ("모자", "장갑", "무기", "엠블렘", "보조무기")]
+    items = []
+    for i in range(count):
+        item = dict(templates[i % len(templates)])
+        for potential_type in POTENTIAL_TYPES:
+            for n in (1, 2, 3):
+                item[f"{potential_type}_option_{n}"] = rng.choice(LINE_POOL + [None])
+        items.append(item)
+    return items
+
+
+CORPUS = make_corpus(len(CLASSES) * 2, seed=11)
+
+
+@pytest.mark.parametrize("class_name", CLASSES)
+def test_corpus_potential_scores_match_reference(class_name):
+    items = [item for character in CORPUS for item in character["item"]["item_equipment"]]
+    assert _mismatches(items, class_name) == []
+
+
+@pytest.mark.parametrize("class_name", CLASSES)
+def test_unusual_lines_match_reference(class_name):
+    """한 줄에 스탯이 여러 개인 줄(예: STR : +9%, DEX : +9%)도 예전처럼 주스탯이 포함되면 점수에 반영"""
+    assert _mismatches(_crafted_items(seed=len(class_name), count=600), class_name) == []
+
+
+def test_bulk_matches_on_unusual_lines():
+    np = pytest.importorskip("numpy")
+    from app.bulk import bulk_evaluate
+
+    sets = [(_crafted_items(seed=i, count=60), class_name, 250) for i, class_name in enumerate(CLASSES)]
+    bulk = bulk_evaluate(sets)
+    for set_no, (items, class_name, level) in enumerate(sets):
+        expected = [(r["total_score"], r["detail"]["pot"], r["detail"]["pot_additional"])
+                    for r in evaluate_equipment(items, class_name, level)]
+        rows = np.flatnonzero((bulk.set_index == set_no) & bulk.included)
+        assert [(bulk.total_score[r], bulk.pot[r], bulk.pot_additional[r]) for r in rows] == expected, class_name